@@ -0,0 +1,194 @@
+"""Benchmark fungsi agregasi dashboard pada data sintetis berbagai ukuran.
+
+Contoh:
+    python benchmarks/bench.py --sizes 100k,1m --out results.json
+    python benchmarks/bench.py --sizes 1m --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+import analysis  # noqa: E402
+from date_index import DailyIndex  # noqa: E402
+from engine import PanelEngine  # noqa: E402
+from schema import compact  # noqa: E402
+from synthetic import END, generate  # noqa: E402
+
+# Lebar rentang tanggal (hari) yang diuji; "all" berarti seluruh dataset.
+WIDTHS = ["7", "30", "365", "all"]
+
+
+def date_range(width):
+    if width == "all":
+        return pd.Timestamp("2016-01-01"), END
+    return END - pd.Timedelta(days=int(width) - 1), END
+
+
+def cases(df, engine, index):
+    """{nama: fungsi(start, end)} untuk setiap fungsi yang diukur."""
+    return {
+        "filtered": lambda s, e: analysis.filtered(df, s, e),
+        "order_revenue_trend[order_id]": lambda s, e: analysis.order_revenue_trend(
+            analysis.filtered(df, s, e), "order_id"
+        ),
+        "order_revenue_trend[price]": lambda s, e: analysis.order_revenue_trend(
+            analysis.filtered(df, s, e), "price"
+        ),
+        "top_lowest_type_order": lambda s, e: analysis.top_lowest_type_order(
+            analysis.filtered(df, s, e)
+        ),
+        "top_lowest_type_sales": lambda s, e: analysis.top_lowest_type_sales(
+            analysis.filtered(df, s, e)
+        ),
+        "top_payment_methods": lambda s, e: analysis.top_payment_methods(
+            analysis.filtered(df, s, e)
+        ),
+        "top_city_transaction": lambda s, e: analysis.top_city_transaction(
+            analysis.filtered(df, s, e)
+        ),
+        "geo_top_city_transactions": lambda s, e: analysis.geo_top_city_transactions(
+            analysis.filtered(df, s, e)
+        ),
+        "engine.run": lambda s, e: engine.run(s, e),
+        "engine.geo_city": lambda s, e: engine.geo_city(s, e),
+        "index.all_panels": lambda s, e: (
+            index.order_revenue_trend(s, e, "order_id"),
+            index.order_revenue_trend(s, e, "price"),
+            index.top_lowest_type_order(s, e),
+            index.top_lowest_type_sales(s, e),
+            index.top_payment_methods(s, e),
+            index.top_city_transaction(s, e),
+        ),
+    }
+
+
+def measure(fn, repeat):
+    """Waktu terbaik dari `repeat` kali jalan dan puncak alokasi (tracemalloc)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def result(function, rows, width, seconds, peak_bytes):
+    return {
+        "function": function,
+        "rows": rows,
+        "width": width,
+        "seconds": seconds,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run(sizes, widths, repeat, only=None, seed=0):
+    results = []
+    for size in sizes:
+        started = time.perf_counter()
+        df = compact(generate(size, seed=seed))
+        generated = time.perf_counter() - started
+        started = time.perf_counter()
+        engine = PanelEngine(df)
+        index = DailyIndex(engine)
+        built = time.perf_counter() - started
+        print(f"rows={size:,} generate={generated:.2f}s engine+index={built:.2f}s", file=sys.stderr)
+        results.append(result("build.engine+index", size, "-", built, None))
+        for name, fn in cases(df, engine, index).items():
+            if only and name not in only:
+                continue
+            for width in widths:
+                start, end = date_range(width)
+                seconds, peak = measure(lambda: fn(start, end), repeat)
+                results.append(result(name, size, width, seconds, peak))
+                print(
+                    f"  {name:32s} width={width:>4s} {seconds * 1e3:10.2f} ms {peak / 2**20:10.1f} MiB",
+                    file=sys.stderr,
+                )
+        del df, engine, index
+        gc.collect()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Membandingkan hasil dengan baseline; mengembalikan daftar regresi."""
+    key = lambda r: (r["function"], r["rows"], r["width"])  # noqa: E731
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for row in results:
+        base = previous.get(key(row))
+        if base is None or not base["seconds"]:
+            continue
+        ratio = row["seconds"] / base["seconds"]
+        flag = "REGRESI" if ratio > 1 + threshold else ""
+        print(
+            f"{row['function']:32s} rows={row['rows']:>10,} "
+            f"width={row['width']:>4s} x{ratio:6.2f} {flag}"
+        )
+        if flag:
+            regressions.append({**row, "baseline_seconds": base["seconds"], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k,1m", help="Jumlah baris, mis. 100k,1m,20m")
+    parser.add_argument("--widths", default=",".join(WIDTHS), help="Lebar rentang (hari) atau all")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="Hanya fungsi tertentu (dipisah koma)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Batas perlambatan relatif")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    widths = args.widths.split(",")
+    only = set(args.only.split(",")) if args.only else None
+    results = run(sizes, widths, args.repeat, only, args.seed)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"hasil ditulis ke {args.out}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+"""Uji beban end-to-end: banyak sesi dashboard mengganti rentang tanggal bersamaan.
+
+Menjalankan `streamlit run dashboard/dashboard.py` headless di port lokal lalu
+mensimulasikan N sesi browser lewat protokol websocket Streamlit: setiap sesi
+memuat halaman, lalu berulang kali mengirim rentang tanggal acak dan menunggu
+rerun selesai. Latensi dihitung dari pesan rerun dikirim sampai `script_finished`
+diterima. Byte terkirim adalah pesan websocket ditambah gambar /media yang belum
+pernah diunduh sesi tersebut (seperti cache browser). CPU dan puncak RSS diukur
+pada proses server; CPU hanya dihitung selama fase ganti tanggal, setelah semua sesi
+selesai memuat halaman.
+
+AppTest tidak dipakai karena setiap run mengganti runtime global prosesnya
+(sesi bersamaan saling menimpa) dan pesannya tidak pernah diserialisasi ke klien.
+
+Contoh:
+    python benchmarks/loadtest.py --rows 200k --sessions 8 --reruns 10 --out load.json
+    python benchmarks/loadtest.py --rows 200k --sessions 8 --reruns 10 --baseline load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psutil
+import streamlit
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import websocket_connect
+
+from synthetic import generate
+
+ROOT = Path(__file__).resolve().parent.parent
+DASHBOARD = ROOT / "dashboard" / "dashboard.py"
+
+# Lebar rentang tanggal (hari) yang dipilih acak oleh setiap sesi; "all" = seluruh data
+WIDTHS = ["7", "30", "90", "365", "all"]
+DATE_FORMAT = "%Y/%m/%d"
+DATE_LABELS = ("Start Date", "End Date")
+# Env yang memengaruhi hasil, dicatat di laporan agar perbandingan antar-commit adil
+SETTINGS = (
+    "DASHBOARD_BACKEND",
+    "MAIN_DATA_STREAMING",
+    "ORDER_COUNT_MODE",
+    "DASHBOARD_SECTIONS",
+    "PANEL_WORKERS",
+    "DUCKDB_THREADS",
+)
+# Metrik ringkasan yang makin kecil makin baik, dibandingkan dengan baseline
+COMPARED = (
+    "latency_p50",
+    "latency_p95",
+    "latency_p99",
+    "cpu_seconds_per_rerun",
+    "peak_rss_bytes",
+    "bytes_per_rerun_mean",
+)
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Server
+
+class Server:
+    """Proses `streamlit run` headless beserta pengambil sampel CPU dan RSS-nya."""
+
+    def __init__(self, env, workdir, interval=0.05):
+        self.port = free_port()
+        self.log = open(Path(workdir) / "server.log", "wb")
+        command = [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            str(DASHBOARD),
+            "--server.headless=true",
+            f"--server.port={self.port}",
+            "--server.address=127.0.0.1",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+        ]
+        self.proc = subprocess.Popen(command, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self.process = psutil.Process(self.proc.pid)
+        self.interval = interval
+        self.peak_rss = 0
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, name="rss", daemon=True)
+        self.sampler.start()
+
+    @property
+    def url(self):
+        return f"127.0.0.1:{self.port}"
+
+    def sample(self):
+        while not self.stopped.is_set():
+            try:
+                self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+            except psutil.Error:
+                return
+            time.sleep(self.interval)
+
+    def rss(self):
+        return self.process.memory_info().rss
+
+    def cpu_seconds(self):
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"Server berhenti (kode {self.proc.returncode}):\n{self.tail()}")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError(f"Server tidak siap dalam {timeout:.0f}s:\n{self.tail()}")
+
+    def tail(self, lines=30):
+        self.log.flush()
+        text = Path(self.log.name).read_text(errors="replace")
+        return "\n".join(text.splitlines()[-lines:])
+
+    def stop(self):
+        self.stopped.set()
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.log.close()
+
+
+# Sesi
+
+class Session:
+    """Satu tab browser: koneksi websocket, id widget tanggal, dan media yang sudah diunduh."""
+
+    def __init__(self, number, server_url, rng, align="day", timeout=300):
+        self.number = number
+        self.server_url = server_url
+        self.rng = rng
+        self.align = align
+        self.timeout = timeout
+        self.ws = None
+        self.dates = {}
+        self.media = set()
+        self.http = AsyncHTTPClient()
+
+    async def connect(self):
+        request = HTTPRequest(
+            f"ws://{self.server_url}/_stcore/stream",
+            headers={"Sec-WebSocket-Protocol": "streamlit"},
+        )
+        self.ws = await websocket_connect(request, max_message_size=1 << 30)
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def rerun(self, kind, start=None, end=None):
+        """Mengirim satu rerun dan membaca pesan sampai `script_finished`; mengembalikan catatan."""
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        states = msg.rerun_script.widget_states
+        if start is not None:
+            for label, value in zip(DATE_LABELS, (start, end)):
+                state = WidgetState(id=self.dates[label]["id"])
+                state.string_array_value.data.append(value.strftime(DATE_FORMAT))
+                states.widgets.append(state)
+        started = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+
+        record = {"session": self.number, "kind": kind, "messages": 0, "ws_bytes": 0, "errors": 0}
+        urls = []
+        while True:
+            payload = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if payload is None:
+                raise ConnectionError(f"Sesi {self.number}: koneksi ditutup server")
+            record["messages"] += 1
+            record["ws_bytes"] += len(payload)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(payload)
+            kind_of = fwd.WhichOneof("type")
+            if kind_of == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                urls.extend(self.inspect(fwd.delta.new_element, record))
+            elif kind_of == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    record["errors"] += 1
+                break
+        record["seconds"] = time.perf_counter() - started
+        record["media_bytes"] = await self.fetch_media(urls)
+        record["bytes"] = record["ws_bytes"] + record["media_bytes"]
+        if start is not None:
+            record.update(start=start.isoformat(), end=end.isoformat())
+        return record
+
+    def inspect(self, element, record):
+        """Mencatat widget tanggal dan error; mengembalikan URL gambar di elemen ini."""
+        kind = element.WhichOneof("type")
+        if kind == "date_input" and element.date_input.label in DATE_LABELS:
+            widget = element.date_input
+            self.dates[widget.label] = {
+                "id": widget.id,
+                "min": widget.min,
+                "max": widget.max,
+                "value": widget.default[0] if widget.default else None,
+            }
+        elif kind == "exception":
+            record["errors"] += 1
+        elif kind == "imgs":
+            return [img.url for img in element.imgs.imgs]
+        return []
+
+    async def fetch_media(self, urls):
+        """Mengunduh gambar yang belum pernah diterima sesi ini; mengembalikan jumlah byte."""
+        fresh = [url for url in dict.fromkeys(urls) if url not in self.media]
+        self.media.update(fresh)
+        responses = await asyncio.gather(
+            *(self.http.fetch(f"http://{self.server_url}{url}") for url in fresh)
+        )
+        return sum(len(response.body) for response in responses)
+
+    def date_range(self):
+        """Rentang acak di dalam batas widget: awal acak, lebar dari WIDTHS."""
+        parse = lambda text: datetime.strptime(text, DATE_FORMAT).date()  # noqa: E731
+        first = parse(self.dates["Start Date"]["value"])
+        last = parse(self.dates["End Date"]["value"])
+        width = self.rng.choice(WIDTHS)
+        if width == "all":
+            return first, last
+        days = int(width)
+        span = max((last - first).days - days + 1, 0)
+        start = first + timedelta(days=int(self.rng.integers(0, span + 1)))
+        if self.align == "month":
+            start = start.replace(day=1) if start.replace(day=1) >= first else first
+        return start, min(start + timedelta(days=days - 1), last)
+
+    async def open(self):
+        """Memuat halaman dan memastikan kedua widget tanggal ditemukan."""
+        await self.connect()
+        record = await self.rerun("load")
+        missing = [
+            label for label in DATE_LABELS if self.dates.get(label, {}).get("value") is None
+        ]
+        if missing:
+            raise RuntimeError(
+                f"Sesi {self.number}: widget tanggal {', '.join(missing)} tidak ditemukan "
+                f"setelah muat halaman (error di halaman: {record['errors']})"
+            )
+        return record
+
+    async def browse(self, reruns, think):
+        records = []
+        for _ in range(reruns):
+            if think:
+                await asyncio.sleep(self.rng.exponential(think))
+            start, end = self.date_range()
+            records.append(await self.rerun("rerun", start, end))
+        return records
+
+
+async def drive(server_url, sessions, reruns, think, align, seed, timeout, cpu=lambda: 0.0):
+    """Menjalankan semua sesi bersamaan dalam dua fase: muat halaman, lalu ganti tanggal.
+
+    Mengembalikan (catatan, detik, detik CPU `cpu()`); detik dan CPU hanya
+    mencakup fase ganti tanggal agar muat halaman tidak ikut terhitung.
+    """
+    runs = [
+        Session(i, server_url, np.random.default_rng([seed, i]), align, timeout)
+        for i in range(sessions)
+    ]
+    try:
+        records = await asyncio.gather(*(session.open() for session in runs))
+        cpu_before, started = cpu(), time.perf_counter()
+        results = await asyncio.gather(*(session.browse(reruns, think) for session in runs))
+        wall, cpu_seconds = time.perf_counter() - started, cpu() - cpu_before
+    finally:
+        for session in runs:
+            session.close()
+    return [*records, *(record for rs in results for record in rs)], wall, cpu_seconds
+
+
+# Laporan
+
+def percentiles(values, prefix):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {f"{prefix}_{name}": None for name in ("p50", "p95", "p99", "max", "mean")}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        f"{prefix}_p50": float(p50),
+        f"{prefix}_p95": float(p95),
+        f"{prefix}_p99": float(p99),
+        f"{prefix}_max": float(values.max()),
+        f"{prefix}_mean": float(values.mean()),
+    }
+
+
+def summarize(records, wall, cpu_seconds, peak_rss, rss_before, cold_load):
+    """Ringkasan rerun berganti tanggal (bukan muat halaman awal) dan sumber daya server.
+
+    `wall` dan `cpu_seconds` hanya mencakup fase ganti tanggal (lihat `drive`).
+    """
+    reruns = [r for r in records if r["kind"] == "rerun"]
+    loads = [r for r in records if r["kind"] == "load"]
+    return {
+        "reruns": len(reruns),
+        "page_loads": len(loads),
+        "errors": sum(r["errors"] for r in records),
+        **percentiles([r["seconds"] for r in reruns], "latency"),
+        **percentiles([r["seconds"] for r in loads], "page_load"),
+        **percentiles([r["bytes"] for r in reruns], "bytes_per_rerun"),
+        "media_bytes_per_rerun_mean": float(np.mean([r["media_bytes"] for r in reruns]))
+        if reruns
+        else None,
+        "throughput_per_second": len(reruns) / wall if wall else None,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu_seconds,
+        "cpu_seconds_per_rerun": cpu_seconds / len(reruns) if reruns else None,
+        "cpu_utilization": cpu_seconds / wall if wall else None,
+        "rss_before_bytes": rss_before,
+        "peak_rss_bytes": peak_rss,
+        "cold_load_seconds": cold_load,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(summary, baseline, threshold):
+    """Membandingkan ringkasan dengan baseline; mengembalikan daftar regresi."""
+    previous = baseline["summary"]
+    regressions = []
+    for name in COMPARED:
+        value, base = summary.get(name), previous.get(name)
+        if not value or not base:
+            continue
+        ratio = value / base
+        flag = "REGRESI" if ratio > 1 + threshold else ""
+        print(f"{name:28s} {base:16,.4f} -> {value:16,.4f} x{ratio:6.2f} {flag}")
+        if flag:
+            regressions.append({"metric": name, "value": value, "baseline": base, "ratio": ratio})
+    return regressions
+
+
+def prepare_source(args, workdir):
+    """Path main_data untuk server: --source apa adanya, atau CSV sintetis --rows baris."""
+    if args.source:
+        return args.source
+    path = Path(workdir) / "main_data.csv"
+    started = time.perf_counter()
+    generate(parse_size(args.rows), seed=args.seed).to_csv(path, index=False)
+    print(f"data sintetis {args.rows} baris: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return str(path)
+
+
+def run(args, workdir):
+    env = dict(os.environ)
+    env["MAIN_DATA_PATH"] = prepare_source(args, workdir)
+    env.setdefault("MAIN_DATA_CACHE_DIR", str(Path(workdir) / "cache"))
+    env["MAIN_DATA_RELOAD_SECONDS"] = "0"
+
+    server = Server(env, workdir)
+    try:
+        server.wait_ready(args.timeout)
+        # Muat dingin: dataset, snapshot, dan cache sumber dibangun oleh satu sesi
+        started = time.perf_counter()
+        warmup, _, _ = asyncio.run(
+            drive(server.url, 1, 0, 0, args.align, args.seed, args.timeout)
+        )
+        cold_load = time.perf_counter() - started
+        if warmup[0]["errors"]:
+            raise RuntimeError(f"Dashboard error saat muat awal:\n{server.tail()}")
+        print(f"muat dingin: {cold_load:.2f}s", file=sys.stderr)
+
+        rss_before = server.rss()
+        records, wall, cpu_seconds = asyncio.run(
+            drive(
+                server.url,
+                args.sessions,
+                args.reruns,
+                args.think,
+                args.align,
+                args.seed,
+                args.timeout,
+                server.cpu_seconds,
+            )
+        )
+        summary = summarize(records, wall, cpu_seconds, server.peak_rss, rss_before, cold_load)
+    finally:
+        server.stop()
+    return records, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--source", help="Path main_data lokal (CSV/Parquet/direktori)")
+    source.add_argument("--rows", default="100k", help="Jumlah baris data sintetis, mis. 1m")
+    parser.add_argument("--sessions", type=int, default=4, help="Jumlah sesi bersamaan")
+    parser.add_argument("--reruns", type=int, default=10, help="Ganti rentang tanggal per sesi")
+    parser.add_argument("--think", type=float, default=0.0, help="Rata-rata jeda antar rerun (s)")
+    parser.add_argument("--align", choices=["day", "month"], default="day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300, help="Batas waktu per rerun (s)")
+    parser.add_argument("--out", default="loadtest_results.json")
+    parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Batas perlambatan relatif")
+    args = parser.parse_args(argv)
+    if args.source:
+        args.rows = None
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        records, summary = run(args, workdir)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "source": args.source,
+            "rows": args.rows,
+            "sessions": args.sessions,
+            "reruns": args.reruns,
+            "think": args.think,
+            "align": args.align,
+            "seed": args.seed,
+            "settings": {name: os.environ[name] for name in SETTINGS if name in os.environ},
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "summary": summary,
+        "results": records,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(
+        f"{summary['reruns']} rerun, p50={summary['latency_p50']:.3f}s "
+        f"p95={summary['latency_p95']:.3f}s p99={summary['latency_p99']:.3f}s, "
+        f"CPU {summary['cpu_seconds_per_rerun']:.3f}s/rerun, "
+        f"puncak RSS {summary['peak_rss_bytes'] / 2**20:.0f} MiB, "
+        f"{summary['bytes_per_rerun_mean'] / 2**10:.0f} KiB/rerun, error {summary['errors']}",
+        file=sys.stderr,
+    )
+    print(f"hasil ditulis ke {args.out}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare(summary, baseline, args.threshold) or summary["errors"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Generator data sintetis berbentuk main_data untuk benchmark."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+START = pd.Timestamp("2016-09-04")
+END = pd.Timestamp("2018-08-29")
+N_CITIES = 4100
+ITEMS_PER_ORDER = 1.15
+
+PAYMENT_TYPES = ["credit_card", "boleto", "voucher", "debit_card"]
+PAYMENT_WEIGHTS = [0.74, 0.19, 0.055, 0.015]
+
+# Pusat wilayah per negara bagian: (state, lat, lng, bobot pelanggan)
+STATES = [
+    ("SP", -23.0, -47.5, 0.42),
+    ("RJ", -22.6, -43.2, 0.13),
+    ("MG", -19.5, -44.5, 0.12),
+    ("RS", -29.8, -52.0, 0.055),
+    ("PR", -24.8, -51.0, 0.05),
+    ("SC", -27.3, -49.5, 0.037),
+    ("BA", -12.8, -39.5, 0.034),
+    ("DF", -15.8, -47.9, 0.021),
+    ("ES", -19.9, -40.6, 0.02),
+    ("GO", -16.5, -49.5, 0.02),
+    ("PE", -8.3, -35.5, 0.017),
+    ("CE", -4.5, -39.2, 0.013),
+    ("PA", -2.5, -49.0, 0.01),
+    ("MT", -14.0, -55.5, 0.009),
+    ("MA", -4.5, -44.5, 0.0075),
+    ("MS", -20.5, -54.8, 0.0073),
+    ("PB", -7.2, -36.0, 0.0054),
+    ("PI", -6.5, -42.5, 0.005),
+    ("RN", -5.8, -36.0, 0.0049),
+    ("AL", -9.6, -36.3, 0.0041),
+]
+
+
+def category_names():
+    """Nama kategori produk (bahasa Inggris) dari tabel terjemahan di data/."""
+    path = DATA_DIR / "product_category_name_translation.csv"
+    return pd.read_csv(path, encoding="utf-8-sig")["product_category_name_english"].tolist()
+
+
+def city_names(n):
+    """Kota penjual nyata dari data/ diikuti nama sintetis sampai n kota."""
+    path = DATA_DIR / "sellers_dataset.csv"
+    sellers = pd.read_csv(path, dtype=str)["seller_city"].value_counts().index.tolist()
+    names = sellers[:n]
+    return names + [f"cidade_{i}" for i in range(len(names), n)]
+
+
+def hex_ids(n):
+    """n id heksadesimal 32 karakter yang unik, seperti id pada dataset Olist."""
+    digits = np.frombuffer(b"0123456789abcdef", dtype="S1")
+    shifts = np.arange(60, -4, -4, dtype=np.uint64)
+    nibbles = (np.arange(n, dtype=np.uint64)[:, None] >> shifts) & np.uint64(0xF)
+    ids = digits[nibbles.astype(np.intp)].view("S16").ravel()
+    return pd.Index(np.char.add(b"0" * 16, ids).astype(str))
+
+
+def zipf_weights(n, s=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+def order_days(rng, n):
+    """Hari pembelian dengan tren naik dan lonjakan November 2017."""
+    days = pd.date_range(START, END, freq="D")
+    t = np.linspace(0.0, 1.0, len(days))
+    weights = 0.05 + t
+    weights[(days.year == 2017) & (days.month == 11) & (days.day >= 20) & (days.day <= 26)] *= 3
+    return days.values[rng.choice(len(days), size=n, p=weights / weights.sum())]
+
+
+def generate(n_rows, seed=0):
+    """Membuat frame berbentuk main_data (sebelum `schema.compact`) dengan n_rows baris.
+
+    Satu baris mewakili satu item/pembayaran pesanan; pesanan dengan banyak item
+    berbagi order_id, tanggal, pelanggan, dan lokasi yang sama.
+    """
+    rng = np.random.default_rng(seed)
+    n_orders = max(1, int(n_rows / ITEMS_PER_ORDER))
+
+    # Atribut tingkat pesanan
+    order_of_row = np.sort(rng.integers(0, n_orders, n_rows))
+    order_item_id = np.ones(n_rows, dtype=np.int64)
+    same = np.r_[False, order_of_row[1:] == order_of_row[:-1]]
+    run_start = np.maximum.accumulate(np.where(~same, np.arange(n_rows), 0))
+    order_item_id += np.arange(n_rows) - run_start
+
+    seconds = rng.integers(0, 86400, n_orders).astype("timedelta64[s]")
+    purchase = (order_days(rng, n_orders) + seconds)[order_of_row]
+
+    states = pd.DataFrame(STATES, columns=["state", "lat", "lng", "weight"])
+    city_state = rng.choice(len(states), size=N_CITIES, p=states["weight"] / states["weight"].sum())
+    city_lat = states["lat"].to_numpy()[city_state] + rng.normal(0, 1.5, N_CITIES)
+    city_lng = states["lng"].to_numpy()[city_state] + rng.normal(0, 1.5, N_CITIES)
+    city = rng.choice(N_CITIES, size=n_orders, p=zipf_weights(N_CITIES))[order_of_row]
+    n_customers = max(1, int(n_orders * 0.97))
+    customer = rng.integers(0, n_customers, n_orders)[order_of_row]
+
+    categories = category_names()
+    category = rng.choice(len(categories), size=n_rows, p=zipf_weights(len(categories), 1.2))
+    payment = rng.choice(len(PAYMENT_TYPES), size=n_orders, p=PAYMENT_WEIGHTS)[order_of_row]
+    price = np.round(rng.lognormal(4.3, 0.9, n_rows), 2)
+    freight = np.round(rng.gamma(2.0, 10.0, n_rows), 2)
+
+    return pd.DataFrame(
+        {
+            "order_id": pd.Categorical.from_codes(order_of_row, hex_ids(n_orders)),
+            "order_item_id": order_item_id,
+            "price": price,
+            "freight_value": freight,
+            "order_purchase_timestamp": pd.to_datetime(purchase),
+            "product_category_name": pd.Categorical.from_codes(category, categories),
+            "payment_type": pd.Categorical.from_codes(payment, PAYMENT_TYPES),
+            "payment_value": np.round(price + freight, 2),
+            "customer_unique_id": pd.Categorical.from_codes(customer, hex_ids(n_customers)),
+            "customer_city": pd.Categorical.from_codes(city, city_names(N_CITIES)),
+            "customer_state": pd.Categorical.from_codes(
+                city_state[city], states["state"].tolist()
+            ),
+            "geolocation_lat": (city_lat[city] + rng.normal(0, 0.05, n_rows)).astype("float32"),
+            "geolocation_lng": (city_lng[city] + rng.normal(0, 0.05, n_rows)).astype("float32"),
+        }
+    )
@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from cohorts import cohort_retention, period_growth
+from distance import city_coverage, distance_histogram
+from distinct import PANELS as DISTINCT_PANELS
+from engine import (
+    city_frame,
+    day_bounds,
+    encode,
+    payment_frame,
+    trend_frame,
+    type_frames,
+)
+from geo import city_centroids, spatial_bins
+from profiling import Profiler, rows_of
+from schema import day_numbers, decode_months, finite, month_numbers
+
+CACHE = LRUCache(max_bytes=int(os.environ.get("METRICS_CACHE_BYTES", 256 << 20)))
+
+
+def group_totals(df, dim, measure=None):
+    """Jumlah baris (dan total `measure`) per kode dimensi; label tidak disentuh.
+
+    Ukuran NaN/inf dihitung 0, sama seperti `.sum()` pandas.
+    """
+    codes, labels = encode(df[dim])
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=len(labels))
+    if measure is None:
+        return labels, counts
+    weights = finite(df[measure].to_numpy()[valid])
+    return labels, counts, np.bincount(codes[valid], weights=weights, minlength=len(labels))
+
+
+# Filter Data by Date Input
+def filtered(df, start_date, end_date):
+    """Menyaring data berdasarkan rentang tanggal tertentu (inklusif hari terakhir)."""
+    lo, hi = day_bounds(start_date, end_date)
+    days = day_numbers(df)
+    return df[(days >= lo) & (days <= hi)]
+
+
+# Question 1
+def order_revenue_trend(df, ref):
+    """Menghitung jumlah pesanan per bulan dari dataset transaksi."""
+    months = month_numbers(day_numbers(df))
+    first = int(months.min()) if len(months) else 0
+    months = months - first
+    counts = np.bincount(months)
+    months_index = decode_months(np.arange(len(counts)) + first)
+    if ref == "order_id":
+        # Seperti `.count()` pandas: baris tanpa order_id tidak dihitung
+        orders = np.bincount(months[df[ref].notna().to_numpy()], minlength=len(counts))
+        return trend_frame(months_index, counts, None, ref, orders)
+    values = np.bincount(months, weights=finite(df[ref].to_numpy()))
+    return trend_frame(months_index, counts, values, ref)
+
+
+# Question 2
+def top_lowest_type_order(df):
+    """Menghitung dan mencari jumlah pesanan tertinggi dan terendah berdasarkan tipe produk."""
+    labels, counts, sums = group_totals(df, "product_category_name", "order_item_id")
+    return type_frames(labels, counts, np.rint(sums).astype(np.int64), "total_order")
+
+
+def top_lowest_type_sales(df):
+    """Menghitung dan mencari jumlah pendapatan tertinggi dan terendah berdasarkan tipe produk."""
+    labels, counts, sums = group_totals(df, "product_category_name", "price")
+    return type_frames(labels, counts, sums, "revenue")
+
+
+# Question 3
+def top_payment_methods(df):
+    """Menghitung metode pembayaran terbanyak"""
+    return payment_frame(*group_totals(df, "payment_type", "payment_value"))
+
+
+# Question 4
+def top_city_transaction(df):
+    """Menghitung jumlah transaksi per kota."""
+    return city_frame(*group_totals(df, "customer_city"))
+
+
+# Advanced Analysis
+def geo_top_city_transactions(df):
+    """Menghitung transaksi terbanyak berdasarkan kota"""
+    codes, _ = encode(df["customer_city"])
+    _, counts = group_totals(df, "customer_city")
+    amount = counts[codes]
+    if (codes < 0).any():
+        amount = np.where(codes >= 0, amount, np.nan)
+    return df.reset_index(drop=True).assign(transaction_amount=amount)
+
+
+# Compute Layer
+METRICS = {
+    "filtered": lambda m, s, e: filtered(m.engine.frame(), s, e),
+    "order_trend": lambda m, s, e: m.index.order_revenue_trend(s, e, "order_id"),
+    "revenue_trend": lambda m, s, e: m.index.order_revenue_trend(s, e, "price"),
+    "type_order": lambda m, s, e: m.index.top_lowest_type_order(s, e),
+    "type_sales": lambda m, s, e: m.index.top_lowest_type_sales(s, e),
+    "payment_methods": lambda m, s, e: m.index.top_payment_methods(s, e),
+    "city_transaction": lambda m, s, e: m.index.top_city_transaction(s, e),
+    "geo_city": lambda m, s, e: m.engine.geo_city(s, e),
+    "geo_city_centroids": lambda m, s, e: city_centroids(m.engine, s, e),
+    "geo_bins": lambda m, s, e: spatial_bins(m.engine, s, e),
+    # Dibentuk dari tren yang sudah di-cache, bukan pemindaian baru
+    "period_growth": lambda m, s, e: period_growth(
+        m.get("order_trend", s, e), m.get("revenue_trend", s, e)
+    ),
+    "cohort_retention": lambda m, s, e: cohort_retention(m.engine, s, e),
+    "seller_distance": lambda m, s, e: distance_histogram(m.engine, s, e),
+    "seller_coverage": lambda m, s, e: city_coverage(m.engine, s, e),
+}
+
+
+def distinct_metric(panel, mode):
+    return lambda m, s, e: panel(m.engine, s, e, mode)
+
+
+# Varian hitung order_id unik: "<metrik>:exact" dan "<metrik>:approx" (lihat `distinct`)
+METRICS.update(
+    {
+        f"{name}:{mode}": distinct_metric(panel, mode)
+        for name, panel in DISTINCT_PANELS.items()
+        for mode in ("exact", "approx")
+    }
+)
+
+
+class Metrics:
+    """Akses hasil agregasi dengan key murah: (versi dataset, rentang tanggal, metrik).
+
+    Hasil disimpan di `CACHE` dan dibagikan tanpa salinan ke semua pemanggil,
+    sehingga harus diperlakukan sebagai read-only.
+    """
+
+    def __init__(self, engine, index, version, cache=CACHE, profiler=None):
+        self.engine = engine
+        self.index = index
+        self.version = version
+        self.cache = cache
+        self.profiler = profiler or Profiler()
+
+    def date_bounds(self):
+        """Tanggal pertama dan terakhir dataset."""
+        first, last = self.index.first_day, self.index.first_day + self.index.n_days - 1
+        return pd.Timestamp(first, unit="D").date(), pd.Timestamp(last, unit="D").date()
+
+    def rows_in_range(self, start_date, end_date):
+        if self.index is None:
+            return None
+        lo, hi = self.index.bounds(start_date, end_date)
+        return int(self.index.count[hi] - self.index.count[lo])
+
+    def get(self, metric, start_date, end_date):
+        key = (self.version, str(start_date), str(end_date), metric)
+        with self.profiler.stage(f"metric:{metric}") as record, self.engine.lock.read():
+            value, hit = self.cache.lookup(
+                key, lambda: METRICS[metric](self, start_date, end_date)
+            )
+            if self.profiler.enabled:
+                record.update(
+                    rows_in=self.rows_in_range(start_date, end_date),
+                    rows_out=rows_of(value),
+                    cache="hit" if hit else "miss",
+                )
+        return value
@@ -0,0 +1,460 @@
+"""Backend query panel: pandas (default) atau DuckDB yang membaca Parquet/CSV langsung.
+
+Setiap backend menyediakan fungsi yang sama dengan `analysis` (`filtered`,
+`order_revenue_trend`, `top_lowest_type_order`, `top_lowest_type_sales`,
+`top_payment_methods`, `top_city_transaction`, `geo_top_city_transactions`)
+dengan argumen rentang tanggal, bukan frame. Hasilnya berbentuk sama persis
+sehingga dashboard tidak perlu tahu backend mana yang dipakai.
+
+- "pandas": dashboard memakai `Metrics` (engine + indeks) seperti biasa;
+  `PandasBackend` adalah fungsi `analysis` di atas frame ringkas dan menjadi
+  acuan pemeriksaan paritas.
+- "duckdb": engine embedded multi-thread (DUCKDB_THREADS) yang memindai
+  sumber langsung tanpa memuat frame. Filter `order_purchase_timestamp`
+  diteruskan ke pemindai Parquet (statistik row group) dan, untuk output
+  `etl.py`, juga ke partisi `purchase_month`. Paket `duckdb` opsional.
+
+Backend dipilih dengan DASHBOARD_BACKEND. Pemeriksaan paritas:
+    python dashboard/backends.py --source dashboard/main_data --backend duckdb
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis import (
+    CACHE,
+    Metrics,
+    filtered,
+    geo_top_city_transactions,
+    order_revenue_trend,
+    top_city_transaction,
+    top_lowest_type_order,
+    top_lowest_type_sales,
+    top_payment_methods,
+)
+from cache import LRUCache
+from cohorts import cohort_retention, period_growth, retention_frame
+from date_index import DailyIndex
+from distinct import ORDER_METRICS
+from distinct import PANELS as DISTINCT_PANELS
+from engine import CUSTOMER, PanelEngine, city_frame, payment_frame, trend_frame, type_frames
+from geo import LAT, LNG, MAP_ZOOM, POINT_BUDGET, bin_points, city_centroids, spatial_bins
+from loader import download, is_remote, load_dataset, resolve_source
+from profiling import Profiler, rows_of
+from schema import PARTITION_COLUMN, TIMESTAMP, compact, day_numbers, decode_months
+from streaming import source_files
+
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "pandas")
+THREADS = int(os.environ.get("DUCKDB_THREADS", os.cpu_count() or 1))
+
+
+class PandasBackend:
+    """Fungsi `analysis` di atas frame ringkas yang sudah dimuat ke memori."""
+
+    name = "pandas"
+
+    def __init__(self, df):
+        self.df = df
+        self.engine = None
+
+    def date_bounds(self):
+        days = day_numbers(self.df)
+        return (
+            pd.Timestamp(int(days.min()), unit="D").date(),
+            pd.Timestamp(int(days.max()), unit="D").date(),
+        )
+
+    def panel_engine(self):
+        # Panel peta dan hitung unik memakai engine array; dibangun saat pertama dibutuhkan
+        if self.engine is None:
+            self.engine = PanelEngine(self.df)
+        return self.engine
+
+    def filtered(self, start_date, end_date):
+        return filtered(self.df, start_date, end_date)
+
+    def order_revenue_trend(self, start_date, end_date, ref):
+        return order_revenue_trend(self.filtered(start_date, end_date), ref)
+
+    def top_lowest_type_order(self, start_date, end_date):
+        return top_lowest_type_order(self.filtered(start_date, end_date))
+
+    def top_lowest_type_sales(self, start_date, end_date):
+        return top_lowest_type_sales(self.filtered(start_date, end_date))
+
+    def top_payment_methods(self, start_date, end_date):
+        return top_payment_methods(self.filtered(start_date, end_date))
+
+    def top_city_transaction(self, start_date, end_date):
+        return top_city_transaction(self.filtered(start_date, end_date))
+
+    def geo_top_city_transactions(self, start_date, end_date):
+        return geo_top_city_transactions(self.filtered(start_date, end_date))
+
+    def geo_city_centroids(self, start_date, end_date, budget=POINT_BUDGET):
+        return city_centroids(self.panel_engine(), start_date, end_date, budget)
+
+    def geo_bins(self, start_date, end_date, zoom=MAP_ZOOM, budget=POINT_BUDGET):
+        return spatial_bins(self.panel_engine(), start_date, end_date, zoom, budget)
+
+    def distinct(self, metric, start_date, end_date, mode):
+        return DISTINCT_PANELS[metric](self.panel_engine(), start_date, end_date, mode)
+
+    def cohort_retention(self, start_date, end_date):
+        return cohort_retention(self.panel_engine(), start_date, end_date)
+
+
+def scan_sql(source):
+    """Ekspresi tabel DuckDB untuk file/direktori sumber (lihat `streaming.source_files`)."""
+    files = source_files(source)
+    if Path(source).is_dir():
+        # Pola glob dievaluasi ulang setiap query, sehingga file baru ikut terbaca
+        suffix = ".parquet" if files and files[0].endswith(".parquet") else ".csv"
+        files = [str(Path(source) / "**" / f"*{suffix}")]
+    listing = ", ".join("'" + file.replace("'", "''") + "'" for file in files)
+    if files[0].endswith(".parquet"):
+        # Kolom partisi hive dibaca sebagai teks 'YYYY-MM' agar bisa dipangkas per bulan
+        return (
+            f"read_parquet([{listing}], hive_partitioning = true, "
+            f"hive_types = {{'{PARTITION_COLUMN}': VARCHAR}}, union_by_name = true)"
+        )
+    return f"read_csv_auto([{listing}], union_by_name = true)"
+
+
+# Nomor bulan sejak epoch, sama seperti `schema.month_numbers`
+MONTH_SQL = f"(year({TIMESTAMP}) - 1970) * 12 + month({TIMESTAMP}) - 1"
+
+
+class DuckDBBackend:
+    """Query agregat langsung di atas sumber dengan DuckDB (multi-thread, tanpa frame)."""
+
+    name = "duckdb"
+
+    def __init__(self, source, threads=THREADS):
+        try:
+            import duckdb
+        except ImportError as exc:
+            raise ImportError(
+                "DASHBOARD_BACKEND=duckdb membutuhkan paket duckdb (pip install duckdb)"
+            ) from exc
+        self.source = source
+        self.con = duckdb.connect(config={"threads": threads})
+        self.con.execute(f"CREATE VIEW data AS SELECT * FROM {scan_sql(source)}")
+        self.columns = [row[0] for row in self.con.execute("DESCRIBE data").fetchall()]
+        self.partitioned = PARTITION_COLUMN in self.columns
+
+    def query(self, sql, params=()):
+        # Satu cursor per query: aman dipanggil dari beberapa thread panel sekaligus
+        return self.con.cursor().execute(sql, list(params))
+
+    def where(self, start_date, end_date):
+        """Predikat rentang tanggal (inklusif hari terakhir) yang bisa di-pushdown."""
+        lo = pd.Timestamp(start_date).normalize()
+        hi = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        sql = f"{TIMESTAMP} >= ? AND {TIMESTAMP} < ?"
+        params = [lo.to_pydatetime(), hi.to_pydatetime()]
+        if self.partitioned:
+            sql += f" AND {PARTITION_COLUMN} BETWEEN ? AND ?"
+            params += [lo.strftime("%Y-%m"), (hi - pd.Timedelta(days=1)).strftime("%Y-%m")]
+        return sql, params
+
+    def totals(self, start_date, end_date, key, **aggregates):
+        """{kolom: array} per nilai `key` (tanpa NULL), urut seperti kamus kategori pandas."""
+        where, params = self.where(start_date, end_date)
+        select = ", ".join(f"{expr} AS {name}" for name, expr in aggregates.items())
+        sql = (
+            f"SELECT {key} AS key, {select} FROM data "
+            f"WHERE {where} AND {key} IS NOT NULL GROUP BY 1 ORDER BY 1"
+        )
+        return self.query(sql, params).fetchnumpy()
+
+    def rows(self, start_date, end_date, columns="*"):
+        where, params = self.where(start_date, end_date)
+        if columns == "*" and self.partitioned:
+            columns = f"* EXCLUDE ({PARTITION_COLUMN})"
+        return self.query(f"SELECT {columns} FROM data WHERE {where}", params)
+
+    def date_bounds(self):
+        first, last = self.query(f"SELECT min({TIMESTAMP}), max({TIMESTAMP}) FROM data").fetchone()
+        return pd.Timestamp(first).date(), pd.Timestamp(last).date()
+
+    def filtered(self, start_date, end_date):
+        return compact(self.rows(start_date, end_date).df())
+
+    def trend(self, start_date, end_date, count="count(*)"):
+        result = self.totals(start_date, end_date, MONTH_SQL, count=count, price="sum(price)")
+        return decode_months(result["key"]), result["count"].astype(np.int64), result["price"]
+
+    def order_revenue_trend(self, start_date, end_date, ref):
+        months, counts, revenue = self.trend(start_date, end_date)
+        return trend_frame(months, counts, revenue, ref)
+
+    def category_totals(self, start_date, end_date, measure):
+        result = self.totals(
+            start_date, end_date, "product_category_name", count="count(*)", total=f"sum({measure})"
+        )
+        return pd.Index(result["key"]), result["count"].astype(np.int64), result["total"]
+
+    def top_lowest_type_order(self, start_date, end_date):
+        labels, counts, items = self.category_totals(start_date, end_date, "order_item_id")
+        return type_frames(labels, counts, items.astype(np.int64), "total_order")
+
+    def top_lowest_type_sales(self, start_date, end_date):
+        labels, counts, price = self.category_totals(start_date, end_date, "price")
+        return type_frames(labels, counts, price, "revenue")
+
+    def payments(self, start_date, end_date, count="count(*)"):
+        result = self.totals(
+            start_date, end_date, "payment_type", count=count, total="sum(payment_value)"
+        )
+        return payment_frame(
+            pd.Index(result["key"]), result["count"].astype(np.int64), result["total"]
+        )
+
+    def top_payment_methods(self, start_date, end_date):
+        return self.payments(start_date, end_date)
+
+    def cities(self, start_date, end_date, count="count(*)"):
+        result = self.totals(start_date, end_date, "customer_city", count=count)
+        return city_frame(pd.Index(result["key"]), result["count"].astype(np.int64))
+
+    def top_city_transaction(self, start_date, end_date):
+        return self.cities(start_date, end_date)
+
+    def geo_top_city_transactions(self, start_date, end_date):
+        return geo_top_city_transactions(self.filtered(start_date, end_date))
+
+    def geo_city_centroids(self, start_date, end_date, budget=POINT_BUDGET):
+        where, params = self.where(start_date, end_date)
+        sql = (
+            f"SELECT customer_city, avg({LAT}) AS {LAT}, avg({LNG}) AS {LNG}, "
+            f"count(*) AS transaction_amount FROM data WHERE {where} "
+            f"AND customer_city IS NOT NULL AND {LAT} IS NOT NULL AND {LNG} IS NOT NULL "
+            f"GROUP BY 1 ORDER BY transaction_amount DESC LIMIT {int(budget)}"
+        )
+        return self.query(sql, params).df()
+
+    def geo_bins(self, start_date, end_date, zoom=MAP_ZOOM, budget=POINT_BUDGET):
+        cursor = self.rows(start_date, end_date, f"{LAT}, {LNG}")
+        points = cursor.fetchnumpy()
+        lat = np.asarray(points[LAT], dtype=np.float64)
+        lng = np.asarray(points[LNG], dtype=np.float64)
+        valid = ~np.isnan(lat) & ~np.isnan(lng)
+        return bin_points(lat[valid], lng[valid], zoom, budget)
+
+    def distinct(self, metric, start_date, end_date, mode):
+        """Varian hitung order_id unik: COUNT DISTINCT ("exact") atau HyperLogLog ("approx")."""
+        count = "count(DISTINCT order_id)" if mode == "exact" else "approx_count_distinct(order_id)"
+        if metric == "order_trend":
+            months, counts, _ = self.trend(start_date, end_date, count)
+            return trend_frame(months, counts, None, "order_id")
+        if metric == "type_order":
+            result = self.totals(start_date, end_date, "product_category_name", count=count)
+            counts = result["count"].astype(np.int64)
+            return type_frames(pd.Index(result["key"]), counts, counts, "total_order")
+        if metric == "payment_methods":
+            return self.payments(start_date, end_date, count)
+        return self.cities(start_date, end_date, count)
+
+    def cohort_retention(self, start_date, end_date):
+        """Kohort dihitung di DuckDB; hanya pasangan (kohort, bulan ke-) yang dikirim ke numpy."""
+        where, params = self.where(start_date, end_date)
+        sql = (
+            f"WITH activity AS (SELECT DISTINCT {CUSTOMER} AS customer, {MONTH_SQL} AS month "
+            f"FROM data WHERE {where} AND {CUSTOMER} IS NOT NULL), "
+            "cohorts AS (SELECT customer, min(month) AS cohort FROM activity GROUP BY 1) "
+            "SELECT cohort, month - cohort AS offset, count(*) AS customers "
+            "FROM activity JOIN cohorts USING (customer) GROUP BY 1, 2"
+        )
+        result = self.query(sql, params).fetchnumpy()
+        return retention_frame(result["cohort"], result["offset"], result["customers"])
+
+
+BACKENDS = {"pandas": PandasBackend, "duckdb": DuckDBBackend}
+
+# Metrik dashboard di atas antarmuka backend (bandingkan `analysis.METRICS`)
+METRICS = {
+    "filtered": lambda m, s, e: m.backend.filtered(s, e),
+    "order_trend": lambda m, s, e: m.backend.order_revenue_trend(s, e, "order_id"),
+    "revenue_trend": lambda m, s, e: m.backend.order_revenue_trend(s, e, "price"),
+    "type_order": lambda m, s, e: m.backend.top_lowest_type_order(s, e),
+    "type_sales": lambda m, s, e: m.backend.top_lowest_type_sales(s, e),
+    "payment_methods": lambda m, s, e: m.backend.top_payment_methods(s, e),
+    "city_transaction": lambda m, s, e: m.backend.top_city_transaction(s, e),
+    "geo_city": lambda m, s, e: m.backend.geo_top_city_transactions(s, e),
+    "geo_city_centroids": lambda m, s, e: m.backend.geo_city_centroids(s, e),
+    "geo_bins": lambda m, s, e: m.backend.geo_bins(s, e),
+    "period_growth": lambda m, s, e: period_growth(
+        m.get("order_trend", s, e), m.get("revenue_trend", s, e)
+    ),
+    "cohort_retention": lambda m, s, e: m.backend.cohort_retention(s, e),
+}
+
+
+def distinct_metric(name, mode):
+    return lambda m, s, e: m.backend.distinct(name, s, e, mode)
+
+
+METRICS.update(
+    {
+        f"{name}:{mode}": distinct_metric(name, mode)
+        for name in ORDER_METRICS
+        for mode in ("exact", "approx")
+    }
+)
+
+
+def local_source(source=None):
+    """Sumber lokal untuk backend yang memindai file; sumber remote diunduh sekali."""
+    source = resolve_source(source)
+    return str(download(source)) if is_remote(source) else source
+
+
+def open_backend(name=BACKEND, source=None, threads=THREADS):
+    """Backend `name` untuk sumber; backend pandas memuat frame ringkas lewat `loader`."""
+    if name == "pandas":
+        return PandasBackend(load_dataset(source)[0])
+    if name == "duckdb":
+        return DuckDBBackend(local_source(source), threads)
+    raise ValueError(f"Backend {name!r} tidak dikenal, pilih salah satu dari {sorted(BACKENDS)}")
+
+
+class BackendMetrics:
+    """Pengganti `Metrics` di atas sebuah backend, dengan antarmuka `get` yang sama."""
+
+    def __init__(self, backend, version, cache=CACHE, profiler=None):
+        self.backend = backend
+        self.version = version
+        self.cache = cache
+        self.profiler = profiler or Profiler()
+
+    def date_bounds(self):
+        key = (self.version, None, None, f"{self.backend.name}:extent")
+        return self.cache.get_or_compute(key, self.backend.date_bounds)
+
+    def get(self, metric, start_date, end_date):
+        key = (self.version, str(start_date), str(end_date), f"{self.backend.name}:{metric}")
+        with self.profiler.stage(f"metric:{metric}") as record:
+            value, hit = self.cache.lookup(
+                key, lambda: METRICS[metric](self, start_date, end_date)
+            )
+            if self.profiler.enabled:
+                record.update(rows_out=rows_of(value), cache="hit" if hit else "miss")
+        return value
+
+
+# Paritas
+
+# Metrik yang dibandingkan; hasil peta bergantung pada urutan titik dengan jumlah sama
+PARITY_METRICS = [
+    "filtered",
+    "order_trend",
+    "revenue_trend",
+    "type_order",
+    "type_sales",
+    "payment_methods",
+    "city_transaction",
+    "geo_city",
+    "order_trend:exact",
+    "type_order:exact",
+    "payment_methods:exact",
+    "city_transaction:exact",
+    "period_growth",
+    "cohort_retention",
+]
+
+
+def plain(df):
+    """Frame untuk dibandingkan: kategori jadi objek dan indeks diurutkan ulang."""
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def same(expected, actual, rtol=1e-6):
+    """None bila hasil identik (float dengan toleransi `rtol`), atau pesan perbedaannya."""
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    actual = actual if isinstance(actual, tuple) else (actual,)
+    if len(expected) != len(actual):
+        return f"{len(expected)} frame vs {len(actual)} frame"
+    for left, right in zip(expected, actual):
+        try:
+            pd.testing.assert_frame_equal(
+                plain(left), plain(right), check_dtype=False, check_index_type=False, rtol=rtol
+            )
+        except AssertionError as exc:
+            return " ".join(str(exc).split())[:300]
+    return None
+
+
+def parity_ranges(first, last):
+    """Rentang uji: seluruh data, satu kuartal, satu hari, dan rentang kosong."""
+    middle = first + (last - first) / 2
+    return [
+        (first, last),
+        (middle, middle + pd.Timedelta(days=91)),
+        (middle, middle),
+        (last + pd.Timedelta(days=1), last + pd.Timedelta(days=30)),
+    ]
+
+
+def check_parity(source=None, backends=("duckdb",), metrics=PARITY_METRICS):
+    """Membandingkan setiap backend (dan `Metrics` bawaan) dengan `PandasBackend`.
+
+    Mengembalikan daftar (backend, metrik, rentang, pesan) untuk setiap perbedaan.
+    """
+    # Cache terpisah agar setiap pemanggilan benar-benar menghitung ulang
+    cache = LRUCache(max_bytes=0)
+    reference = BackendMetrics(open_backend("pandas", source), "parity", cache)
+    engine = reference.backend.panel_engine()
+    candidates = {"index": Metrics(engine, DailyIndex(engine), "parity", cache=cache)}
+    for name in backends:
+        candidates[name] = BackendMetrics(open_backend(name, source), "parity", cache)
+
+    first, last = (pd.Timestamp(day) for day in reference.backend.date_bounds())
+    failures = []
+    for lo, hi in parity_ranges(first, last):
+        span = f"{lo.date()}..{hi.date()}"
+        for metric in metrics:
+            expected = reference.get(metric, lo.date(), hi.date())
+            for name, candidate in candidates.items():
+                if name == "index" and metric == "filtered":
+                    continue
+                started = time.perf_counter()
+                message = same(expected, candidate.get(metric, lo.date(), hi.date()))
+                elapsed = (time.perf_counter() - started) * 1000
+                status = "FAIL" if message else "OK"
+                print(f"{status:4} {name:7} {metric:24} {span} {elapsed:7.1f} ms")
+                if message:
+                    print(f"     {message}")
+                    failures.append((name, metric, span, message))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Path/URL main_data (default: sama seperti dashboard)")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=[name for name in BACKENDS if name != "pandas"],
+        help="Backend yang dibandingkan dengan pandas (bisa diulang, default: semua)",
+    )
+    args = parser.parse_args(argv)
+
+    backends = args.backend or [name for name in BACKENDS if name != "pandas"]
+    failures = check_parity(args.source, backends)
+    print(f"\n{len(failures)} perbedaan")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
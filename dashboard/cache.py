@@ -0,0 +1,110 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def nbytes(value):
+    """Memperkirakan ukuran memori sebuah hasil agregasi."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Cache LRU thread-safe yang dibatasi total ukuran (byte) isinya.
+
+    Nilai dikembalikan apa adanya tanpa salinan, sehingga pemanggil tidak boleh
+    memodifikasi hasil yang didapat dari cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        size = nbytes(value)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+        return value
+
+    def lookup(self, key, compute):
+        """Seperti `get_or_compute`, tetapi juga mengembalikan apakah terjadi hit."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            return self.put(key, compute()), False
+        return value, True
+
+    def get_or_compute(self, key, compute):
+        """Mengambil hasil dari cache, atau menghitung lalu menyimpannya."""
+        return self.lookup(key, compute)[0]
+
+    def items(self):
+        """Salinan (key, nilai) semua entri tanpa mengubah urutan LRU maupun statistik."""
+        with self.lock:
+            return [(key, value) for key, (value, _) in self.entries.items()]
+
+    def invalidate(self, predicate):
+        """Menghapus entri yang key-nya memenuhi predicate, mengembalikan jumlahnya."""
+        with self.lock:
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                self.size -= self.entries.pop(key)[1]
+        return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
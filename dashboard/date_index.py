@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+
+from engine import (
+    DIMENSIONS,
+    city_frame,
+    day_bounds,
+    payment_frame,
+    trend_frame,
+    type_frames,
+)
+from schema import finite
+
+# Ukuran yang diringkas per dimensi: {dimensi: [kolom yang dijumlah]}
+DIMENSION_MEASURES = {
+    "product_category_name": ["order_item_id", "price"],
+    "payment_type": ["payment_value"],
+    "customer_city": [],
+}
+
+
+def prefix_sum(day_code, n_days, group_code=None, n_groups=1, weights=None):
+    """Membangun matriks kumulatif (n_days + 1, n_groups) dari nilai harian.
+
+    Bobot NaN/inf dihitung 0 agar satu nilai kosong tidak merusak semua total sesudahnya.
+    """
+    day_code = day_code.astype(np.int64)
+    flat = day_code if group_code is None else day_code * n_groups + group_code
+    weights = None if weights is None else finite(weights)
+    daily = np.bincount(flat, weights=weights, minlength=n_days * n_groups)
+    cum = np.zeros((n_days + 1, n_groups), dtype=daily.dtype)
+    np.cumsum(daily.reshape(n_days, n_groups), axis=0, out=cum[1:])
+    return cum
+
+
+def reserve(cum, rows, groups=1):
+    """Memastikan array kumulatif punya minimal `rows` baris dan `groups` kolom.
+
+    Kapasitas ditambah minimal 25% agar pembesaran jarang terjadi. Baris cadangan
+    berisi total terakhir dan kolom cadangan berisi nol, sehingga tetap valid.
+    """
+    matrix = cum.reshape(len(cum), -1)
+    old_rows, old_groups = matrix.shape
+    if rows <= old_rows and groups <= old_groups:
+        # Array read-only (view snapshot bersama) disalin sebelum diperbarui
+        return cum if cum.flags.writeable else cum.copy()
+    rows = max(rows, old_rows + old_rows // 4) if rows > old_rows else old_rows
+    groups = max(groups, old_groups + old_groups // 4) if groups > old_groups else old_groups
+    grown = np.zeros((rows, groups), dtype=cum.dtype)
+    grown[:old_rows, :old_groups] = matrix
+    grown[old_rows:, :old_groups] = matrix[-1]
+    return grown if cum.ndim == 2 else grown[:, 0]
+
+
+def add_daily(cum, day_code, n_days, group_code=None, n_groups=1, weights=None):
+    """Menambahkan nilai harian batch ke array kumulatif `prefix_sum` secara in-place.
+
+    Hanya baris sejak hari paling awal di batch yang diperbarui, sehingga batch
+    pesanan terbaru hanya menyentuh beberapa baris terakhir.
+    """
+    cum = reserve(cum, n_days + 1, n_groups)
+    if not len(day_code):
+        return cum
+    matrix = cum.reshape(len(cum), -1)
+    first = int(day_code.min())
+    delta = prefix_sum(day_code - first, n_days - first, group_code, matrix.shape[1], weights)
+    matrix[first + 1 : n_days + 1] += delta[1:].astype(cum.dtype, copy=False)
+    matrix[n_days + 1 :] += delta[-1].astype(cum.dtype, copy=False)
+    return cum
+
+
+class DailyIndex:
+    """Indeks prefix-sum harian agar setiap rentang tanggal dijawab dengan dua lookup.
+
+    Menyimpan jumlah baris dan total per hari secara kumulatif, untuk keseluruhan
+    data dan per kategori, metode pembayaran, dan kota. Kode grup diambil dari
+    `PanelEngine` sehingga tidak ada encoding ulang. Rentang tanggal bersifat
+    inklusif untuk seluruh hari terakhir, sama seperti `filtered`. Batch baru
+    ditambahkan secara delta lewat `append`.
+    """
+
+    def __init__(self, engine):
+        days = engine.days
+        self.first_day = int(days.min()) if len(days) else 0
+        self.n_days = int(days.max()) - self.first_day + 1 if len(days) else 0
+        day_code = days - self.first_day
+        price = engine.measures["price"]
+
+        self.count = prefix_sum(day_code, self.n_days)[:, 0]
+        self.price = prefix_sum(day_code, self.n_days, weights=price)[:, 0]
+
+        self.labels = {}
+        self.counts = {}
+        self.sums = {}
+        for dim in DIMENSIONS:
+            codes = engine.codes[dim]
+            valid = codes >= 0
+            g, d = codes[valid], day_code[valid]
+            n = len(engine.labels[dim])
+            self.labels[dim] = engine.labels[dim]
+            self.counts[dim] = prefix_sum(d, self.n_days, g, n)
+            self.sums[dim] = {
+                col: prefix_sum(d, self.n_days, g, n, engine.measures[col][valid])
+                for col in DIMENSION_MEASURES[dim]
+            }
+
+        self.set_months()
+
+    @classmethod
+    def from_arrays(cls, engine, arrays, first_day, n_days):
+        """Indeks dari array kumulatif siap pakai (mis. view snapshot `shared`)."""
+        index = cls.__new__(cls)
+        index.first_day, index.n_days = first_day, n_days
+        index.count, index.price = arrays["count"], arrays["price"]
+        index.labels = {dim: engine.labels[dim] for dim in DIMENSIONS}
+        index.counts = {dim: arrays[f"{dim}/count"] for dim in DIMENSIONS}
+        index.sums = {
+            dim: {col: arrays[f"{dim}/{col}"] for col in DIMENSION_MEASURES[dim]}
+            for dim in DIMENSIONS
+        }
+        index.set_months()
+        return index
+
+    def arrays(self):
+        """Array kumulatif (nama -> array), kebalikan `from_arrays`."""
+        arrays = {"count": self.count, "price": self.price}
+        for dim in DIMENSIONS:
+            arrays[f"{dim}/count"] = self.counts[dim]
+            for col, cum in self.sums[dim].items():
+                arrays[f"{dim}/{col}"] = cum
+        return arrays
+
+    def set_months(self):
+        months = pd.date_range(
+            pd.Timestamp(self.first_day, unit="D"), periods=self.n_days, freq="D"
+        ).to_period("M")
+        if not self.n_days:
+            # Dataset kosong (atau belum ada batch): tanpa bulan
+            self.month_starts, self.months = np.zeros(0, dtype=np.int64), months
+            return
+        self.month_starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        self.months = months[self.month_starts]
+
+    def append(self, engine, start):
+        """Menambahkan baris engine sejak posisi `start` ke indeks secara delta.
+
+        Batch bertanggal sebelum hari pertama indeks menggeser semua baris,
+        sehingga indeks dibangun ulang. Pemanggil harus memegang `engine.lock.write()`.
+        """
+        days = engine.days[start:]
+        if not len(days):
+            return
+        if self.n_days == 0 or int(days.min()) < self.first_day:
+            self.__init__(engine)
+            return
+        self.n_days = max(self.n_days, int(days.max()) - self.first_day + 1)
+        day_code = days - self.first_day
+        price = engine.measures["price"][start:]
+        self.count = add_daily(self.count, day_code, self.n_days)
+        self.price = add_daily(self.price, day_code, self.n_days, weights=price)
+
+        for dim in DIMENSIONS:
+            codes = engine.codes[dim][start:]
+            valid = codes >= 0
+            g, d = codes[valid], day_code[valid]
+            n = len(engine.labels[dim])
+            self.labels[dim] = engine.labels[dim]
+            self.counts[dim] = add_daily(self.counts[dim], d, self.n_days, g, n)
+            for col in DIMENSION_MEASURES[dim]:
+                weights = engine.measures[col][start:][valid]
+                self.sums[dim][col] = add_daily(self.sums[dim][col], d, self.n_days, g, n, weights)
+        self.set_months()
+
+    def bounds(self, start_date, end_date):
+        """Mengubah rentang tanggal menjadi posisi [lo, hi) pada array kumulatif."""
+        lo, hi = day_bounds(start_date, end_date)
+        lo = min(max(lo - self.first_day, 0), self.n_days)
+        hi = min(max(hi - self.first_day + 1, lo), self.n_days)
+        return lo, hi
+
+    def order_revenue_trend(self, start_date, end_date, ref):
+        """Tren bulanan jumlah pesanan (ref="order_id") atau pendapatan (ref="price")."""
+        lo, hi = self.bounds(start_date, end_date)
+        if lo == hi:
+            empty = np.zeros(0, dtype=self.count.dtype)
+            return trend_frame(self.months[:0], empty, empty, ref)
+        inner = self.month_starts[(self.month_starts > lo) & (self.month_starts < hi)]
+        edges = np.r_[lo, inner, hi]
+        first = np.searchsorted(self.month_starts, lo, side="right") - 1
+        months = self.months[first : first + len(edges) - 1]
+        counts = self.count[edges[1:]] - self.count[edges[:-1]]
+        revenue = self.price[edges[1:]] - self.price[edges[:-1]]
+        return trend_frame(months, counts, revenue, ref)
+
+    def dimension_totals(self, dim, start_date, end_date, measure=None):
+        """Jumlah baris (dan total ukuran) per grup dimensi dalam rentang."""
+        lo, hi = self.bounds(start_date, end_date)
+        n = len(self.labels[dim])
+        counts = self.counts[dim][hi, :n] - self.counts[dim][lo, :n]
+        if measure is None:
+            return counts
+        return counts, self.sums[dim][measure][hi, :n] - self.sums[dim][measure][lo, :n]
+
+    def top_lowest_type_order(self, start_date, end_date):
+        dim = "product_category_name"
+        counts, sums = self.dimension_totals(dim, start_date, end_date, "order_item_id")
+        return type_frames(self.labels[dim], counts, np.rint(sums).astype(np.int64), "total_order")
+
+    def top_lowest_type_sales(self, start_date, end_date):
+        dim = "product_category_name"
+        counts, sums = self.dimension_totals(dim, start_date, end_date, "price")
+        return type_frames(self.labels[dim], counts, sums, "revenue")
+
+    def top_payment_methods(self, start_date, end_date):
+        dim = "payment_type"
+        counts, sums = self.dimension_totals(dim, start_date, end_date, "payment_value")
+        return payment_frame(self.labels[dim], counts, sums)
+
+    def top_city_transaction(self, start_date, end_date):
+        dim = "customer_city"
+        counts = self.dimension_totals(dim, start_date, end_date)
+        return city_frame(self.labels[dim], counts)
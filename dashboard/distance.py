@@ -0,0 +1,438 @@
+"""Jarak pelanggan–penjual: koordinat penjual, indeks grid, dan cakupan per kota.
+
+Koordinat penjual (`data/sellers_dataset.csv`) diambil dari zip prefix-nya:
+tabel geolocation Olist bila ada di OLIST_RAW_DIR, lalu titik tengah zip prefix
+pelanggan di dataset, lalu titik tengah kota pelanggan dengan nama yang sama.
+Penjual dimasukkan ke indeks grid (sel SELLER_GRID_DEGREES derajat) sehingga
+penjual terdekat dicari cincin demi cincin dari sel pelanggan, bukan
+dibandingkan dengan semua penjual.
+
+Jarak ke penjual terdekat dihitung sekali per lokasi pelanggan unik saat
+indeks dibangun (sekali per versi dataset) dan disimpan per baris; panel per
+rentang tanggal hanya berupa bincount. Batch ingest hanya menambah jarak untuk
+baris barunya; grid penjual tidak berubah. Bila dataset punya seller_id atau
+seller_zip_code_prefix (output `etl.py`), jarak ke penjual sebenarnya per
+pesanan juga dihitung.
+
+Contoh:
+    python dashboard/distance.py --source dashboard/main_data
+"""
+
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from engine import PanelEngine
+from etl import load_table
+from geo import CITY, LAT, LNG, city_totals
+from loader import BASE_DIR, load_dataset
+
+EARTH_RADIUS_KM = 6371.0088
+RAW_DIR = Path(os.environ.get("OLIST_RAW_DIR", BASE_DIR.parent / "data"))
+GRID_DEGREES = float(os.environ.get("SELLER_GRID_DEGREES", 0.5))
+DELIVERY_RADIUS_KM = float(os.environ.get("DELIVERY_RADIUS_KM", 100))
+HISTOGRAM_KM = 50
+HISTOGRAM_MAX_KM = 2000
+# Jumlah lokasi query per langkah pencarian, membatasi memori pasangan kandidat
+QUERY_CHUNK = 4096
+
+BUILD_LOCK = threading.Lock()
+# Kolom per baris yang dibaca indeks; koordinat pelanggan dari ukuran engine
+SELLER_COLUMNS = ["customer_zip_code_prefix", "seller_id", "seller_zip_code_prefix", "seller_city"]
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Jarak great-circle (km) antar pasangan titik dalam derajat, tervektorisasi."""
+    lat1, lng1, lat2, lng2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2)
+    )
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+# Koordinat Penjual
+
+def zip_keys(values):
+    """Zip prefix sebagai float64 (NaN bila kosong) agar sumber Int32/Int64/teks cocok."""
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def city_keys(values):
+    return pd.Series(values, dtype=object).str.strip().str.lower().to_numpy()
+
+
+def key_centroids(keys, lat, lng):
+    """Titik tengah koordinat per kunci (zip prefix), tanpa kunci atau koordinat kosong."""
+    valid = ~np.isnan(keys) & ~np.isnan(lat) & ~np.isnan(lng)
+    codes, labels = pd.factorize(keys[valid])
+    counts = np.bincount(codes, minlength=len(labels))
+    return pd.DataFrame(
+        {
+            LAT: np.bincount(codes, weights=lat[valid], minlength=len(labels)) / counts,
+            LNG: np.bincount(codes, weights=lng[valid], minlength=len(labels)) / counts,
+        },
+        index=pd.Index(labels),
+    )
+
+
+def locate(keys, centroids):
+    """Koordinat setiap kunci dari tabel titik tengah; NaN bila tidak ditemukan."""
+    pos = centroids.index.get_indexer(keys)
+    found = pos >= 0
+    lat = np.where(found, centroids[LAT].to_numpy()[pos], np.nan)
+    lng = np.where(found, centroids[LNG].to_numpy()[pos], np.nan)
+    return lat, lng
+
+
+def lookup(col, index):
+    """Posisi setiap nilai kolom di `index` (-1 bila tidak ada); kategori cukup dicari sekali."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        pos = index.get_indexer(col.cat.categories)
+        codes = col.cat.codes.to_numpy()
+        return np.where(codes >= 0, pos[codes] if len(pos) else -1, -1)
+    return index.get_indexer(col)
+
+
+def zip_tiers(frame, engine, raw_dir=RAW_DIR):
+    """Tabel titik tengah berurutan prioritas: [(nama, kolom kunci, frame berindeks kunci)].
+
+    `frame` berisi kolom `SELLER_COLUMNS` untuk baris engine yang sama.
+    """
+    tiers = []
+    _, geolocation, index = load_table(raw_dir, "geolocation")
+    if geolocation is not None:
+        tiers.append(("geolocation", "zip", geolocation.set_axis(zip_keys(index))))
+    if "customer_zip_code_prefix" in frame:
+        customers = key_centroids(
+            zip_keys(frame["customer_zip_code_prefix"]),
+            engine.measures[LAT].astype(np.float64),
+            engine.measures[LNG].astype(np.float64),
+        )
+        tiers.append(("customer_zip", "zip", customers))
+    cities = city_totals(engine, slice(None))
+    cities = cities.set_axis(city_keys(cities.index))
+    # Nama kota yang sama setelah dinormalisasi: dipakai yang pertama
+    tiers.append(("customer_city", "city", cities[~cities.index.duplicated()]))
+    return tiers
+
+
+def resolve(zips, cities, tiers):
+    """(lat, lng, sumber) per kunci; kunci yang tidak ditemukan mencoba tabel berikutnya."""
+    lat = np.full(len(zips), np.nan)
+    lng = np.full(len(zips), np.nan)
+    source = np.full(len(zips), None, dtype=object)
+    for name, key, centroids in tiers:
+        missing = np.isnan(lat)
+        if not missing.any():
+            break
+        keys = (zips if key == "zip" else cities)[missing]
+        found_lat, found_lng = locate(keys, centroids)
+        found = ~np.isnan(found_lat)
+        rows = np.flatnonzero(missing)[found]
+        lat[rows], lng[rows] = found_lat[found], found_lng[found]
+        source[rows] = name
+    return lat, lng, source
+
+
+def load_sellers(raw_dir=RAW_DIR):
+    _, sellers, _ = load_table(raw_dir, "sellers")
+    return sellers.reset_index(drop=True)
+
+
+# Indeks Grid
+
+def ring(r):
+    """Offset sel (dy, dx) pada cincin ke-r di sekitar sel query."""
+    if r == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+    side = np.arange(-r, r + 1)
+    inner = np.arange(-r + 1, r)
+    dy = np.concatenate([np.full(len(side), -r), np.full(len(side), r), inner, inner])
+    dx = np.concatenate([side, side, np.full(len(inner), -r), np.full(len(inner), r)])
+    return np.stack([dy, dx], axis=1)
+
+
+class GridIndex:
+    """Indeks grid lat/lng: titik diurutkan per sel (CSR), sel dicari lewat searchsorted."""
+
+    def __init__(self, lat, lng, cell=GRID_DEGREES):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.cell = cell
+        self.origin = (0, 0)
+        if len(self.lat):
+            self.origin = (
+                int(np.floor(self.lat.min() / cell)),
+                int(np.floor(self.lng.min() / cell)),
+            )
+        iy, ix = self.cells(self.lat, self.lng)
+        self.height = int(iy.max()) + 1 if len(iy) else 0
+        self.width = int(ix.max()) + 1 if len(ix) else 0
+        keys = iy * self.width + ix
+        self.order = np.argsort(keys, kind="stable")
+        self.keys, self.starts = np.unique(keys[self.order], return_index=True)
+        self.ends = np.r_[self.starts[1:], len(keys)].astype(np.int64)
+
+    def cells(self, lat, lng):
+        iy = np.floor(np.asarray(lat) / self.cell).astype(np.int64) - self.origin[0]
+        ix = np.floor(np.asarray(lng) / self.cell).astype(np.int64) - self.origin[1]
+        return iy, ix
+
+    def candidates(self, qy, qx):
+        """Pasangan (posisi query, posisi titik) untuk titik di sel (qy, qx) setiap query."""
+        inside = np.flatnonzero((qy >= 0) & (qy < self.height) & (qx >= 0) & (qx < self.width))
+        keys = qy[inside] * self.width + qx[inside]
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        hit = self.keys[pos] == keys
+        queries, pos = inside[hit], pos[hit]
+        lengths = self.ends[pos] - self.starts[pos]
+        first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        points = np.repeat(self.starts[pos], lengths) + np.arange(int(lengths.sum())) - first
+        return np.repeat(queries, lengths), self.order[points]
+
+    def nearest(self, lat, lng):
+        """(jarak km, posisi titik) terdekat untuk setiap query; (inf, -1) bila indeks kosong."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        best = np.full(len(lat), np.inf)
+        best_point = np.full(len(lat), -1, dtype=np.int64)
+        if not len(self.keys) or not len(lat):
+            return best, best_point
+        # Batas bawah jarak ke sel di luar cincin r memakai cos lintang terbesar (paling rapat)
+        cos_max = np.cos(np.radians(max(np.abs(lat).max(), np.abs(self.lat).max())))
+        for start in range(0, len(lat), QUERY_CHUNK):
+            chunk = slice(start, start + QUERY_CHUNK)
+            self.search(lat[chunk], lng[chunk], best[chunk], best_point[chunk], cos_max)
+        return best, best_point
+
+    def search(self, lat, lng, best, best_point, cos_max):
+        """Pencarian cincin untuk satu potongan query; mengisi `best` dan `best_point`."""
+        qy, qx = self.cells(lat, lng)
+        reach = np.maximum.reduce(
+            [np.abs(qy), np.abs(qy - self.height + 1), np.abs(qx), np.abs(qx - self.width + 1)]
+        )
+        pending = np.arange(len(lat))
+        r = 0
+        while len(pending):
+            offsets = ring(r)
+            ys = (qy[pending][:, None] + offsets[None, :, 0]).ravel()
+            xs = (qx[pending][:, None] + offsets[None, :, 1]).ravel()
+            queries, points = self.candidates(ys, xs)
+            if len(queries):
+                queries = pending[queries // len(offsets)]
+                d = haversine(lat[queries], lng[queries], self.lat[points], self.lng[points])
+                # Pasangan sudah berurutan per query: minimum per segmen lewat reduceat
+                starts = np.flatnonzero(np.r_[True, queries[1:] != queries[:-1]])
+                group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(d)]))
+                mins = np.minimum.reduceat(d, starts)
+                hits = np.flatnonzero(d == mins[group])
+                hits = hits[np.r_[True, group[hits][1:] != group[hits][:-1]]]
+                queries, points, d = queries[starts], points[hits], mins
+                better = d < best[queries]
+                best[queries[better]] = d[better]
+                best_point[queries[better]] = points[better]
+            # Titik di luar cincin 0..r berjarak minimal r sel (lintang atau bujur) dari query
+            bound = 2 * EARTH_RADIUS_KM * np.arcsin(cos_max * np.sin(np.radians(r * self.cell) / 2))
+            pending = pending[(best[pending] > bound) & (reach[pending] > r)]
+            r += 1
+
+
+def unique_locations(lat, lng):
+    """Lokasi unik (tanpa NaN) dan posisi baris -> lokasi (-1 untuk koordinat kosong).
+
+    Koordinat float32 dipasangkan menjadi satu kunci uint64 (bit lat | bit lng)
+    sehingga cukup satu np.unique 1-D, bukan unique per baris yang jauh lebih lambat.
+    """
+    lat = np.asarray(lat, dtype=np.float32)
+    lng = np.asarray(lng, dtype=np.float32)
+    valid = ~np.isnan(lat) & ~np.isnan(lng)
+    keys = (lat[valid].view(np.uint32).astype(np.uint64) << np.uint64(32)) | lng[valid].view(
+        np.uint32
+    )
+    keys, inverse = np.unique(keys, return_inverse=True)
+    rows = np.full(len(lat), -1, dtype=np.int64)
+    rows[valid] = inverse
+    locations = np.stack(
+        [
+            (keys >> np.uint64(32)).astype(np.uint32).view(np.float32),
+            (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.float32),
+        ],
+        axis=1,
+    ).astype(np.float64)
+    return locations, rows
+
+
+# Indeks Jarak per Dataset
+
+class SellerIndex:
+    """Penjual terlokasi, indeks grid-nya, dan jarak per baris engine (dibangun sekali).
+
+    Hanya kolom `SELLER_COLUMNS` yang dibaca dari engine, bukan frame lengkap. Baris
+    baru dari `PanelEngine.append` ditambahkan lewat `append` tanpa membangun ulang
+    grid; tabel titik tengah (`tiers`) tetap dari data saat indeks dibangun.
+    """
+
+    def __init__(self, engine, raw_dir=RAW_DIR, cell=GRID_DEGREES):
+        self.rows = len(engine.days)
+        frame = engine.columns(SELLER_COLUMNS)
+        self.tiers = zip_tiers(frame, engine, raw_dir)
+        sellers = load_sellers(raw_dir)
+        lat, lng, source = resolve(
+            zip_keys(sellers["seller_zip_code_prefix"]),
+            city_keys(sellers["seller_city"]),
+            self.tiers,
+        )
+        self.sellers = sellers.assign(**{LAT: lat, LNG: lng, "resolved_by": source})
+        located = self.sellers[~np.isnan(lat)].reset_index(drop=True)
+        self.grid = GridIndex(located[LAT], located[LNG], cell)
+
+        customer_lat = engine.measures[LAT]
+        customer_lng = engine.measures[LNG]
+        self.locations = 0
+        self.nearest_km = self.nearest_distances(customer_lat, customer_lng)
+        self.order_km = self.order_distances(frame, customer_lat, customer_lng)
+
+    def append(self, engine, start):
+        """Menambahkan jarak untuk baris engine sejak posisi `start` (batch ingest).
+
+        Pemanggil harus memegang `engine.lock.write()` bila engine dibagikan.
+        """
+        lat, lng = engine.measures[LAT][start:], engine.measures[LNG][start:]
+        nearest = self.nearest_distances(lat, lng)
+        self.nearest_km = np.concatenate([self.nearest_km[:start], nearest])
+        if self.order_km is not None:
+            order = self.order_distances(engine.columns(SELLER_COLUMNS, start), lat, lng)
+            self.order_km = np.concatenate([self.order_km[:start], order])
+        self.rows = len(engine.days)
+
+    def nearest_distances(self, lat, lng):
+        """Jarak ke penjual terdekat per baris, dihitung sekali per lokasi unik."""
+        locations, rows = unique_locations(lat, lng)
+        self.locations += len(locations)
+        nearest, _ = self.grid.nearest(locations[:, 0], locations[:, 1])
+        nearest = np.where(np.isinf(nearest), np.nan, nearest)
+        return np.where(rows >= 0, nearest[rows] if len(nearest) else np.nan, np.nan)
+
+    def order_distances(self, frame, lat, lng):
+        """Jarak pelanggan ke penjual pesanan per baris, atau None bila dataset tanpa penjual."""
+        if "seller_id" in frame:
+            pos = lookup(frame["seller_id"], pd.Index(self.sellers["seller_id"]))
+            found = pos >= 0
+            seller_lat = np.where(found, self.sellers[LAT].to_numpy()[pos], np.nan)
+            seller_lng = np.where(found, self.sellers[LNG].to_numpy()[pos], np.nan)
+        elif "seller_zip_code_prefix" in frame:
+            cities = frame["seller_city"] if "seller_city" in frame else np.full(len(frame), None)
+            seller_lat, seller_lng, _ = resolve(
+                zip_keys(frame["seller_zip_code_prefix"]), city_keys(cities), self.tiers
+            )
+        else:
+            return None
+        return haversine(lat, lng, seller_lat, seller_lng)
+
+    def stats(self):
+        resolved = self.sellers["resolved_by"].value_counts().to_dict()
+        return {
+            "sellers": len(self.sellers),
+            "resolved": resolved,
+            "unresolved": int(self.sellers["resolved_by"].isna().sum()),
+            "grid_cells": len(self.grid.keys),
+            "customer_locations": self.locations,
+            "order_distance": self.order_km is not None,
+        }
+
+
+def seller_index(engine):
+    """SellerIndex milik engine, dibangun sekali; baris baru (ingest) ditambahkan delta."""
+    with BUILD_LOCK:
+        index = engine.sellers
+        if index is None or index.rows > len(engine.days):
+            engine.sellers = SellerIndex(engine)
+        elif index.rows < len(engine.days):
+            index.append(engine, index.rows)
+    return engine.sellers
+
+
+# Panel
+
+def distance_histogram(engine, start_date, end_date):
+    """Jumlah transaksi per bin jarak (HISTOGRAM_KM km) ke penjual terdekat dan penjual pesanan.
+
+    Jarak di atas HISTOGRAM_MAX_KM masuk ke bin terakhir.
+    """
+    index = seller_index(engine)
+    mask = engine.mask(start_date, end_date)
+    n_bins = HISTOGRAM_MAX_KM // HISTOGRAM_KM + 1
+    df = pd.DataFrame({"distance_km": np.arange(n_bins) * HISTOGRAM_KM})
+    series = {"nearest_seller": index.nearest_km}
+    if index.order_km is not None:
+        series["order_seller"] = index.order_km
+    for name, km in series.items():
+        km = km[mask]
+        km = km[~np.isnan(km)]
+        bins = np.minimum(km // HISTOGRAM_KM, n_bins - 1).astype(np.int64)
+        df[name] = np.bincount(bins, minlength=n_bins)
+    return df
+
+
+def city_coverage(engine, start_date, end_date, radius=DELIVERY_RADIUS_KM):
+    """Per kota: transaksi, rata-rata jarak ke penjual terdekat, dan porsi dalam `radius` km."""
+    index = seller_index(engine)
+    mask = engine.mask(start_date, end_date)
+    codes = engine.codes[CITY][mask]
+    nearest = index.nearest_km[mask]
+    valid = (codes >= 0) & ~np.isnan(nearest)
+    codes, nearest = codes[valid], nearest[valid]
+
+    n = len(engine.labels[CITY])
+    counts = np.bincount(codes, minlength=n)
+    keep = np.flatnonzero(counts)
+    df = pd.DataFrame(
+        {
+            CITY: engine.labels[CITY][keep],
+            "transaction_amount": counts[keep],
+            "nearest_seller_km": np.bincount(codes, weights=nearest, minlength=n)[keep]
+            / counts[keep],
+            "within_radius": np.bincount(codes, weights=nearest <= radius, minlength=n)[keep]
+            / counts[keep],
+        }
+    )
+    if index.order_km is not None:
+        order = index.order_km[mask][valid]
+        has_order = ~np.isnan(order)
+        order_counts = np.bincount(codes[has_order], minlength=n)[keep]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["order_seller_km"] = (
+                np.bincount(codes[has_order], weights=order[has_order], minlength=n)[keep]
+                / order_counts
+            )
+    return df.sort_values(by="transaction_amount", ascending=False).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Path/URL main_data (default: sama seperti dashboard)")
+    parser.add_argument("--start", default="1970-01-01")
+    parser.add_argument("--end", default="2262-04-11")
+    args = parser.parse_args(argv)
+
+    engine = PanelEngine(load_dataset(args.source)[0])
+    started = time.perf_counter()
+    index = seller_index(engine)
+    print(f"Indeks dibangun dalam {time.perf_counter() - started:.2f}s: {index.stats()}")
+    started = time.perf_counter()
+    coverage = city_coverage(engine, args.start, args.end)
+    print(f"\nCakupan per kota ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    print(coverage.head(15).to_string(index=False))
+    print(f"\n{distance_histogram(engine, args.start, args.end).head(15).to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Penghitungan order_id unik untuk panel pesanan: eksak dan HyperLogLog.
+
+Panel pesanan bawaan menghitung baris hasil join, sehingga pesanan dengan
+beberapa item atau pembayaran terhitung lebih dari sekali. Modul ini memberi
+dua mode tambahan:
+
+- "exact": sort pada pasangan kode (grup, order_id) lalu hitung yang unik.
+- "approx": sketsa HyperLogLog per hari dan per grup dimensi yang bisa
+  digabung antar rentang tanggal maupun antar partisi/chunk (`Sketches.merge`).
+
+Hash order_id dihitung dari teks id (bukan kode kategori) sehingga sketsa dari
+proses atau partisi berbeda tetap bisa digabung.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    DIMENSIONS,
+    ORDER,
+    append_rows,
+    city_frame,
+    day_bounds,
+    payment_frame,
+    trend_frame,
+    type_frames,
+)
+from schema import decode_months, month_numbers
+
+MODES = ["rows", "exact", "approx"]
+COUNT_MODE = os.environ.get("ORDER_COUNT_MODE", "rows")
+# 2^p register per sketsa; galat standar sekitar 1.04 / sqrt(2^p)
+PRECISION = int(os.environ.get("HLL_PRECISION", 10))
+# Metrik pesanan yang punya varian distinct ("<metrik>:exact" / "<metrik>:approx")
+ORDER_METRICS = ["order_trend", "type_order", "payment_methods", "city_transaction"]
+
+BUILD_LOCK = threading.Lock()
+
+
+def metric_name(metric, mode=COUNT_MODE):
+    """Nama metrik untuk mode hitung; mode "rows" memakai metrik lama."""
+    if mode == "rows" or metric not in ORDER_METRICS:
+        return metric
+    return f"{metric}:{mode}"
+
+
+# HyperLogLog
+
+def order_hashes(labels):
+    """Hash 64-bit stabil (antar proses) untuk setiap label order_id."""
+    return pd.util.hash_array(np.asarray(labels, dtype=object))
+
+
+def hll_keys(hashes, precision=PRECISION):
+    """(register, rank) HyperLogLog dari hash 64-bit."""
+    register = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    # 32 bit berikutnya cukup untuk rank dan eksak sebagai float64
+    rest = ((hashes << np.uint64(precision)) >> np.uint64(32)).astype(np.float64)
+    _, exponent = np.frexp(rest)
+    rank = np.where(rest > 0, 33 - exponent, 33)
+    return register, rank.astype(np.uint8)
+
+
+def estimate(registers):
+    """Estimasi kardinalitas per baris matriks register (..., m)."""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum(axis=-1)
+    zeros = (registers == 0).sum(axis=-1)
+    # Koreksi rentang kecil: linear counting
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where(small, linear, raw)
+
+
+class Sketches:
+    """Satu sketsa HyperLogLog per label; digabung dengan maksimum per register."""
+
+    def __init__(self, labels, registers):
+        self.labels = pd.Index(labels)
+        self.registers = registers
+
+    @classmethod
+    def empty(cls, precision=PRECISION):
+        return cls(pd.Index([]), np.zeros((0, 1 << precision), dtype=np.uint8))
+
+    @classmethod
+    def from_values(cls, labels, codes, order_ids, precision=PRECISION):
+        """Sketsa per label dari kode grup dan teks order_id setiap baris."""
+        valid = (codes >= 0) & pd.notna(order_ids)
+        register, rank = hll_keys(order_hashes(order_ids[valid]), precision)
+        registers = np.zeros((len(labels), 1 << precision), dtype=np.uint8)
+        np.maximum.at(registers, (codes[valid], register), rank)
+        return cls(labels, registers)
+
+    def merge(self, other):
+        """Sketsa gabungan (label disatukan, register diambil maksimum)."""
+        labels = self.labels.union(other.labels, sort=False)
+        registers = np.zeros((len(labels), self.registers.shape[1]), dtype=np.uint8)
+        for sketches in (self, other):
+            position = labels.get_indexer(sketches.labels)
+            registers[position] = np.maximum(registers[position], sketches.registers)
+        return Sketches(labels, registers)
+
+    def counts(self):
+        """Perkiraan jumlah order_id unik per label."""
+        return pd.Series(np.rint(estimate(self.registers)).astype(np.int64), index=self.labels)
+
+
+ENTRY_COLUMNS = ["day", "group", "register", "rank"]
+
+
+def dedupe(days, group, register, rank, precision=PRECISION):
+    """Entri urut per (hari, grup, register) dengan rank maksimum per kombinasi."""
+    key = (days.astype(np.int64) * (int(group.max(initial=0)) + 1) + group) << precision
+    key += register
+    order = np.lexsort((rank, key))
+    key = key[order]
+    last = np.r_[key[1:] != key[:-1], True] if len(key) else np.zeros(0, dtype=bool)
+    values = (days, group, register, rank)
+    return {col: v[order][last] for col, v in zip(ENTRY_COLUMNS, values)}
+
+
+class SketchIndex:
+    """Sketsa HyperLogLog order_id per hari dan per grup dimensi, disimpan jarang.
+
+    Setiap entri berisi (hari, grup, register, rank) dengan rank maksimum per
+    kombinasi; entri diurutkan per hari sehingga rentang tanggal cukup diiris
+    dengan `searchsorted`, lalu register digabung dengan maksimum per grup.
+    Jumlah entri per hari dibatasi 2^p per grup, jadi jauh lebih kecil dari
+    jumlah baris pada data besar.
+    """
+
+    def __init__(self, engine, precision=PRECISION):
+        self.precision = precision
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.entries = {}
+        self.size = {}
+        self.append(engine, 0)
+
+    def append(self, engine, start):
+        """Menambahkan baris engine sejak posisi `start`.
+
+        Batch bertanggal setelah entri terakhir cukup ditambahkan di akhir;
+        bila tidak, hanya entri sejak hari pertama batch yang digabung ulang
+        (lihat `add`). Pemanggil harus memegang
+        `engine.lock.write()` bila engine dibagikan.
+        """
+        labels = engine.order_labels
+        if len(labels) > len(self.hashes):
+            self.hashes = np.concatenate(
+                [self.hashes, order_hashes(labels[len(self.hashes) :])]
+            )
+        orders = engine.order_codes[start:]
+        valid = orders >= 0
+        days = engine.days[start:][valid].astype(np.int32)
+        register, rank = hll_keys(self.hashes[orders[valid]], self.precision)
+        groups = {"total": np.zeros(len(days), dtype=np.int32)}
+        for dim in DIMENSIONS:
+            groups[dim] = engine.codes[dim][start:][valid].astype(np.int32)
+        for name, group in groups.items():
+            keep = group >= 0
+            self.add(name, days[keep], group[keep], register[keep], rank[keep])
+
+    def add(self, name, days, group, register, rank):
+        new = dedupe(days, group, register.astype(np.uint16), rank, self.precision)
+        old, n = self.entries.get(name), self.size.get(name, 0)
+        if old is not None and len(new["day"]):
+            # Hari yang tumpang tindih dengan entri lama digabung ulang; sisanya utuh
+            cut = int(np.searchsorted(old["day"][:n], new["day"][0]))
+            if cut < n:
+                new = dedupe(
+                    *(np.r_[old[col][cut:n], new[col]] for col in ENTRY_COLUMNS), self.precision
+                )
+                n = cut
+        base = old or {col: values[:0] for col, values in new.items()}
+        self.entries[name] = {col: append_rows(base[col], n, new[col]) for col in ENTRY_COLUMNS}
+        self.size[name] = n + len(new["day"])
+
+    def view(self, name, lo, hi):
+        """Entri untuk hari [lo, hi] inklusif (tanpa salinan)."""
+        n = self.size[name]
+        days = self.entries[name]["day"][:n]
+        a, b = np.searchsorted(days, [lo, hi + 1])
+        return {col: values[a:b] for col, values in self.entries[name].items()}
+
+    def query(self, name, lo, hi, n_groups):
+        """Matriks register (n_groups, 2^p) untuk hari [lo, hi] inklusif."""
+        entries = self.view(name, lo, hi)
+        registers = np.zeros((n_groups, 1 << self.precision), dtype=np.uint8)
+        np.maximum.at(registers, (entries["group"], entries["register"]), entries["rank"])
+        return registers
+
+    def monthly(self, lo, hi):
+        """(nomor bulan, matriks register per bulan) untuk rentang hari."""
+        entries = self.view("total", lo, hi)
+        months = month_numbers(entries["day"])
+        first = int(months.min()) if len(months) else 0
+        n_months = int(months.max()) - first + 1 if len(months) else 0
+        registers = np.zeros((n_months, 1 << self.precision), dtype=np.uint8)
+        np.maximum.at(registers, (months - first, entries["register"]), entries["rank"])
+        return np.arange(n_months) + first, registers
+
+    def sketches(self, engine, dim, start_date, end_date):
+        """`Sketches` per label dimensi untuk rentang tanggal (bisa digabung antar partisi)."""
+        lo, hi = day_bounds(start_date, end_date)
+        registers = self.query(dim, lo, hi, len(engine.labels[dim]))
+        return Sketches(engine.labels[dim], registers)
+
+
+def sketch_index(engine):
+    """SketchIndex milik engine, dibangun sekali saat pertama dibutuhkan."""
+    with BUILD_LOCK:
+        if engine.sketches is None:
+            engine.sketches = SketchIndex(engine)
+    return engine.sketches
+
+
+# Exact
+
+def distinct_counts(group_codes, order_codes, n_groups, n_orders):
+    """Jumlah order_id unik per grup lewat sort pada kode (grup, order_id)."""
+    valid = (group_codes >= 0) & (order_codes >= 0)
+    n_orders = max(n_orders, 1)
+    key = group_codes[valid].astype(np.int64) * n_orders + order_codes[valid]
+    unique = np.unique(key)
+    return np.bincount(unique // n_orders, minlength=n_groups)
+
+
+def group_counts(engine, dim, start_date, end_date, mode):
+    """Jumlah order_id unik per grup dimensi (urutan label engine)."""
+    n = len(engine.labels[dim])
+    if mode == "exact":
+        mask = engine.mask(start_date, end_date)
+        return distinct_counts(
+            engine.codes[dim][mask], engine.order_codes[mask], n, len(engine.order_labels)
+        )
+    sketches = sketch_index(engine).sketches(engine, dim, start_date, end_date)
+    return sketches.counts().to_numpy()
+
+
+def order_trend(engine, start_date, end_date, mode):
+    if mode == "exact":
+        mask = engine.mask(start_date, end_date)
+        month = engine.month_codes[mask] - engine.first_month
+        counts = distinct_counts(
+            month, engine.order_codes[mask], engine.n_months, len(engine.order_labels)
+        )
+        return trend_frame(engine.months, counts, None, "order_id")
+    lo, hi = day_bounds(start_date, end_date)
+    months, registers = sketch_index(engine).monthly(lo, hi)
+    counts = np.rint(estimate(registers)).astype(np.int64)
+    return trend_frame(decode_months(months), counts, None, "order_id")
+
+
+def type_order(engine, start_date, end_date, mode):
+    dim = "product_category_name"
+    counts = group_counts(engine, dim, start_date, end_date, mode)
+    return type_frames(engine.labels[dim], counts, counts, "total_order")
+
+
+def payment_methods(engine, start_date, end_date, mode):
+    dim = "payment_type"
+    counts = group_counts(engine, dim, start_date, end_date, mode)
+    _, sums = engine.group_totals(dim, engine.mask(start_date, end_date), "payment_value")
+    return payment_frame(engine.labels[dim], counts, sums)
+
+
+def city_transaction(engine, start_date, end_date, mode):
+    dim = "customer_city"
+    counts = group_counts(engine, dim, start_date, end_date, mode)
+    return city_frame(engine.labels[dim], counts)
+
+
+PANELS = {
+    "order_trend": order_trend,
+    "type_order": type_order,
+    "payment_methods": payment_methods,
+    "city_transaction": city_transaction,
+}
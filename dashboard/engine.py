@@ -0,0 +1,362 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from schema import day_numbers, decode_months, finite, month_numbers
+
+DIMENSIONS = ["product_category_name", "payment_type", "customer_city"]
+ORDER = "order_id"
+# Kunci pelanggan untuk kohort retensi (`cohorts`)
+CUSTOMER = "customer_unique_id"
+MEASURES = ["order_item_id", "price", "payment_value", "geolocation_lat", "geolocation_lng"]
+PANELS = [
+    "order_trend",
+    "revenue_trend",
+    "type_order",
+    "type_sales",
+    "payment_methods",
+    "city_transaction",
+    "geo_city",
+]
+
+
+def encode(col):
+    """Mengembalikan (codes, labels) untuk sebuah kolom dimensi."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), col.cat.categories
+    codes, labels = pd.factorize(col)
+    return codes, pd.Index(labels)
+
+
+def extend_codes(labels, col):
+    """Mengodekan kolom batch memakai kamus `labels`; label baru ditambahkan di akhir."""
+    codes, batch_labels = encode(col)
+    position = labels.get_indexer(batch_labels)
+    new = position < 0
+    if new.any():
+        position[new] = len(labels) + np.arange(int(new.sum()))
+        labels = labels.append(batch_labels[new])
+    mapped = position[np.maximum(codes, 0)] if len(position) else np.zeros(len(codes), np.int64)
+    codes = np.where(codes >= 0, mapped, -1)
+    return codes.astype(np.min_scalar_type(-max(len(labels), 1))), labels
+
+
+def append_rows(buffer, size, values):
+    """Menyalin `values` setelah `size` elemen pertama buffer.
+
+    Bila kapasitas kurang, buffer baru dialokasikan dua kali lipat sehingga biaya
+    append sebanding dengan ukuran batch (amortized), bukan dengan seluruh histori.
+    """
+    needed = size + len(values)
+    dtype = np.result_type(buffer, values)
+    # Buffer read-only (view snapshot bersama) selalu disalin, tidak pernah ditulis
+    if len(buffer) < needed or dtype != buffer.dtype or not buffer.flags.writeable:
+        grown = np.empty(max(needed, 2 * size), dtype=dtype)
+        grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:needed] = values
+    return buffer
+
+
+def day_bounds(start_date, end_date):
+    """Rentang tanggal sebagai nomor hari [lo, hi] inklusif."""
+    lo = (pd.Timestamp(start_date) - pd.Timestamp(0)).days
+    hi = (pd.Timestamp(end_date) - pd.Timestamp(0)).days
+    return lo, hi
+
+
+class ReadWriteLock:
+    """Banyak pembaca bersamaan, satu penulis eksklusif (dipakai saat append)."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.readers = 0
+
+    @contextmanager
+    def read(self):
+        with self.cond:
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.cond:
+            self.cond.wait_for(lambda: not self.readers)
+            yield
+
+
+# Result Shapes
+def trend_frame(months, counts, values, ref, orders=None):
+    """Bentuk hasil `order_revenue_trend` dari total per bulan.
+
+    Bulan yang tampil dipilih dari jumlah baris `counts`; `orders` (bila ada)
+    menggantikannya sebagai jumlah pesanan, mis. hanya baris dengan order_id.
+    """
+    keep = counts > 0
+    if ref == "order_id":
+        orders = counts if orders is None else orders
+        return pd.DataFrame({"month": months[keep], "order": orders[keep]})
+    return pd.DataFrame({"month": months[keep], "revenue": values[keep]})
+
+
+def type_frames(labels, counts, sums, column):
+    """Bentuk hasil `top_lowest_type_*`: (top_df, lowest_df)."""
+    keep = counts > 0
+    df = pd.DataFrame({"product_type": labels[keep], column: sums[keep]})
+    top_df = df.sort_values(column, ascending=False).reset_index(drop=True)
+    lowest_df = df.sort_values(column, ascending=True).reset_index(drop=True)
+    return top_df, lowest_df
+
+
+def payment_frame(labels, counts, sums):
+    """Bentuk hasil `top_payment_methods`."""
+    keep = counts > 0
+    df = pd.DataFrame(
+        {
+            "payment_type": labels[keep],
+            "transaction_count": counts[keep],
+            "payment_value": sums[keep],
+        }
+    )
+    return df.sort_values(by="transaction_count", ascending=False).reset_index(drop=True)
+
+
+def city_frame(labels, counts):
+    """Bentuk hasil `top_city_transaction`."""
+    keep = counts > 0
+    df = pd.DataFrame({"customer_city": labels[keep], "transaction_amount": counts[keep]})
+    return df.sort_values(by="transaction_amount", ascending=False).reset_index(drop=True)
+
+
+class PanelEngine:
+    """Menghitung agregat semua panel dashboard dalam satu pemindaian data (`run`).
+
+    Memakai langsung kode kategori, nomor hari (int32), dan kolom ukuran dari
+    frame ringkas (`schema.compact`) tanpa salinan; nomor bulan dihitung sekali.
+    Label hanya didekode saat membentuk hasil. Frame input tidak pernah
+    dimodifikasi; batch baru ditambahkan lewat `append`.
+    """
+
+    def __init__(self, df):
+        days = day_numbers(df)
+        arrays = {"days": days, "month_codes": month_numbers(days)}
+        labels = {}
+        for dim in [*DIMENSIONS, ORDER, CUSTOMER]:
+            arrays[dim], labels[dim] = encode(df[dim])
+        for col in MEASURES:
+            arrays[col] = df[col].to_numpy()
+        self.setup(arrays, labels, df)
+
+    @classmethod
+    def from_arrays(cls, arrays, labels, load_columns=None):
+        """Engine dari array siap pakai (mis. view read-only snapshot `shared`).
+
+        `load_columns(names)` mengembalikan kolom `names` (None = semua) dari baris
+        awal; dipanggil hanya bila hasil per baris (`columns`, `frame`) dibutuhkan,
+        sehingga frame lengkap tidak perlu ada di memori.
+        """
+        engine = cls.__new__(cls)
+        engine.setup(arrays, labels, None, load_columns)
+        return engine
+
+    def setup(self, arrays, labels, df, load_columns=None):
+        self.df = df
+        self.load_columns = load_columns
+        self.batches = []
+        self.buffers = {}
+        self.lock = ReadWriteLock()
+        self.days = arrays["days"]
+        self.month_codes = arrays["month_codes"]
+        self.set_months()
+        self.codes = {dim: arrays[dim] for dim in DIMENSIONS}
+        self.labels = {dim: labels[dim] for dim in DIMENSIONS}
+        self.order_codes, self.order_labels = arrays[ORDER], labels[ORDER]
+        self.customer_codes, self.customer_labels = arrays[CUSTOMER], labels[CUSTOMER]
+        self.measures = {col: arrays[col] for col in MEASURES}
+        # SketchIndex HyperLogLog order_id, dibangun saat pertama dibutuhkan (`distinct`)
+        self.sketches = None
+        # SellerIndex jarak ke penjual, dibangun saat pertama dibutuhkan (`distance`)
+        self.sellers = None
+
+    def arrays(self):
+        """Semua array per baris (nama -> array) dan kamus label, kebalikan `from_arrays`."""
+        arrays = {
+            "days": self.days,
+            "month_codes": self.month_codes,
+            ORDER: self.order_codes,
+            CUSTOMER: self.customer_codes,
+            **self.codes,
+            **self.measures,
+        }
+        labels = {ORDER: self.order_labels, CUSTOMER: self.customer_labels}
+        return arrays, {**self.labels, **labels}
+
+    def set_months(self):
+        n = len(self.month_codes)
+        self.first_month = int(self.month_codes.min()) if n else 0
+        self.n_months = int(self.month_codes.max()) - self.first_month + 1 if n else 0
+        self.months = decode_months(np.arange(self.n_months) + self.first_month)
+
+    def append(self, batch):
+        """Menambahkan batch frame ringkas, mengembalikan posisi baris pertamanya.
+
+        Label baru ditambahkan di akhir kamus sehingga kode lama tetap berlaku.
+        Pemanggil harus memegang `lock.write()`.
+        """
+        start = len(self.days)
+        days = day_numbers(batch)
+        values = {"days": days, "month_codes": month_numbers(days)}
+        for dim in DIMENSIONS:
+            values[dim], self.labels[dim] = extend_codes(self.labels[dim], batch[dim])
+        values[ORDER], self.order_labels = extend_codes(self.order_labels, batch[ORDER])
+        values[CUSTOMER], self.customer_labels = extend_codes(
+            self.customer_labels, batch[CUSTOMER]
+        )
+        for col in MEASURES:
+            values[col] = batch[col].to_numpy()
+
+        arrays, _ = self.arrays()
+        size = start + len(batch)
+        for name, new in values.items():
+            buffer = append_rows(self.buffers.get(name, arrays[name]), start, new)
+            self.buffers[name] = buffer
+            arrays[name] = buffer[:size]
+        self.days = arrays.pop("days")
+        self.month_codes = arrays.pop("month_codes")
+        self.order_codes = arrays.pop(ORDER)
+        self.customer_codes = arrays.pop(CUSTOMER)
+        self.codes = {dim: arrays[dim] for dim in DIMENSIONS}
+        self.measures = {col: arrays[col] for col in MEASURES}
+        self.batches.append(batch)
+        self.set_months()
+        return start
+
+    def truncate(self, size):
+        """Membuang batch sejak baris `size`, kebalikan `append` yang gagal diterapkan.
+
+        Label baru tetap ada di kamus; tanpa baris hitungannya 0 sehingga tidak tampil.
+        Pemanggil harus memegang `lock.write()`.
+        """
+        rows = len(self.days)
+        while self.batches and rows > size:
+            rows -= len(self.batches.pop())
+        self.days = self.days[:size]
+        self.month_codes = self.month_codes[:size]
+        self.order_codes = self.order_codes[:size]
+        self.customer_codes = self.customer_codes[:size]
+        self.codes = {dim: codes[:size] for dim, codes in self.codes.items()}
+        self.measures = {col: values[:size] for col, values in self.measures.items()}
+        self.set_months()
+
+    def columns(self, names=None, start=0):
+        """Kolom `names` (None = semua) untuk baris sejak posisi `start` (frame awal + batch).
+
+        Kolom yang tidak ada dilewati. Hanya baris awal yang dimuat dari `load_columns`;
+        baris batch diambil dari `batches`.
+        """
+
+        def select(df):
+            return df if names is None else df[[col for col in names if col in df]]
+
+        def initial():
+            return select(self.df) if self.df is not None else self.load_columns(names)
+
+        base = len(self.days) - sum(len(batch) for batch in self.batches)
+        parts = []
+        if start < base:
+            df = initial()
+            parts.append(df.iloc[start:] if start else df)
+        offset = base
+        for batch in self.batches:
+            if offset + len(batch) > start:
+                parts.append(select(batch).iloc[max(start - offset, 0) :])
+            offset += len(batch)
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return initial().iloc[:0]
+        return pd.concat(parts, ignore_index=True)
+
+    def frame(self):
+        """Seluruh baris (frame awal + batch); hanya untuk hasil per baris."""
+        return self.columns()
+
+    def mask(self, start_date, end_date):
+        lo, hi = day_bounds(start_date, end_date)
+        return (self.days >= lo) & (self.days <= hi)
+
+    def group_totals(self, dim, mask, measure=None):
+        """Jumlah baris (dan total `measure`) per kode dimensi untuk baris `mask`.
+
+        Kode dimensi disaring sekali; ukuran NaN/inf dihitung 0 seperti `.sum()` pandas.
+        """
+        codes = self.codes[dim][mask]
+        valid = codes >= 0
+        codes = codes[valid]
+        n = len(self.labels[dim])
+        counts = np.bincount(codes, minlength=n)
+        if measure is None:
+            return counts
+        weights = finite(self.measures[measure][mask][valid])
+        return counts, np.bincount(codes, weights=weights, minlength=n)
+
+    def run(self, start_date, end_date, panels=None):
+        """Mengembalikan {nama panel: hasil} dengan bentuk yang sama seperti fungsi lama.
+
+        Mask tanggal dihitung sekali dan dipakai semua panel; panel yang berbagi
+        dimensi (tren pesanan/pendapatan, tipe produk, kota) dihitung bersama.
+        """
+        panels = PANELS if panels is None else panels
+        mask = self.mask(start_date, end_date)
+        results = {}
+
+        if "order_trend" in panels or "revenue_trend" in panels:
+            month = self.month_codes[mask] - self.first_month
+            counts = np.bincount(month, minlength=self.n_months)
+            # Seperti `.count()` pandas: baris tanpa order_id tidak dihitung sebagai pesanan
+            orders = np.bincount(month[self.order_codes[mask] >= 0], minlength=self.n_months)
+            revenue = np.bincount(
+                month, weights=finite(self.measures["price"][mask]), minlength=self.n_months
+            )
+            results["order_trend"] = trend_frame(self.months, counts, None, "order_id", orders)
+            results["revenue_trend"] = trend_frame(self.months, counts, revenue, "price")
+
+        if "type_order" in panels or "type_sales" in panels:
+            dim = "product_category_name"
+            counts, items = self.group_totals(dim, mask, "order_item_id")
+            _, price = self.group_totals(dim, mask, "price")
+            items = np.rint(items).astype(np.int64)
+            results["type_order"] = type_frames(self.labels[dim], counts, items, "total_order")
+            results["type_sales"] = type_frames(self.labels[dim], counts, price, "revenue")
+
+        if "payment_methods" in panels:
+            dim = "payment_type"
+            counts, sums = self.group_totals(dim, mask, "payment_value")
+            results["payment_methods"] = payment_frame(self.labels[dim], counts, sums)
+
+        if "city_transaction" in panels or "geo_city" in panels:
+            dim = "customer_city"
+            counts = self.group_totals(dim, mask)
+            results["city_transaction"] = city_frame(self.labels[dim], counts)
+            if "geo_city" in panels:
+                codes = self.codes[dim][mask]
+                amount = counts[codes]
+                if (codes < 0).any():
+                    amount = np.where(codes >= 0, amount, np.nan)
+                results["geo_city"] = (
+                    self.frame()[mask].reset_index(drop=True).assign(transaction_amount=amount)
+                )
+
+        return {name: results[name] for name in panels}
+
+    def geo_city(self, start_date, end_date):
+        """Baris dalam rentang beserta jumlah transaksi kotanya (`transaction_amount`)."""
+        return self.run(start_date, end_date, ["geo_city"])["geo_city"]
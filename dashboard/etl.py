@@ -0,0 +1,371 @@
+"""Membangun main_data dari tabel mentah Olist di data/ lewat hash index.
+
+Setiap tabel dibaca dan diindeks paralel; join memakai `pd.Index.get_indexer`
+(hash lookup) pada product_id, seller_id, order_id, customer_id, dan zip prefix.
+Kategori produk diterjemahkan ke bahasa Inggris. Output berupa Parquet yang
+dipartisi per bulan pembelian dan bisa langsung dimuat dashboard.
+
+Contoh:
+    python dashboard/etl.py --raw data/ --out dashboard/main_data
+    python dashboard/etl.py --raw data/ --out build/main_data --csv build/main_data.csv --strict
+"""
+
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from loader import LOCAL_DATASET
+from schema import PARTITION_COLUMN, TIMESTAMP
+
+# {tabel: (kunci utama atau None, kolom yang dibaca)}
+TABLES = {
+    "orders": (
+        "order_id",
+        ["order_id", "customer_id", "order_status", TIMESTAMP],
+    ),
+    "order_items": (
+        None,
+        ["order_id", "order_item_id", "product_id", "seller_id", "price", "freight_value"],
+    ),
+    "order_payments": (
+        None,
+        ["order_id", "payment_sequential", "payment_type", "payment_installments", "payment_value"],
+    ),
+    "customers": (
+        "customer_id",
+        [
+            "customer_id",
+            "customer_unique_id",
+            "customer_zip_code_prefix",
+            "customer_city",
+            "customer_state",
+        ],
+    ),
+    "products": ("product_id", ["product_id", "product_category_name"]),
+    "sellers": (
+        "seller_id",
+        ["seller_id", "seller_zip_code_prefix", "seller_city", "seller_state"],
+    ),
+    "geolocation": (
+        None,
+        ["geolocation_zip_code_prefix", "geolocation_lat", "geolocation_lng"],
+    ),
+    "product_category_name_translation": (
+        "product_category_name",
+        ["product_category_name", "product_category_name_english"],
+    ),
+}
+OPTIONAL_TABLES = {"geolocation", "product_category_name_translation"}
+
+# Kolom identitas dibaca sebagai string agar hash index tidak bergantung tipe
+STRING_COLUMNS = {
+    "order_id",
+    "customer_id",
+    "product_id",
+    "seller_id",
+    "customer_unique_id",
+}
+ZIP_COLUMNS = {"customer_zip_code_prefix", "seller_zip_code_prefix", "geolocation_zip_code_prefix"}
+
+OUTPUT_COLUMNS = [
+    "order_id",
+    "order_item_id",
+    "price",
+    "freight_value",
+    TIMESTAMP,
+    "order_status",
+    "product_id",
+    "product_category_name",
+    "seller_id",
+    "seller_zip_code_prefix",
+    "seller_city",
+    "seller_state",
+    "payment_sequential",
+    "payment_type",
+    "payment_installments",
+    "payment_value",
+    "customer_unique_id",
+    "customer_zip_code_prefix",
+    "customer_city",
+    "customer_state",
+    "geolocation_lat",
+    "geolocation_lng",
+]
+
+
+def table_path(raw_dir, name):
+    """Mencari file tabel: `<name>_dataset.csv`, `olist_<name>_dataset.csv`, atau `<name>.csv`."""
+    raw_dir = Path(raw_dir)
+    for candidate in (f"{name}_dataset.csv", f"olist_{name}_dataset.csv", f"{name}.csv"):
+        if (raw_dir / candidate).exists():
+            return raw_dir / candidate
+    return None
+
+
+def read_table(path, columns):
+    """Membaca satu tabel mentah; kolom yang hilang menjadi error yang jelas."""
+    dtype = {col: str for col in columns if col in STRING_COLUMNS}
+    dtype.update({col: "Int32" for col in columns if col in ZIP_COLUMNS})
+    df = pd.read_csv(path, encoding="utf-8-sig", dtype=dtype)
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"{path.name}: kolom tidak ditemukan: {', '.join(missing)}")
+    return df[columns]
+
+
+def unique_index(values, table, key):
+    """Hash index atas kunci utama; kunci duplikat adalah data mentah yang rusak."""
+    index = pd.Index(values)
+    if not index.is_unique:
+        dupes = index[index.duplicated()].unique()[:5].tolist()
+        raise ValueError(f"{table}.{key} tidak unik, contoh: {dupes}")
+    return index
+
+
+def load_table(raw_dir, name):
+    """Membaca dan mengindeks satu tabel; dijalankan paralel untuk semua tabel."""
+    key, columns = TABLES[name]
+    path = table_path(raw_dir, name)
+    if path is None:
+        if name in OPTIONAL_TABLES:
+            return name, None, None
+        raise FileNotFoundError(f"Tabel {name} tidak ditemukan di {raw_dir}")
+    df = read_table(path, columns)
+    if name == "geolocation":
+        # Satu zip prefix punya banyak titik; dipakai rata-ratanya
+        df = df.groupby("geolocation_zip_code_prefix", sort=False)[
+            ["geolocation_lat", "geolocation_lng"]
+        ].mean()
+        return name, df.reset_index(drop=True), unique_index(df.index, name, "zip_code_prefix")
+    index = unique_index(df[key], name, key) if key else None
+    return name, df, index
+
+
+def expand(left_codes, right_codes, n_groups):
+    """Pasangan posisi (kiri, kanan) untuk inner join satu-ke-banyak pada kode grup.
+
+    Kode -1 (kunci tanpa pasangan) tidak ikut. Baris kanan diurutkan per kode,
+    lalu setiap baris kiri diulang sebanyak jumlah pasangannya.
+    """
+    valid = np.flatnonzero(right_codes >= 0)
+    order = valid[np.argsort(right_codes[valid], kind="stable")]
+    counts = np.bincount(right_codes[valid], minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    reps = np.where(left_codes >= 0, counts[np.maximum(left_codes, 0)], 0)
+    left_pos = np.repeat(np.arange(len(left_codes)), reps)
+    offset = np.arange(len(left_pos)) - np.repeat(np.cumsum(reps) - reps, reps)
+    right_pos = order[np.repeat(starts[np.maximum(left_codes, 0)], reps) + offset]
+    return left_pos, right_pos
+
+
+def take(df, positions, columns=None):
+    """Mengambil baris per posisi; posisi -1 (tanpa pasangan) menjadi NA."""
+    return {
+        col: pd.api.extensions.take(df[col].values, positions, allow_fill=True)
+        for col in columns or df.columns
+    }
+
+
+class JoinReport:
+    """Waktu dan jumlah baris per tahap join, ditampilkan di akhir build."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, stage, rows_left, rows_right, rows_out, unmatched, started):
+        self.rows.append(
+            {
+                "stage": stage,
+                "rows_left": rows_left,
+                "rows_right": rows_right,
+                "rows_out": rows_out,
+                "unmatched": unmatched,
+                "seconds": round(time.perf_counter() - started, 4),
+            }
+        )
+
+    def frame(self):
+        return pd.DataFrame(self.rows)
+
+
+def load_tables(raw_dir, workers=None):
+    """Membaca semua tabel paralel; mengembalikan ({nama: df}, {nama: index})."""
+    with ThreadPoolExecutor(max_workers=workers or min(len(TABLES), os.cpu_count() or 1)) as pool:
+        loaded = list(pool.map(lambda name: load_table(raw_dir, name), TABLES))
+    frames = {name: df for name, df, _ in loaded}
+    indexes = {name: index for name, _, index in loaded}
+    return frames, indexes
+
+
+def build(raw_dir, workers=None, translate=True, strict=False):
+    """Menggabungkan tabel mentah menjadi frame main_data; mengembalikan (df, JoinReport)."""
+    report = JoinReport()
+
+    started = time.perf_counter()
+    frames, indexes = load_tables(raw_dir, workers)
+    report.add(
+        "read+index", sum(len(df) for df in frames.values() if df is not None), 0, 0, 0, started
+    )
+
+    orders = frames["orders"]
+    items = frames["order_items"]
+    payments = frames["order_payments"]
+
+    # order_items -> orders (banyak-ke-satu)
+    started = time.perf_counter()
+    item_order = indexes["orders"].get_indexer(items["order_id"])
+    orphans = int((item_order < 0).sum())
+    matched = int((item_order >= 0).sum())
+    report.add("order_items->orders", len(items), len(orders), matched, orphans, started)
+    check(strict, orphans, "order_items tanpa order")
+
+    # order_items x order_payments pada order_id (satu-ke-banyak)
+    started = time.perf_counter()
+    payment_order = indexes["orders"].get_indexer(payments["order_id"])
+    item_pos, payment_pos = expand(item_order, payment_order, len(orders))
+    unpaid = int(np.setdiff1d(item_order[item_order >= 0], payment_order).size)
+    report.add("items x payments", len(items), len(payments), len(item_pos), unpaid, started)
+    check(strict, int((payment_order < 0).sum()), "order_payments tanpa order")
+
+    out = take(items, item_pos)
+    out.update(take(payments, payment_pos, TABLES["order_payments"][1][1:]))
+    order_pos = item_order[item_pos]
+    out.update(take(orders, order_pos, [TIMESTAMP, "order_status"]))
+
+    for table, key, columns in (
+        ("products", "product_id", ["product_category_name"]),
+        ("sellers", "seller_id", ["seller_zip_code_prefix", "seller_city", "seller_state"]),
+    ):
+        started = time.perf_counter()
+        pos = indexes[table].get_indexer(out[key])
+        missing = int((pos < 0).sum())
+        report.add(f"->{table}", len(out[key]), len(frames[table]), len(pos), missing, started)
+        check(strict, missing, f"{key} tanpa pasangan di {table}")
+        out.update(take(frames[table], pos, columns))
+
+    started = time.perf_counter()
+    pos = indexes["customers"].get_indexer(orders["customer_id"].to_numpy()[order_pos])
+    missing = int((pos < 0).sum())
+    report.add("->customers", len(pos), len(frames["customers"]), len(pos), missing, started)
+    check(strict, missing, "customer_id tanpa pasangan di customers")
+    out.update(take(frames["customers"], pos, TABLES["customers"][1][1:]))
+
+    if indexes["geolocation"] is not None:
+        started = time.perf_counter()
+        geo = frames["geolocation"]
+        pos = indexes["geolocation"].get_indexer(out["customer_zip_code_prefix"])
+        missing = int((pos < 0).sum())
+        report.add("->geolocation", len(pos), len(geo), len(pos), missing, started)
+        out.update(take(geo, pos))
+    else:
+        out["geolocation_lat"] = np.full(len(item_pos), np.nan, dtype=np.float32)
+        out["geolocation_lng"] = np.full(len(item_pos), np.nan, dtype=np.float32)
+
+    df = pd.DataFrame(out)[OUTPUT_COLUMNS]
+    df[TIMESTAMP] = pd.to_datetime(df[TIMESTAMP])
+
+    if translate and indexes["product_category_name_translation"] is not None:
+        started = time.perf_counter()
+        df["product_category_name"], missing = translate_categories(
+            df["product_category_name"], frames["product_category_name_translation"]
+        )
+        report.add(
+            "translate categories",
+            len(df),
+            len(frames["product_category_name_translation"]),
+            len(df),
+            missing,
+            started,
+        )
+    return df, report
+
+
+def translate_categories(names, translation):
+    """Nama kategori Portugis -> Inggris; kategori tanpa terjemahan dipertahankan."""
+    mapping = translation.set_index("product_category_name")["product_category_name_english"]
+    english = names.map(mapping)
+    untranslated = english.isna() & names.notna()
+    return english.fillna(names), int(untranslated.sum())
+
+
+def check(strict, count, message):
+    if strict and count:
+        raise ValueError(f"{count} baris: {message}")
+
+
+def write_months(df, root, name, schema=None):
+    """Menulis satu file `<name>.parquet` per bulan pembelian di bawah `root`."""
+    months = pd.to_datetime(df[TIMESTAMP]).dt.strftime("%Y-%m")
+    written = []
+    for month, part in df.groupby(months, sort=True):
+        target = Path(root) / f"{PARTITION_COLUMN}={month}"
+        target.mkdir(parents=True, exist_ok=True)
+        if schema is not None:
+            part = part.reindex(columns=schema.names)
+        table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+        tmp = target / f".{name}.parquet.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, target / f"{name}.parquet")
+        written.append(month)
+    return written
+
+
+def write_batch(df, out_dir, name):
+    """Menambahkan batch ke output terpartisi dengan skema yang sama seperti file lama."""
+    existing = sorted(Path(out_dir).rglob("*.parquet"))
+    schema = pq.read_schema(existing[0]).remove_metadata() if existing else None
+    if schema is not None:
+        df = df.assign(**{TIMESTAMP: pd.to_datetime(df[TIMESTAMP])})
+    return write_months(df, out_dir, name, schema)
+
+
+def write_partitioned(df, out_dir):
+    """Menulis Parquet terpartisi per bulan pembelian, mengganti output lama secara atomik."""
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    write_months(df, tmp, "part-0")
+    if out_dir.exists():
+        old = out_dir.with_name(out_dir.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(out_dir, old)
+        os.replace(tmp, out_dir)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, out_dir)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw", default="data", help="Direktori tabel mentah Olist")
+    parser.add_argument("--out", default=str(LOCAL_DATASET), help="Direktori output Parquet")
+    parser.add_argument("--csv", help="Tulis juga main_data dalam format CSV")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--no-translate", action="store_true", help="Pertahankan nama kategori Portugis"
+    )
+    parser.add_argument("--strict", action="store_true", help="Gagal bila ada kunci tanpa pasangan")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    df, report = build(args.raw, args.workers, not args.no_translate, args.strict)
+    write_started = time.perf_counter()
+    write_partitioned(df, args.out)
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+    report.add("write", len(df), 0, len(df), 0, write_started)
+    print(report.frame().to_string(index=False))
+    print(f"\n{len(df):,} baris -> {args.out} ({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import hashlib
+import io
+import os
+
+import matplotlib
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from cache import LRUCache
+from cohorts import RETENTION_MONTHS, ROLLING_MONTHS
+from profiling import Profiler
+
+CACHE = LRUCache(max_bytes=int(os.environ.get("FIGURE_CACHE_BYTES", 64 << 20)))
+DPI = 200
+
+
+# Visualization Function
+def order_revenue_trend_viz(df):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.plot(
+        df["month"].astype(str),
+        df["order" if "order" in df else "revenue"],
+        marker="o",
+        linestyle="-",
+        color="b",
+    )
+    ax.set_xlabel(None)
+    ax.set_ylabel(None)
+    ax.set_xticklabels(df["month"].astype(str), rotation=45)
+    return fig
+
+
+def top_lowest_order_revenue_viz(top, lowest, title):
+    fig = Figure(figsize=(35, 15))
+    ax = fig.subplots(nrows=1, ncols=2)
+    colors = ["#72BCD4", "#D3D3D3", "#D3D3D3", "#D3D3D3", "#D3D3D3"]
+    x = "total_order" if "total_order" in top else "revenue"
+
+    sns.barplot(
+        x=x,
+        y="product_type",
+        data=top.head(5),
+        palette=colors,
+        ax=ax[0],
+    )
+    ax[0].set_ylabel(None)
+    ax[0].set_xlabel("Total Order", fontsize=30)
+    ax[0].set_title(f"Tipe Produk {title} Tertinggi", fontsize=50)
+    ax[0].tick_params(axis="y", labelsize=35)
+    ax[0].tick_params(axis="x", labelsize=30)
+
+    sns.barplot(
+        x=x,
+        y="product_type",
+        data=lowest.sort_values(by=x, ascending=True).head(5),
+        palette=colors,
+        ax=ax[1],
+    )
+    ax[1].set_ylabel(None)
+    ax[1].set_xlabel("Total Order", fontsize=30)
+    ax[1].set_title(f"Tipe Produk {title} Terendah", fontsize=50)
+    ax[1].invert_xaxis()
+    ax[1].yaxis.set_label_position("right")
+    ax[1].yaxis.tick_right()
+    ax[1].tick_params(axis="y", labelsize=35)
+    ax[1].tick_params(axis="x", labelsize=30)
+    return fig
+
+
+def payment_type_distributions_viz(df, ref):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    colors_ = ["#72BCD4", "#D3D3D3", "#D3D3D3", "#D3D3D3"]
+
+    sns.barplot(
+        y=ref,
+        x="payment_type",
+        data=df,
+        palette=colors_,
+        ax=ax,
+    )
+    ax.set_title(
+        "Jumlah Transaksi Dari Masing-Masing Metode Pembayaran",
+        loc="center",
+        fontsize=15,
+    )
+    ax.set_ylabel(None)
+    ax.set_xlabel(None)
+    ax.tick_params(axis="x", labelsize=12)
+    return fig
+
+
+def top_city_viz(df):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    colors = ["#72BCD4" if i == 0 else "#D3D3D3" for i in range(len(df))]
+    ax.barh(
+        df["customer_city"],
+        df["transaction_amount"],
+        color=colors,
+    )
+    ax.set_title("Top 5 Kota Berdasarkan Jumlah Transaksi")
+    ax.invert_yaxis()
+    return fig
+
+
+def period_growth_viz(df, ref):
+    fig = Figure(figsize=(10, 7))
+    ax = fig.subplots(nrows=2, sharex=True, gridspec_kw={"height_ratios": [2, 1]})
+    months = df["month"].astype(str)
+    ax[0].plot(months, df[ref], marker="o", linestyle="-", color="b", label="Bulanan")
+    ax[0].plot(
+        months,
+        df[f"{ref}_rolling"],
+        linestyle="--",
+        color="#72BCD4",
+        label=f"Rata-rata {ROLLING_MONTHS} Bulan",
+    )
+    ax[0].legend()
+
+    mom = df[f"{ref}_mom"] * 100
+    ax[1].bar(months, mom, color=["#72BCD4" if v >= 0 else "#D3D3D3" for v in mom], label="MoM")
+    ax[1].plot(months, df[f"{ref}_yoy"] * 100, marker="o", color="b", label="YoY")
+    ax[1].axhline(0, color="grey", linewidth=0.8)
+    ax[1].set_ylabel("Pertumbuhan (%)")
+    ax[1].legend()
+    ax[1].tick_params(axis="x", rotation=45)
+    return fig
+
+
+def cohort_retention_viz(df):
+    # Lewati kolom "customers" dan bulan ke-0 (selalu 100%)
+    retention = df.iloc[:, 2 : RETENTION_MONTHS + 2] * 100
+    retention.index = retention.index.astype(str)
+    fig = Figure(figsize=(12, max(4, 0.35 * len(retention))))
+    ax = fig.subplots()
+    if retention.empty:
+        ax.text(0.5, 0.5, "Tidak ada pelanggan kembali pada rentang ini", ha="center")
+        ax.set_axis_off()
+        return fig
+    sns.heatmap(
+        retention,
+        annot=True,
+        fmt=".1f",
+        cmap="Blues",
+        cbar=False,
+        annot_kws={"fontsize": 8},
+        ax=ax,
+    )
+    ax.set_title("Retensi Pelanggan per Kohort (%)")
+    ax.set_xlabel("Bulan Sejak Pembelian Pertama")
+    ax.set_ylabel(None)
+    return fig
+
+
+def seller_distance_viz(df):
+    # Bin kosong di ujung kanan tidak digambar
+    counts = df.drop(columns="distance_km")
+    last = max(int(counts.to_numpy().sum(axis=1).nonzero()[0].max(initial=0)) + 1, 1)
+    df = df.head(last)
+    labels = [f"{km:g}" for km in df["distance_km"]]
+    if last == len(counts):
+        labels[-1] = f"\u2265{labels[-1]}"
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.bar(labels, df["nearest_seller"], color="#72BCD4", label="Penjual Terdekat")
+    if "order_seller" in df:
+        ax.step(labels, df["order_seller"], where="mid", color="b", label="Penjual Pesanan")
+    ax.set_xlabel("Jarak ke Penjual (km)")
+    ax.set_ylabel("Jumlah Transaksi")
+    ax.tick_params(axis="x", rotation=45)
+    ax.legend()
+    return fig
+
+
+def seller_coverage_viz(df, radius):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.barh(df["customer_city"], df["within_radius"] * 100, color="#72BCD4")
+    for y, km in enumerate(df["nearest_seller_km"]):
+        ax.text(1, y, f"rata-rata {km:.0f} km", va="center", fontsize=9)
+    ax.set_xlim(0, 100)
+    ax.set_xlabel(f"Transaksi dengan Penjual dalam {radius:g} km (%)")
+    ax.set_title("Cakupan Penjual pada Kota dengan Transaksi Terbanyak")
+    ax.invert_yaxis()
+    return fig
+
+
+# Rendering
+def fingerprint(value):
+    """Hash stabil untuk tabel agregat dan parameter gaya sebuah figure."""
+    digest = hashlib.sha1()
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            digest.update(fingerprint(item).encode())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value.astype(str), index=False).values.tobytes())
+        columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr(list(columns)).encode())
+    else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def style_key():
+    """Hash rcParams matplotlib aktif (termasuk tema seaborn) untuk kunci cache figure."""
+    return hashlib.sha1(repr(sorted(matplotlib.rcParams.items())).encode()).hexdigest()
+
+
+def render(viz, *args, fmt="png", dpi=DPI, cache=CACHE, profiler=None):
+    """Menggambar figure menjadi bytes PNG/SVG, memakai cache bila pernah dibuat.
+
+    Fungsi viz membuat `Figure` langsung tanpa pyplot, sehingga beberapa panel aman
+    dirender paralel di thread. Setelah disimpan, isi figure dibersihkan (`clf`) agar
+    axes, artist, dan salinan data plot langsung dilepas, tidak menunggu garbage collector.
+    Kunci cache memuat gaya aktif (`style_key`), sehingga mengganti tema tidak
+    mengembalikan gambar lama.
+    """
+    profiler = profiler or Profiler()
+
+    def draw():
+        buffer = io.BytesIO()
+        fig = viz(*args)
+        try:
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+        finally:
+            fig.clf()
+        return buffer.getvalue()
+
+    with profiler.stage(f"render:{viz.__name__}") as record:
+        key = (viz.__name__, fingerprint(args), fmt, dpi, style_key())
+        data, hit = cache.lookup(key, draw)
+        record.update(cache="hit" if hit else "miss", payload_bytes=len(data))
+    return data
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+LAT = "geolocation_lat"
+LNG = "geolocation_lng"
+CITY = "customer_city"
+
+MAP_ZOOM = 4
+POINT_BUDGET = int(os.environ.get("MAP_POINT_BUDGET", 5000))
+CELLS_PER_TILE = 64
+
+
+def points(engine, selection):
+    """Kode kota dan koordinat float64 baris terpilih (mask atau posisi), tanpa NaN."""
+    codes = engine.codes[CITY][selection]
+    lat = engine.measures[LAT][selection].astype(np.float64)
+    lng = engine.measures[LNG][selection].astype(np.float64)
+    valid = ~np.isnan(lat) & ~np.isnan(lng)
+    return codes[valid], lat[valid], lng[valid]
+
+
+def city_totals(engine, selection):
+    """Titik tengah koordinat dan jumlah transaksi per kota (berindeks nama kota)."""
+    codes, lat, lng = points(engine, selection)
+    valid = codes >= 0
+    codes, lat, lng = codes[valid], lat[valid], lng[valid]
+
+    n = len(engine.labels[CITY])
+    counts = np.bincount(codes, minlength=n)
+    keep = np.flatnonzero(counts)
+    return pd.DataFrame(
+        {
+            LAT: np.bincount(codes, weights=lat, minlength=n)[keep] / counts[keep],
+            LNG: np.bincount(codes, weights=lng, minlength=n)[keep] / counts[keep],
+            "transaction_amount": counts[keep],
+        },
+        index=pd.Index(engine.labels[CITY][keep], name=CITY),
+    )
+
+
+def city_centroids(engine, start_date, end_date, budget=POINT_BUDGET):
+    """Satu baris per kota: titik tengah koordinat dan jumlah transaksi.
+
+    Hanya `budget` kota dengan transaksi terbanyak yang dikembalikan.
+    """
+    df = city_totals(engine, engine.mask(start_date, end_date))
+    df = df.sort_values(by="transaction_amount", ascending=False)
+    return df.head(budget).reset_index()
+
+
+def cell_size(zoom):
+    """Ukuran sel grid (derajat) untuk tingkat zoom peta web-mercator."""
+    return 360.0 / (2**zoom) / CELLS_PER_TILE
+
+
+def grid_bins(lat, lng, size):
+    """Mengelompokkan titik ke sel grid berukuran `size` derajat (berindeks nomor sel)."""
+    ix = np.floor((lng + 180.0) / size).astype(np.int64)
+    iy = np.floor((lat + 90.0) / size).astype(np.int64)
+    cells, inverse = np.unique(iy * (int(360.0 / size) + 1) + ix, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(cells))
+    return pd.DataFrame(
+        {
+            LAT: np.bincount(inverse, weights=lat, minlength=len(cells)) / counts,
+            LNG: np.bincount(inverse, weights=lng, minlength=len(cells)) / counts,
+            "transaction_amount": counts,
+        },
+        index=pd.Index(cells, name="cell"),
+    )
+
+
+def spatial_bins(engine, start_date, end_date, zoom=MAP_ZOOM, budget=POINT_BUDGET):
+    """Agregasi titik transaksi ke grid sesuai zoom, tidak melebihi `budget` titik.
+
+    Bila jumlah sel melebihi budget, ukuran sel digandakan sampai muat. Ukuran
+    sel akhir disimpan di `attrs["cell_size"]` untuk `merge_bins`.
+    """
+    _, lat, lng = points(engine, engine.mask(start_date, end_date))
+    return bin_points(lat, lng, zoom, budget)
+
+
+def bin_points(lat, lng, zoom=MAP_ZOOM, budget=POINT_BUDGET):
+    """Inti `spatial_bins` untuk koordinat float64 tanpa NaN dari sumber mana pun."""
+    size = cell_size(zoom)
+    df = grid_bins(lat, lng, size)
+    while len(df) > budget:
+        size *= 2
+        df = grid_bins(lat, lng, size)
+    df = df.sort_values(by="transaction_amount", ascending=False)
+    df.attrs["cell_size"] = size
+    return df
+
+
+def add_means(left, right):
+    """Menggabungkan dua hasil titik tengah berindeks sama, berbobot jumlah transaksi."""
+    count = left["transaction_amount"].add(right["transaction_amount"], fill_value=0)
+    df = pd.DataFrame(
+        {
+            col: (left[col] * left["transaction_amount"]).add(
+                right[col] * right["transaction_amount"], fill_value=0
+            )
+            / count
+            for col in (LAT, LNG)
+        }
+    )
+    df["transaction_amount"] = count.astype(np.int64)
+    return df.sort_values(by="transaction_amount", ascending=False)
+
+
+def merge_centroids(cached, engine, rows, budget=POINT_BUDGET):
+    """Menambahkan titik baris `rows` (posisi di engine) ke hasil `city_centroids`.
+
+    Mengembalikan None bila hasil lama sudah terpotong budget, karena kota di
+    luar hasil tidak diketahui; hasil tersebut harus dihitung ulang.
+    """
+    if len(cached) >= budget:
+        return None
+    df = add_means(cached.set_index(CITY), city_totals(engine, rows))
+    return df.head(budget).reset_index()
+
+
+def merge_bins(cached, engine, rows, budget=POINT_BUDGET):
+    """Menambahkan titik baris `rows` ke hasil `spatial_bins` pada ukuran sel yang sama.
+
+    Mengembalikan None bila ukuran sel tidak diketahui atau jumlah sel melebihi
+    budget (ukuran sel harus digandakan); hasil tersebut harus dihitung ulang.
+    """
+    size = cached.attrs.get("cell_size")
+    if size is None:
+        return None
+    _, lat, lng = points(engine, rows)
+    df = add_means(cached, grid_bins(lat, lng, size))
+    if len(df) > budget:
+        return None
+    df.attrs["cell_size"] = size
+    return df
@@ -0,0 +1,223 @@
+"""Mode ingest inkremental: batch pesanan baru digabung tanpa memuat ulang dataset.
+
+Aktif bila env MAIN_DATA_DROP_DIR diisi. Setiap file baru (*.csv / *.parquet
+dengan kolom seperti main_data) di direktori tersebut dipadatkan, ditambahkan
+ke `PanelEngine` dan `DailyIndex` secara delta, disimpan ke sumber lokal agar
+ikut dimuat setelah restart, lalu dipindah ke `processed/` (atau `failed/`).
+Batch diterapkan di memori lebih dulu dan disimpan terakhir; bila salah satunya
+gagal, perubahan di memori dibatalkan sehingga memori dan sumber tetap sama.
+
+Entri cache yang rentang tanggalnya tidak menyentuh tanggal batch tetap
+dipakai. Entri geo yang terkena digabung dengan titik batch; entri lain yang
+terkena dihapus dan dihitung ulang dari indeks (dua lookup per rentang).
+Penulis file sebaiknya menulis ke nama sementara lalu me-rename ke direktori
+drop agar file setengah jadi tidak terbaca.
+
+Contoh:
+    MAIN_DATA_DROP_DIR=incoming/ streamlit run dashboard/dashboard.py
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from analysis import CACHE
+from engine import CUSTOMER, DIMENSIONS, MEASURES, ORDER, day_bounds
+from etl import write_batch
+from geo import merge_bins, merge_centroids
+from loader import is_remote
+from schema import TIMESTAMP, compact, day_numbers, decode_days
+
+logger = logging.getLogger(__name__)
+
+DROP_DIR = os.environ.get("MAIN_DATA_DROP_DIR")
+POLL_SECONDS = float(os.environ.get("INGEST_POLL_SECONDS", 5))
+PATTERNS = ("*.csv", "*.parquet")
+
+# Metrik yang hasil cache-nya bisa digabung dengan baris batch: {metrik: fungsi merge}
+MERGEABLE = {
+    "geo_city_centroids": merge_centroids,
+    "geo_bins": merge_bins,
+}
+
+
+def pending(drop_dir):
+    """File batch yang menunggu di direktori drop, urut dari yang paling lama."""
+    drop_dir = Path(drop_dir)
+    files = [f for pattern in PATTERNS for f in drop_dir.glob(pattern) if f.is_file()]
+    return sorted(files, key=lambda f: (f.stat().st_mtime_ns, f.name))
+
+
+def read_batch(path):
+    """Membaca satu file batch mentah; kolom yang dibutuhkan dashboard wajib ada."""
+    path = Path(path)
+    raw = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    required = [TIMESTAMP, ORDER, CUSTOMER, *DIMENSIONS, *MEASURES]
+    missing = [col for col in required if col not in raw.columns]
+    if missing:
+        raise ValueError(f"{path.name}: kolom tidak ditemukan: {', '.join(missing)}")
+    return raw
+
+
+def store_batch(raw, source, name):
+    """Menyimpan batch mentah ke sumber lokal; mengembalikan False bila tidak bisa."""
+    path = Path(str(source))
+    if is_remote(source) or not path.exists():
+        return False
+    if path.is_dir():
+        write_batch(raw, path, name)
+        return True
+    if path.suffix == ".csv":
+        columns = pd.read_csv(path, nrows=0).columns
+        raw.reindex(columns=columns).to_csv(path, mode="a", header=False, index=False)
+        return True
+    return False
+
+
+class Ingestor:
+    """Memantau direktori drop dan menerapkan setiap batch ke engine secara delta.
+
+    Tanpa engine (mode streaming) batch hanya disimpan ke sumber; pemindaian
+    berikutnya otomatis melihatnya karena fingerprint sumber berubah.
+    """
+
+    def __init__(
+        self, source, engine=None, index=None, version=None, drop_dir=DROP_DIR, cache=CACHE
+    ):
+        self.source = source
+        self.engine = engine
+        self.index = index
+        self.version = version
+        self.drop_dir = Path(drop_dir)
+        self.cache = cache
+        self.history = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def poll(self):
+        """Memproses semua file yang menunggu, mengembalikan ringkasan per file."""
+        with self.lock:
+            results = []
+            for path in pending(self.drop_dir):
+                try:
+                    results.append(self.ingest(path))
+                    target = self.drop_dir / "processed"
+                except Exception:
+                    logger.exception("Batch %s gagal diproses", path.name)
+                    target = self.drop_dir / "failed"
+                target.mkdir(exist_ok=True)
+                shutil.move(str(path), target / path.name)
+            self.history.extend(results)
+            return results
+
+    def ingest(self, path):
+        started = time.perf_counter()
+        raw = read_batch(path)
+        batch = compact(raw)
+        days = day_numbers(batch)
+        result = {
+            "file": path.name,
+            "rows": len(batch),
+            "months": sorted(set(decode_days(days).strftime("%Y-%m"))),
+        }
+        start = None
+        if self.engine is not None and len(batch):
+            start = self.apply(batch, days, result)
+        try:
+            stored = store_batch(raw, self.source, path.stem)
+        except Exception:
+            if start is not None:
+                with self.engine.lock.write():
+                    self.rollback(start)
+            raise
+        if not stored:
+            logger.warning("Batch %s hanya diterapkan di memori (%s)", path.name, self.source)
+        result["stored"] = stored
+        result["seconds"] = time.perf_counter() - started
+        logger.info("Batch %s: %s", path.name, result)
+        return result
+
+    def apply(self, batch, days, result):
+        """Menambahkan batch ke engine, indeks, sketsa, jarak penjual, dan cache.
+
+        Mengembalikan posisi baris pertama batch di engine.
+        """
+        with self.engine.lock.write():
+            start = self.engine.append(batch)
+            try:
+                self.index.append(self.engine, start)
+                if self.engine.sketches is not None:
+                    self.engine.sketches.append(self.engine, start)
+                if self.engine.sellers is not None:
+                    self.engine.sellers.append(self.engine, start)
+                result.update(self.refresh_cache(start, int(days.min()), int(days.max())))
+            except Exception:
+                self.rollback(start)
+                raise
+        return start
+
+    def rollback(self, start):
+        """Membuang baris sejak `start` dari engine lalu membangun ulang turunannya.
+
+        Indeks dibangun ulang dari engine, sketsa dan jarak penjual dibuang (dibangun
+        lagi saat dibutuhkan), dan semua entri cache versi ini dihapus karena mungkin
+        sudah memuat batch.
+        Pemanggil harus memegang `engine.lock.write()`.
+        """
+        self.engine.truncate(start)
+        self.index.__init__(self.engine)
+        self.engine.sketches = None
+        self.engine.sellers = None
+        self.cache.invalidate(lambda key: len(key) == 4 and key[0] == self.version)
+
+    def refresh_cache(self, start, first_day, last_day):
+        """Menggabungkan atau menghapus entri cache yang rentangnya menyentuh batch."""
+        days = self.engine.days[start:]
+        stale = set()
+        merged = 0
+        for key, value in self.cache.items():
+            if len(key) != 4 or key[0] != self.version or key[1] is None:
+                continue
+            lo, hi = day_bounds(key[1], key[2])
+            if lo > last_day or hi < first_day:
+                continue
+            merge = MERGEABLE.get(key[3])
+            rows = start + ((days >= lo) & (days <= hi)).nonzero()[0]
+            value = merge(value, self.engine, rows) if merge else None
+            if value is None:
+                stale.add(key)
+            else:
+                self.cache.put(key, value)
+                merged += 1
+        invalidated = self.cache.invalidate(stale.__contains__)
+        return {"cache_merged": merged, "cache_invalidated": invalidated}
+
+    def start(self, interval=POLL_SECONDS):
+        """Menjalankan `poll` berkala di thread latar (sekali per proses)."""
+        if self.thread is not None:
+            return self
+
+        def loop():
+            while True:
+                try:
+                    self.poll()
+                except Exception:
+                    logger.exception("Ingest gagal")
+                time.sleep(interval)
+
+        self.drop_dir.mkdir(parents=True, exist_ok=True)
+        self.thread = threading.Thread(target=loop, name="ingest", daemon=True)
+        self.thread.start()
+        return self
+
+    def stats(self):
+        return {
+            "ingested_files": len(self.history),
+            "ingested_rows": sum(r["rows"] for r in self.history),
+            "last_batch": self.history[-1] if self.history else None,
+        }
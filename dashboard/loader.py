@@ -0,0 +1,246 @@
+import hashlib
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from schema import PARTITION_COLUMN, compact, footprint
+
+logger = logging.getLogger(__name__)
+
+# Sumber Data
+DEFAULT_URL = "https://raw.githubusercontent.com/daffarayhanriadi/ecommerce-data-analysis/refs/heads/main/dashboard/main_data.csv"
+BASE_DIR = Path(__file__).resolve().parent
+LOCAL_CSV = BASE_DIR / "main_data.csv"
+# Output Parquet terpartisi dari `etl.py`, diutamakan bila ada
+LOCAL_DATASET = BASE_DIR / "main_data"
+CACHE_DIR = Path(os.environ.get("MAIN_DATA_CACHE_DIR", BASE_DIR / ".cache"))
+CACHE_FILE = "main_data.arrow"
+
+HASH_KEY = b"source_sha256"
+SCHEMA_KEY = b"schema_version"
+# ETag/Last-Modified sumber remote saat cache dibuat, untuk permintaan bersyarat
+VALIDATORS_KEY = b"source_validators"
+REMOTE_TIMEOUT = float(os.environ.get("MAIN_DATA_REMOTE_TIMEOUT", 30))
+# Naikkan bila bentuk frame ringkas berubah agar cache lama dibangun ulang
+SCHEMA_VERSION = "2"
+CHUNK_SIZE = 1 << 20
+
+
+def resolve_source(source=None):
+    """Menentukan sumber data: argumen, env MAIN_DATA_PATH, hasil ETL, CSV lokal, lalu URL."""
+    source = source or os.environ.get("MAIN_DATA_PATH")
+    if source:
+        return str(source)
+    if LOCAL_DATASET.is_dir():
+        return str(LOCAL_DATASET)
+    if LOCAL_CSV.exists():
+        return str(LOCAL_CSV)
+    return DEFAULT_URL
+
+
+def is_remote(source):
+    return str(source).startswith(("http://", "https://"))
+
+
+def is_parquet(path):
+    path = Path(path)
+    return path.is_dir() or path.suffix == ".parquet"
+
+
+def content_hash(path):
+    """Menghitung sha256 isi file (atau semua file Parquet di direktori) secara bertahap."""
+    path = Path(path)
+    files = sorted(path.rglob("*.parquet")) if path.is_dir() else [path]
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(str(file.relative_to(path) if path.is_dir() else "").encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_source(path):
+    """Membaca sumber CSV/Parquet lalu memadatkannya (lihat `schema.compact`)."""
+    if is_parquet(path):
+        raw = pd.read_parquet(path).drop(columns=[PARTITION_COLUMN], errors="ignore")
+    else:
+        raw = pd.read_csv(path)
+    df = compact(raw)
+    logger.info(
+        "main_data dipadatkan: %.1f MiB -> %.1f MiB",
+        footprint(raw) / 2**20,
+        footprint(df) / 2**20,
+    )
+    return df
+
+
+def cache_path(cache_dir=None):
+    return Path(cache_dir or CACHE_DIR) / CACHE_FILE
+
+
+def cache_metadata(path):
+    """Hash sumber dan validator HTTP dari metadata cache Arrow tanpa membaca datanya."""
+    with pa.memory_map(str(path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if metadata.get(SCHEMA_KEY, b"").decode() != SCHEMA_VERSION:
+        return {"hash": "", "validators": {}}
+    return {
+        "hash": metadata.get(HASH_KEY, b"").decode(),
+        "validators": json.loads(metadata.get(VALIDATORS_KEY, b"{}")),
+    }
+
+
+def read_cache(path):
+    """Membaca cache Arrow lewat memory map, mengembalikan (df, hash sumber)."""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    source_hash = metadata.get(HASH_KEY, b"").decode()
+    if metadata.get(SCHEMA_KEY, b"").decode() != SCHEMA_VERSION:
+        source_hash = ""
+    return table.to_pandas(split_blocks=True), source_hash
+
+
+def write_cache(df, path, source_hash, validators=None):
+    """Menulis cache Arrow secara atomik dengan hash sumber di metadata skema."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            HASH_KEY: source_hash.encode(),
+            SCHEMA_KEY: SCHEMA_VERSION.encode(),
+            VALIDATORS_KEY: json.dumps(validators or {}).encode(),
+        }
+    )
+    tmp = path.with_suffix(".tmp")
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+# Sumber Remote
+def validators_of(headers):
+    """ETag dan Last-Modified dari header respons HTTP (yang tersedia saja)."""
+    fields = {"etag": "ETag", "last_modified": "Last-Modified"}
+    return {name: headers[header] for name, header in fields.items() if headers.get(header)}
+
+
+def remote_validators(url):
+    """Validator sumber remote saat ini lewat HEAD, tanpa mengunduh isinya."""
+    request = urllib.request.Request(url, method="HEAD")
+    with urllib.request.urlopen(request, timeout=REMOTE_TIMEOUT) as response:
+        return validators_of(response.headers)
+
+
+def fetch(url, cache_dir=None, validators=None):
+    """Mengunduh sumber remote ke direktori cache dengan permintaan bersyarat.
+
+    Mengembalikan (path, validator baru), atau (None, validator lama) bila server
+    menjawab 304 karena sumber tidak berubah sejak `validators`.
+    """
+    validators = validators or {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    target = Path(cache_dir or CACHE_DIR) / "main_data.csv"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp")
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=REMOTE_TIMEOUT) as response:
+            with open(tmp, "wb") as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+            validators = validators_of(response.headers)
+        os.replace(tmp, target)
+    except urllib.error.HTTPError as error:
+        if error.code == 304:
+            return None, validators
+        raise
+    finally:
+        # Unduhan yang gagal tidak meninggalkan file sementara
+        tmp.unlink(missing_ok=True)
+    return target, validators
+
+
+def source_version(source=None, cache_dir=None):
+    """Versi (sha256) sumber tanpa membaca isinya ke DataFrame; None bila belum diketahui.
+
+    Sumber remote memakai hash di metadata cache Arrow lokal selama validator
+    HTTP-nya (HEAD) masih sama; bila berubah atau tidak bisa dibandingkan, None.
+    """
+    source = resolve_source(source)
+    if not is_remote(source):
+        return content_hash(source)
+    cached = cache_path(cache_dir)
+    if not cached.exists() or os.environ.get("MAIN_DATA_REFRESH") == "1":
+        return None
+    meta = cache_metadata(cached)
+    if not meta["hash"] or not meta["validators"]:
+        return None
+    try:
+        current = remote_validators(source)
+    except OSError as error:
+        logger.warning("Sumber %s tidak bisa diperiksa (%s); memakai cache lokal", source, error)
+        return meta["hash"]
+    return meta["hash"] if current == meta["validators"] else None
+
+
+def download(url, cache_dir=None):
+    """Mengunduh sumber remote ke direktori cache."""
+    return fetch(url, cache_dir)[0]
+
+
+def load_dataset(source=None, cache_dir=None, refresh=False):
+    """Memuat dataset utama, memakai cache Arrow lokal bila masih sesuai sumber.
+
+    Mengembalikan (df, version) dengan version berupa sha256 isi sumber.
+    Sumber remote diperiksa lewat permintaan bersyarat (ETag/Last-Modified):
+    jawaban 304 memakai cache, isi baru di-hash ulang seperti sumber lokal.
+    Bila server tidak terjangkau, cache yang ada tetap dipakai.
+    """
+    source = resolve_source(source)
+    refresh = refresh or os.environ.get("MAIN_DATA_REFRESH") == "1"
+    cached = cache_path(cache_dir)
+    validators = {}
+
+    if is_remote(source):
+        meta = cache_metadata(cached) if cached.exists() and not refresh else {}
+        try:
+            local, validators = fetch(source, cache_dir, meta.get("hash") and meta["validators"])
+        except OSError as error:
+            if not meta.get("hash"):
+                raise
+            logger.warning("Sumber %s tidak bisa diperiksa (%s); memakai cache lokal", source, error)
+            local = None
+        if local is None:
+            return read_cache(cached)
+    else:
+        local = Path(source)
+
+    source_hash = content_hash(local)
+    if cached.exists() and not refresh:
+        df, cached_hash = read_cache(cached)
+        if cached_hash == source_hash:
+            if validators and validators != cache_metadata(cached)["validators"]:
+                # Isi sama, validator baru: disimpan agar pemeriksaan berikutnya cukup 304
+                write_cache(df, cached, source_hash, validators)
+            return df, source_hash
+
+    df = read_source(local)
+    write_cache(df, cached, source_hash, validators)
+    return df, source_hash
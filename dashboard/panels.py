@@ -0,0 +1,64 @@
+"""Evaluasi panel dashboard secara lazy dan paralel.
+
+Hanya bagian yang dipilih di sidebar yang dihitung. Setiap panel di bagian
+tersebut memesan placeholder di posisinya, lalu fungsi hitungnya (agregat dan
+render figure, tanpa pemanggilan `st`) langsung dikirim ke thread pool
+bersama. `PanelRunner.drain` mengisi placeholder sesuai urutan selesai,
+sehingga grafik pertama muncul setelah panel tercepat selesai dan seluruh
+halaman selesai sekitar selama panel paling lambat, bukan jumlah semuanya.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+SECTIONS = [
+    "Tren Penjualan",
+    "Produk",
+    "Pembayaran",
+    "Kota",
+    "Geoanalysis",
+    "Pertumbuhan & Kohort",
+    "Jarak Penjual",
+]
+# Bagian yang terbuka saat halaman pertama dimuat, mis. DASHBOARD_SECTIONS="Produk,Kota"
+DEFAULT_SECTIONS = [
+    section
+    for section in os.environ.get("DASHBOARD_SECTIONS", ",".join(SECTIONS)).split(",")
+    if section in SECTIONS
+]
+WORKERS = int(os.environ.get("PANEL_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Satu pool per proses server, dipakai bersama oleh semua sesi
+POOL = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="panel")
+
+
+class PanelRunner:
+    """Mengumpulkan panel satu rerun dan menampilkannya sesuai urutan selesai."""
+
+    def __init__(self, pool=POOL):
+        self.pool = pool
+        self.jobs = {}
+
+    def add(self, compute, show):
+        """Memesan placeholder di posisi saat ini dan mulai menghitung `compute()`.
+
+        `show(hasil)` dipanggil di thread script saat `drain`, di dalam placeholder.
+        """
+        slot = st.empty()
+        slot.caption(":hourglass_flowing_sand: Memuat...")
+        self.jobs[self.pool.submit(compute)] = (slot, show)
+
+    def drain(self):
+        """Mengisi placeholder begitu hasilnya siap; panel yang gagal tidak menghentikan lainnya."""
+        for future in as_completed(self.jobs):
+            slot, show = self.jobs[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                slot.exception(exc)
+                continue
+            with slot.container():
+                show(result)
+        self.jobs.clear()
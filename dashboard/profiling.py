@@ -0,0 +1,182 @@
+"""Instrumentasi opsional per rerun dashboard.
+
+Aktif bila env DASHBOARD_PROFILE=1 atau query param ?profile=1. Setiap tahap
+mencatat waktu, puncak alokasi (tracemalloc, hanya untuk tahap yang berjalan
+sendiri), baris masuk/keluar, status cache, dan ukuran payload. Hasil
+ditampilkan di panel debug, dikirim sebagai log JSON, dan (bila env
+DASHBOARD_TRACE_FILE diisi) ditambahkan ke file Chrome trace.
+tracemalloc hanya aktif selama ada rerun yang diprofil.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger("dashboard.profile")
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+TRACE_FILE = os.environ.get("DASHBOARD_TRACE_FILE")
+TRACE_LOCK = threading.Lock()
+
+# Jumlah Profiler aktif yang memakai tracemalloc (lihat `start_tracing`)
+TRACING_LOCK = threading.Lock()
+TRACING = {"users": 0, "owned": False}
+# Record tahap yang sedang berjalan di semua Profiler; puncak tracemalloc berlaku per proses
+ACTIVE = []
+
+
+def start_tracing():
+    """Menyalakan tracemalloc untuk satu Profiler; dihitung agar rerun paralel aman."""
+    with TRACING_LOCK:
+        if TRACING["users"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            TRACING["owned"] = True
+        TRACING["users"] += 1
+
+
+def stop_tracing():
+    """Mematikan tracemalloc bila Profiler terakhir selesai dan kita yang menyalakannya.
+
+    Tracing yang dinyalakan pihak lain (mis. PYTHONTRACEMALLOC) dibiarkan aktif.
+    """
+    with TRACING_LOCK:
+        TRACING["users"] -= 1
+        if TRACING["users"] == 0 and TRACING["owned"]:
+            tracemalloc.stop()
+            TRACING["owned"] = False
+
+
+def rows_of(value):
+    """Jumlah baris sebuah hasil (DataFrame atau tuple DataFrame)."""
+    if isinstance(value, (tuple, list)):
+        return sum(rows_of(v) for v in value)
+    if hasattr(value, "__len__") and not isinstance(value, (bytes, str)):
+        return len(value)
+    return None
+
+
+class Profiler:
+    """Pencatat tahap-tahap sebuah rerun; tidak melakukan apa pun bila nonaktif.
+
+    Profiler aktif menyalakan tracemalloc sampai `close` dipanggil (atau objeknya
+    dibuang bila rerun terhenti di tengah), sehingga overhead tracing tidak tertinggal.
+    """
+
+    def __init__(self, enabled=False, run_id=None):
+        self.enabled = enabled
+        self.run_id = run_id or f"{os.getpid()}-{time.time_ns()}"
+        self.records = []
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        if enabled:
+            start_tracing()
+            self.close = weakref.finalize(self, stop_tracing)
+        else:
+            self.close = lambda: None
+
+    @classmethod
+    def from_request(cls, query_params=None):
+        enabled = os.environ.get("DASHBOARD_PROFILE") == "1"
+        if query_params is not None:
+            enabled = enabled or query_params.get("profile") == "1"
+        return cls(enabled)
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Mengukur satu tahap; pemanggil boleh mengisi field tambahan pada record.
+
+        Puncak tracemalloc dihitung untuk seluruh proses, sehingga `peak_alloc_bytes`
+        hanya diisi untuk tahap yang tidak tumpang tindih dengan tahap lain (panel di
+        thread pool, rerun sesi lain, atau tahap bersarang); tahap tersebut ditandai
+        `concurrent` dan puncaknya dikosongkan.
+        """
+        record = {"stage": name, **fields}
+        if not self.enabled:
+            yield record
+            return
+        with TRACING_LOCK:
+            concurrent = bool(ACTIVE)
+            for other in ACTIVE:
+                other["concurrent"] = True
+            ACTIVE.append(record)
+            record["concurrent"] = concurrent
+            if not concurrent:
+                tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            with TRACING_LOCK:
+                ACTIVE[:] = [other for other in ACTIVE if other is not record]
+            with self.lock:
+                record.update(
+                    start_ms=(started - self.origin) * 1e3,
+                    wall_ms=elapsed * 1e3,
+                    peak_alloc_bytes=None if record["concurrent"] else max(peak - before, 0),
+                    thread=threading.get_ident(),
+                )
+                self.records.append(record)
+
+    def frame(self):
+        columns = [
+            "stage",
+            "wall_ms",
+            "peak_alloc_bytes",
+            "concurrent",
+            "rows_in",
+            "rows_out",
+            "cache",
+            "payload_bytes",
+        ]
+        return pd.DataFrame(self.records).reindex(columns=columns)
+
+    def emit(self):
+        """Mengirim record sebagai log JSON dan menambahkannya ke file Chrome trace.
+
+        Dipanggil di akhir rerun; tracemalloc untuk profiler ini ikut dimatikan.
+        """
+        self.close()
+        if not self.enabled:
+            return
+        for record in self.records:
+            logger.info(json.dumps({"run_id": self.run_id, **record}, default=str))
+        if TRACE_FILE:
+            self.write_trace(TRACE_FILE)
+
+    def write_trace(self, path):
+        """Format "JSON Array" Chrome trace; penutup ']' boleh dihilangkan."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": record["stage"],
+                "ph": "X",
+                "ts": (self.origin * 1e6) + record["start_ms"] * 1e3,
+                "dur": record["wall_ms"] * 1e3,
+                "pid": pid,
+                "tid": record["thread"],
+                "args": {k: v for k, v in record.items() if k not in ("stage", "thread")},
+            }
+            for record in self.records
+        ]
+        with TRACE_LOCK:
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a") as f:
+                if new:
+                    f.write("[\n")
+                for event in events:
+                    f.write(json.dumps(event, default=str) + ",\n")
@@ -0,0 +1,190 @@
+"""Ekspor laporan dashboard tanpa Streamlit untuk banyak rentang tanggal sekaligus.
+
+Contoh:
+    python dashboard/report.py --month-ends --out reports/
+    python dashboard/report.py --range 2017-01-01:2017-03-31 --range 2018-01-01:2018-06-30
+"""
+
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from figures import (  # noqa: E402
+    order_revenue_trend_viz,
+    payment_type_distributions_viz,
+    render,
+    top_city_viz,
+    top_lowest_order_revenue_viz,
+)
+from shared import open_dataset  # noqa: E402
+
+# Panel tabel dihitung dari indeks prefix-sum harian (`DailyIndex`), sama seperti dashboard
+TABLE_PANELS = {
+    "order_trend": lambda index, s, e: index.order_revenue_trend(s, e, "order_id"),
+    "revenue_trend": lambda index, s, e: index.order_revenue_trend(s, e, "price"),
+    "type_order": lambda index, s, e: index.top_lowest_type_order(s, e),
+    "type_sales": lambda index, s, e: index.top_lowest_type_sales(s, e),
+    "payment_methods": lambda index, s, e: index.top_payment_methods(s, e),
+    "city_transaction": lambda index, s, e: index.top_city_transaction(s, e),
+}
+
+# Dataset dimuat sekali di proses utama; worker hasil fork membacanya bersama (read-only).
+DATASET = None
+
+
+def init_worker(source):
+    """Initializer untuk platform tanpa fork: setiap worker memetakan snapshot bersama."""
+    global DATASET
+    if DATASET is None:
+        DATASET = open_dataset(source)
+    sns.set(style="dark")
+
+
+def tables(panels):
+    """Meratakan hasil panel menjadi {nama file: DataFrame}."""
+    out = {}
+    for name in TABLE_PANELS:
+        result = panels[name]
+        if isinstance(result, tuple):
+            out[f"{name}_top"], out[f"{name}_lowest"] = result
+        else:
+            out[name] = result
+    for name, df in out.items():
+        if "month" in df:
+            out[name] = df.assign(month=df["month"].astype(str))
+    return out
+
+
+def figures_for(panels):
+    """Daftar (nama file, viz, argumen) figure yang sama seperti di dashboard."""
+    return [
+        ("order_trend", order_revenue_trend_viz, (panels["order_trend"],)),
+        ("revenue_trend", order_revenue_trend_viz, (panels["revenue_trend"],)),
+        ("type_order", top_lowest_order_revenue_viz, (*panels["type_order"], "Pesanan")),
+        ("type_sales", top_lowest_order_revenue_viz, (*panels["type_sales"], "Pendapatan")),
+        (
+            "payment_count",
+            payment_type_distributions_viz,
+            (panels["payment_methods"], "transaction_count"),
+        ),
+        (
+            "payment_value",
+            payment_type_distributions_viz,
+            (panels["payment_methods"], "payment_value"),
+        ),
+        ("top_city", top_city_viz, (panels["city_transaction"].head(5),)),
+    ]
+
+
+def export_range(name, start_date, end_date, out_dir, table_format, figure_format):
+    """Menghitung semua panel untuk satu rentang lalu menulis tabel dan figure."""
+    started = time.perf_counter()
+    panels = {
+        name: panel(DATASET.index, start_date, end_date) for name, panel in TABLE_PANELS.items()
+    }
+    target = Path(out_dir) / name
+    target.mkdir(parents=True, exist_ok=True)
+
+    for table, df in tables(panels).items():
+        if table_format == "parquet":
+            df.to_parquet(target / f"{table}.parquet", index=False)
+        else:
+            df.to_csv(target / f"{table}.csv", index=False)
+
+    if figure_format != "none":
+        for figure, viz, args in figures_for(panels):
+            (target / f"{figure}.{figure_format}").write_bytes(
+                render(viz, *args, fmt=figure_format)
+            )
+    return name, time.perf_counter() - started
+
+
+# Date Ranges
+def parse_range(text):
+    start, _, end = text.partition(":")
+    start, end = pd.Timestamp(start), pd.Timestamp(end or start)
+    return f"{start:%Y-%m-%d}_{end:%Y-%m-%d}", start, end
+
+
+def period_ranges(engine, freq):
+    """Rentang per bulan ("M") atau per kuartal ("Q") sepanjang dataset."""
+    first = pd.Timestamp(int(engine.days.min()), unit="D")
+    last = pd.Timestamp(int(engine.days.max()), unit="D")
+    ranges = []
+    for period in pd.period_range(first, last, freq=freq):
+        start, end = period.start_time.normalize(), period.end_time.normalize()
+        ranges.append((str(period), start, end))
+    return ranges
+
+
+def read_ranges_file(path):
+    """Membaca CSV berkolom start,end[,name]."""
+    ranges = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name, start, end = parse_range(f"{row['start']}:{row['end']}")
+            ranges.append((row.get("name") or name, start, end))
+    return ranges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Path/URL main_data (default: sama seperti dashboard)")
+    parser.add_argument("--range", action="append", default=[], help="START:END, bisa diulang")
+    parser.add_argument("--ranges-file", help="CSV berkolom start,end[,name]")
+    parser.add_argument("--month-ends", action="store_true", help="Satu laporan per bulan")
+    parser.add_argument("--quarters", action="store_true", help="Satu laporan per kuartal")
+    parser.add_argument("--out", default="reports", help="Direktori output")
+    parser.add_argument("--table-format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--figure-format", choices=["png", "svg", "none"], default="png")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    global DATASET
+    DATASET = open_dataset(args.source)
+
+    ranges = [parse_range(text) for text in args.range]
+    if args.ranges_file:
+        ranges += read_ranges_file(args.ranges_file)
+    if args.month_ends:
+        ranges += period_ranges(DATASET.engine, "M")
+    if args.quarters:
+        ranges += period_ranges(DATASET.engine, "Q")
+    if not ranges:
+        parser.error("tidak ada rentang tanggal; gunakan --range, --ranges-file, --month-ends atau --quarters")
+
+    # fork membagikan DATASET milik proses utama tanpa memuat ulang dataset
+    start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=mp.get_context(start_method),
+        initializer=init_worker,
+        initargs=(args.source,),
+    ) as pool:
+        futures = [
+            pool.submit(
+                export_range, name, start, end, args.out, args.table_format, args.figure_format
+            )
+            for name, start, end in ranges
+        ]
+        for future in as_completed(futures):
+            name, elapsed = future.result()
+            print(f"{name}: {elapsed:.2f}s")
+    print(f"{len(ranges)} rentang selesai dalam {time.perf_counter() - started:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Skema ringkas dataset: dimensi sebagai kode integer kecil + kamus label.
+
+Contoh:
+    python dashboard/schema.py dashboard/main_data.csv
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP = "order_purchase_timestamp"
+DAY_COLUMN = "purchase_day"
+# Kolom partisi Parquet hasil ETL (purchase_month=YYYY-MM), bukan bagian data
+PARTITION_COLUMN = "purchase_month"
+
+# Dimensi yang disimpan sebagai kategori (kode int8/int16/int32 + kamus)
+DIMENSIONS = [
+    "order_id",
+    "customer_id",
+    "customer_unique_id",
+    "product_id",
+    "seller_id",
+    "product_category_name",
+    "payment_type",
+    "order_status",
+    "customer_city",
+    "customer_state",
+    "seller_city",
+    "seller_state",
+]
+FLOAT_COLUMNS = ["price", "freight_value", "payment_value", "geolocation_lat", "geolocation_lng"]
+INT_COLUMNS = [
+    "order_item_id",
+    "payment_sequential",
+    "payment_installments",
+    "customer_zip_code_prefix",
+    "seller_zip_code_prefix",
+]
+
+
+def footprint(df):
+    """Total memori frame (byte), termasuk isi string."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def finite(values):
+    """Bobot untuk `np.bincount`: NaN/inf menjadi 0, seperti `.sum()` pandas yang melewati NaN."""
+    values = np.asarray(values)
+    return values if values.dtype.kind != "f" else np.where(np.isfinite(values), values, 0)
+
+
+def compact(df):
+    """Menyiapkan frame ringkas dari frame mentah (CSV) tanpa memodifikasi input.
+
+    - dimensi -> Categorical (kode integer sekecil mungkin + kamus label)
+    - float -> float32, integer -> tipe integer terkecil yang muat
+    - order_purchase_timestamp -> purchase_day (int32, hari sejak epoch)
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col == TIMESTAMP:
+            out[DAY_COLUMN] = day_numbers(df)
+        elif col in DIMENSIONS or isinstance(values.dtype, pd.CategoricalDtype):
+            out[col] = values.astype("category")
+        elif col in FLOAT_COLUMNS:
+            out[col] = values.astype("float32")
+        elif col in INT_COLUMNS and values.notna().all():
+            out[col] = pd.to_numeric(values, downcast="integer")
+        else:
+            out[col] = values
+    return pd.DataFrame(out)
+
+
+def day_numbers(df):
+    """Nomor hari pembelian (int32) dari frame ringkas maupun frame mentah."""
+    if DAY_COLUMN in df:
+        return df[DAY_COLUMN].to_numpy()
+    ts = pd.to_datetime(df[TIMESTAMP])
+    return ts.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int32)
+
+
+def month_numbers(days):
+    """Nomor bulan sejak epoch (ordinal Period bulanan) dari nomor hari."""
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+
+
+def decode_days(days):
+    """Mengubah nomor hari kembali menjadi tanggal (hanya untuk tampilan)."""
+    return pd.to_datetime(np.asarray(days).astype("datetime64[D]"))
+
+
+def decode_months(months):
+    """Mengubah nomor bulan menjadi PeriodIndex bulanan."""
+    return pd.PeriodIndex.from_ordinals(np.asarray(months, dtype=np.int64), freq="M")
+
+
+def report(before, after):
+    """Ringkasan memori sebelum/sesudah pemadatan, per kolom dan total."""
+    rows = []
+    for col in before.columns:
+        target = DAY_COLUMN if col == TIMESTAMP else col
+        rows.append(
+            {
+                "column": col,
+                "dtype_before": str(before[col].dtype),
+                "dtype_after": str(after[target].dtype),
+                "bytes_before": int(before[col].memory_usage(index=False, deep=True)),
+                "bytes_after": int(after[target].memory_usage(index=False, deep=True)),
+            }
+        )
+    df = pd.DataFrame(rows)
+    total = {
+        "column": "TOTAL",
+        "bytes_before": footprint(before),
+        "bytes_after": footprint(after),
+    }
+    return pd.concat([df, pd.DataFrame([total])], ignore_index=True)
+
+
+if __name__ == "__main__":
+    raw = pd.read_csv(sys.argv[1])
+    print(report(raw, compact(raw)).to_string(index=False))
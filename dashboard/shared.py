@@ -0,0 +1,315 @@
+"""Dataset bersama read-only: dimuat sekali per host lewat snapshot Arrow yang di-memory-map.
+
+Array `PanelEngine` (nomor hari, kode dimensi, kode order_id, ukuran), kamus
+label, kolom frame lainnya, dan indeks prefix-sum `DailyIndex` ditulis sekali per
+versi dataset ke `<MAIN_DATA_CACHE_DIR>/shared-v<skema>-<sumber>-<versi>.arrow`.
+Setiap proses server me-memory-map file yang sama sehingga datanya berada di page
+cache bersama; engine dan indeks hanyalah view numpy read-only di atasnya (tanpa
+salinan). Semua sesi memakai `Dataset` yang sama, sehingga memori hampir tetap
+berapa pun jumlah pengguna. Kolom per baris dibentuk dari snapshot hanya bila
+diminta (frame lengkap sekali per versi), sehingga selalu sesuai versi snapshot
+meskipun sumber sudah berubah, mis. karena batch ingest.
+
+`DatasetStore` memeriksa sumber paling sering sekali per
+MAIN_DATA_RELOAD_SECONDS detik (0 = tidak pernah) dan menukar versi baru
+secara atomik: rerun yang sedang berjalan tetap memakai versi lama.
+
+Contoh:
+    python dashboard/shared.py
+    python dashboard/shared.py --source dashboard/main_data.csv
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from analysis import CACHE
+from date_index import DailyIndex
+from engine import CUSTOMER, DIMENSIONS, MEASURES, ORDER, PanelEngine
+from loader import (
+    CACHE_DIR,
+    is_remote,
+    load_dataset,
+    remote_validators,
+    resolve_source,
+    source_version,
+)
+from schema import DAY_COLUMN
+from streaming import fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Naikkan bila isi snapshot berubah agar snapshot lama dibangun ulang
+SNAPSHOT_VERSION = "3"
+SNAPSHOT_PREFIX = f"shared-v{SNAPSHOT_VERSION}-"
+META_KEY = b"shared_snapshot"
+RELOAD_SECONDS = float(os.environ.get("MAIN_DATA_RELOAD_SECONDS", 60))
+# Kolom frame yang dibentuk ulang dari array engine, tidak disimpan dua kali: {kolom: array}
+ENGINE_COLUMNS = {DAY_COLUMN: "days", **{col: col for col in [*DIMENSIONS, ORDER, CUSTOMER, *MEASURES]}}
+
+
+def source_key(source):
+    """Kunci pendek sumber, agar snapshot beberapa sumber dalam satu direktori cache terpisah."""
+    name = source if is_remote(source) else str(Path(source).resolve())
+    return hashlib.sha256(name.encode()).hexdigest()[:12]
+
+
+def snapshot_path(source, version, cache_dir=None):
+    name = f"{SNAPSHOT_PREFIX}{source_key(source)}-{version[:32]}.arrow"
+    return Path(cache_dir or CACHE_DIR) / name
+
+
+def list_column(values):
+    """Satu array sebagai kolom list satu baris, agar panjang berbeda muat dalam satu tabel."""
+    return pa.LargeListArray.from_arrays(pa.array([0, len(values)], pa.int64()), values)
+
+
+def write_snapshot(engine, index, frame, path, version):
+    """Menulis array engine, kolom `frame` lainnya, dan indeks ke satu file Arrow IPC secara atomik.
+
+    `frame` adalah frame ringkas tempat `engine` dibangun (baris yang sama).
+    """
+    arrays, labels = engine.arrays()
+    arrays.update({f"index/{name}": cum for name, cum in index.arrays().items()})
+    columns, shapes = {}, {}
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        shapes[name] = list(values.shape)
+        columns[name] = list_column(pa.array(values.ravel()))
+    for name, values in labels.items():
+        values = pa.array(np.asarray(values, dtype=object), type=pa.large_string())
+        columns[f"labels/{name}"] = list_column(values)
+    stored = frame.drop(columns=[col for col in frame.columns if col in ENGINE_COLUMNS])
+    stored = pa.Table.from_pandas(stored, preserve_index=False)
+    for name in stored.column_names:
+        columns[f"frame/{name}"] = list_column(stored.column(name).combine_chunks())
+
+    table = pa.table(columns)
+    meta = {
+        "version": version,
+        "shapes": shapes,
+        "first_day": index.first_day,
+        "n_days": index.n_days,
+        "frame": {"columns": list(frame.columns), "pandas": stored.schema.pandas_metadata},
+    }
+    table = table.replace_schema_metadata({META_KEY: json.dumps(meta).encode()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def prune(keep, source, cache_dir=None):
+    """Menghapus snapshot sumber yang sama yang lebih lama dari `keep`.
+
+    Snapshot sumber lain dan snapshot yang lebih baru (mis. ditulis proses lain
+    yang sudah melihat versi berikutnya) dibiarkan. Proses yang masih memetakan
+    snapshot yang dihapus tidak terganggu.
+    """
+    current = keep.stat().st_mtime_ns
+    for path in Path(cache_dir or CACHE_DIR).glob(f"{SNAPSHOT_PREFIX}{source_key(source)}-*.arrow"):
+        if path != keep and path.stat().st_mtime_ns < current:
+            try:
+                path.unlink()
+            except OSError:
+                # Windows menolak menghapus file yang masih dipetakan proses lain
+                logger.debug("Snapshot %s belum bisa dihapus", path.name)
+
+
+class Dataset:
+    """Satu versi dataset: engine dan indeks berupa view read-only atas snapshot.
+
+    Kolom per baris (`columns`) juga dibentuk dari snapshot, tidak dari sumber.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.df = None
+        self.frame_lock = threading.Lock()
+        # Memory map tetap terbuka selama ada buffer yang merujuknya
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        meta = json.loads(table.schema.metadata[META_KEY])
+        self.version = meta["version"]
+        self.nbytes = path.stat().st_size
+
+        self.frame_meta = meta["frame"]
+        arrays, labels, self.stored = {}, {}, {}
+        for name in table.column_names:
+            values = table.column(name).chunk(0).values
+            if name.startswith("labels/"):
+                labels[name.split("/", 1)[1]] = label_index(name, values)
+            elif name.startswith("frame/"):
+                self.stored[name.split("/", 1)[1]] = values
+            else:
+                view = values.to_numpy(zero_copy_only=True)
+                arrays[name] = view.reshape(meta["shapes"][name])
+
+        index_arrays = {
+            name.split("/", 1)[1]: arrays.pop(name)
+            for name in list(arrays)
+            if name.startswith("index/")
+        }
+        # Engine boleh menambah batch; kolom baris awal selalu dari array snapshot ini
+        self.arrays, self.labels = dict(arrays), dict(labels)
+        self.engine = PanelEngine.from_arrays(arrays, labels, self.columns)
+        self.index = DailyIndex.from_arrays(
+            self.engine, index_arrays, meta["first_day"], meta["n_days"]
+        )
+
+    def columns(self, names=None):
+        """Kolom `names` (None = semua) untuk baris snapshot; kolom yang tidak ada dilewati.
+
+        Frame lengkap dibentuk sekali saat pertama diminta lalu dipakai bersama;
+        permintaan beberapa kolom hanya membentuk kolom tersebut.
+        """
+        if names is not None:
+            return self.build([col for col in names if col in self.frame_meta["columns"]])
+        with self.frame_lock:
+            if self.df is None:
+                self.df = self.build(self.frame_meta["columns"])
+        return self.df
+
+    def build(self, names):
+        """Frame kolom `names`: kolom tersimpan lewat Arrow, sisanya dari array engine."""
+        stored = [col for col in names if col in self.stored]
+        table = pa.Table.from_arrays([self.stored[col] for col in stored], names=stored)
+        pandas_meta = json.dumps(self.frame_meta["pandas"]).encode()
+        df = table.replace_schema_metadata({b"pandas": pandas_meta}).to_pandas(split_blocks=True)
+        return pd.DataFrame(
+            {col: df[col] if col in self.stored else self.engine_column(col) for col in names}
+        )
+
+    def engine_column(self, col):
+        values = self.arrays[ENGINE_COLUMNS[col]]
+        if ENGINE_COLUMNS[col] in self.labels:
+            return pd.Categorical.from_codes(
+                values, self.labels[ENGINE_COLUMNS[col]], validate=False
+            )
+        return values
+
+    def stats(self):
+        return {"dataset_version": self.version[:12], "snapshot_bytes": self.nbytes}
+
+
+def label_index(name, values):
+    """Kamus label dimensi sebagai Index objek; kamus order_id tetap di Arrow (tanpa salinan)."""
+    if name.split("/", 1)[1] in DIMENSIONS:
+        return pd.Index(values.to_numpy(zero_copy_only=False), dtype=object)
+    return pd.Index(pd.arrays.ArrowExtensionArray(values))
+
+
+def open_dataset(source=None, cache_dir=None):
+    """Membuka snapshot versi sumber saat ini, membangunnya dulu bila belum ada."""
+    source = resolve_source(source)
+    version = source_version(source, cache_dir)
+    path = snapshot_path(source, version, cache_dir) if version else None
+    if path is None or not path.exists():
+        df, version = load_dataset(source, cache_dir)
+        path = snapshot_path(source, version, cache_dir)
+        if not path.exists():
+            engine = PanelEngine(df)
+            write_snapshot(engine, DailyIndex(engine), df, path, version)
+            prune(path, source, cache_dir)
+        # Frame privat dilepas; proses ini juga memakai view snapshot
+        del df
+    return Dataset(path)
+
+
+def source_stamp(source):
+    """Penanda murah perubahan sumber: (path, ukuran, mtime), atau validator HTTP sumber remote."""
+    if not is_remote(source):
+        return fingerprint(source)
+    try:
+        return json.dumps(remote_validators(source), sort_keys=True)
+    except OSError as error:
+        logger.warning("Sumber %s tidak bisa diperiksa (%s)", source, error)
+        return None
+
+
+class DatasetStore:
+    """Dataset aktif per proses server; versi baru ditukar secara atomik.
+
+    `current` dipanggil sekali di awal setiap rerun dan hasilnya dipakai sampai
+    rerun selesai, sehingga satu rerun tidak pernah mencampur dua versi.
+    """
+
+    def __init__(self, source=None, cache_dir=None, interval=RELOAD_SECONDS, cache=CACHE):
+        self.source = resolve_source(source)
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.dataset = None
+        self.stamp = None
+        self.checked = 0.0
+        self.reloads = 0
+
+    def current(self):
+        """Dataset aktif; sumber diperiksa paling sering sekali per `interval` detik."""
+        if self.dataset is None:
+            with self.lock:
+                if self.dataset is None:
+                    self.reload()
+        elif self.interval and time.monotonic() - self.checked >= self.interval:
+            # Hanya satu thread yang memeriksa; sesi lain langsung memakai versi aktif
+            if self.lock.acquire(blocking=False):
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("Gagal memuat ulang %s, versi lama tetap dipakai", self.source)
+                finally:
+                    self.lock.release()
+        return self.dataset
+
+    def reload(self):
+        """Membuka versi baru bila sumber berubah; mengembalikan True bila versi ditukar."""
+        self.checked = time.monotonic()
+        stamp = source_stamp(self.source)
+        # Sumber remote yang tidak terjangkau (stamp None): versi aktif tetap dipakai
+        if self.dataset is not None and stamp in (None, self.stamp):
+            return False
+        dataset = open_dataset(self.source, self.cache_dir)
+        self.stamp = stamp
+        old = self.dataset
+        if old is not None and dataset.version == old.version:
+            return False
+        # Penukaran referensi bersifat atomik; versi lama dilepas setelah rerun terakhirnya
+        self.dataset = dataset
+        if old is not None:
+            self.reloads += 1
+            self.cache.invalidate(lambda key: key[0] == old.version)
+            logger.info("Dataset ditukar: %s -> %s", old.version[:12], dataset.version[:12])
+        return True
+
+    def stats(self):
+        stats = self.dataset.stats() if self.dataset is not None else {}
+        return {**stats, "reloads": self.reloads}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Path/URL main_data (default: sama seperti dashboard)")
+    parser.add_argument("--cache-dir", help=f"Direktori snapshot (default: {CACHE_DIR})")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    dataset = open_dataset(args.source, args.cache_dir)
+    print(
+        f"{dataset.path} ({dataset.nbytes / 2**20:.1f} MiB, {len(dataset.engine.days):,} baris) "
+        f"siap dalam {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
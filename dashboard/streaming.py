@@ -0,0 +1,412 @@
+"""Agregasi streaming (out-of-core) untuk dataset yang lebih besar dari RAM.
+
+Sumber dibaca per potongan (chunk CSV atau row group Parquet) sehingga memori
+dibatasi oleh STREAM_MEMORY_BUDGET, bukan oleh ukuran data. Row group Parquet
+yang statistik min/max tanggalnya di luar rentang dilewati tanpa dibaca.
+
+Contoh:
+    python dashboard/streaming.py data.parquet --start 2017-01-01 --end 2017-12-31 --budget 256M
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from analysis import CACHE
+from cohorts import period_growth
+from distinct import Sketches
+from engine import (
+    ORDER,
+    city_frame,
+    day_bounds,
+    encode,
+    payment_frame,
+    trend_frame,
+    type_frames,
+)
+from geo import LAT, LNG, MAP_ZOOM, POINT_BUDGET, cell_size
+from profiling import Profiler, rows_of
+from schema import (
+    DAY_COLUMN,
+    TIMESTAMP,
+    compact,
+    day_numbers,
+    decode_months,
+    finite,
+    month_numbers,
+)
+
+COLUMNS = [
+    TIMESTAMP,
+    DAY_COLUMN,
+    "order_item_id",
+    "price",
+    "payment_value",
+    "product_category_name",
+    "payment_type",
+    "customer_city",
+    LAT,
+    LNG,
+]
+
+# Dimensi yang diberi sketsa order_id pada mode hitung "approx"
+SKETCHED = ["month", "product_category_name", "payment_type", "customer_city"]
+
+# Kolom partial per dimensi: {dimensi: [kolom yang dijumlah]}
+PARTIALS = {
+    "month": ["price"],
+    "product_category_name": ["order_item_id", "price"],
+    "payment_type": ["payment_value"],
+    "customer_city": [LAT, LNG],
+    "cell": [LAT, LNG],
+}
+
+INITIAL_CHUNK_ROWS = 10_000
+# Faktor pengaman: memori kerja per chunk (mask, kode, salinan) relatif ukuran chunk
+WORKING_FACTOR = 4
+
+
+def parse_bytes(text):
+    """'256M', '2G', atau angka byte -> int."""
+    text = str(text).strip().upper().rstrip("B")
+    scale = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}.get(text[-1:], 1)
+    return int(float(text.rstrip("KMG")) * scale)
+
+
+MEMORY_BUDGET = parse_bytes(os.environ.get("STREAM_MEMORY_BUDGET", "256M"))
+# Dashboard memakai mode streaming bila MAIN_DATA_STREAMING=1
+STREAMING = os.environ.get("MAIN_DATA_STREAMING") == "1"
+
+
+class PartialAggregates:
+    """Agregat parsial yang bisa digabung: jumlah baris dan total per grup.
+
+    Setiap dimensi disimpan sebagai DataFrame kecil berindeks label dengan kolom
+    `count` dan kolom total; dua partial digabung dengan penjumlahan per label,
+    sehingga hasilnya tidak bergantung pada cara data dipotong. Dengan
+    `sketch=True` juga menyimpan sketsa HyperLogLog order_id per grup.
+    """
+
+    def __init__(self, zoom=MAP_ZOOM, sketch=False):
+        self.zoom = zoom
+        self.rows = 0
+        self.parts = {
+            dim: pd.DataFrame(columns=["count", *cols], dtype=np.float64)
+            for dim, cols in PARTIALS.items()
+        }
+        self.sketches = {dim: Sketches.empty() for dim in SKETCHED} if sketch else None
+
+    def fold(self, chunk):
+        """Menambahkan satu chunk frame ringkas ke agregat."""
+        if not len(chunk):
+            return self
+        self.rows += len(chunk)
+        days = day_numbers(chunk)
+        months = month_numbers(days)
+        month_labels, month_codes = np.unique(months, return_inverse=True)
+        self.add("month", month_labels, month_codes, chunk)
+        groups = {"month": (month_codes, month_labels)}
+        for dim in ("product_category_name", "payment_type", "customer_city"):
+            codes, labels = encode(chunk[dim])
+            valid = codes >= 0
+            self.add(dim, labels, codes, chunk, valid)
+            groups[dim] = (codes, labels)
+        if self.sketches is not None:
+            orders = chunk[ORDER].to_numpy()
+            for dim in SKETCHED:
+                codes, labels = groups[dim]
+                sketches = Sketches.from_values(labels, codes, orders)
+                self.sketches[dim] = self.sketches[dim].merge(sketches)
+        lat = chunk[LAT].to_numpy().astype(np.float64)
+        lng = chunk[LNG].to_numpy().astype(np.float64)
+        valid = ~np.isnan(lat) & ~np.isnan(lng)
+        lat, lng = np.where(valid, lat, 0.0), np.where(valid, lng, 0.0)
+        size = cell_size(self.zoom)
+        cell = np.floor((lat + 90.0) / size).astype(np.int64) * (int(360.0 / size) + 1)
+        cell += np.floor((lng + 180.0) / size).astype(np.int64)
+        self.add("cell", *np.unique(np.where(valid, cell, -1), return_inverse=True), chunk, valid)
+        return self
+
+    def add(self, dim, labels, codes, chunk, valid=None):
+        """Melipat jumlah baris dan total kolom `PARTIALS[dim]` per label; NaN/inf dihitung 0."""
+        if valid is not None:
+            codes = codes[valid]
+        n = len(labels)
+        data = {"count": np.bincount(codes, minlength=n).astype(np.float64)}
+        for col in PARTIALS[dim]:
+            weights = chunk[col].to_numpy()
+            if valid is not None:
+                weights = weights[valid]
+            data[col] = np.bincount(codes, weights=finite(weights), minlength=n)
+        part = pd.DataFrame(data, index=pd.Index(labels))
+        part = part[part["count"] > 0]
+        self.parts[dim] = self.parts[dim].add(part, fill_value=0)
+
+    def merge(self, other):
+        """Menggabungkan partial lain ke partial ini."""
+        self.rows += other.rows
+        for dim in self.parts:
+            self.parts[dim] = self.parts[dim].add(other.parts[dim], fill_value=0)
+        if self.sketches is not None and other.sketches is not None:
+            for dim in SKETCHED:
+                self.sketches[dim] = self.sketches[dim].merge(other.sketches[dim])
+        return self
+
+    def results(self, budget=POINT_BUDGET):
+        """Hasil dengan bentuk yang sama seperti `DailyIndex` dan modul geo."""
+        month = self.parts["month"].sort_index()
+        counts = month["count"].to_numpy().astype(np.int64)
+        months = decode_months(month.index.to_numpy())
+        category = self.parts["product_category_name"]
+        labels = category.index
+        payment = self.parts["payment_type"]
+        city = self.parts["customer_city"]
+        cells = self.parts["cell"].drop(index=-1, errors="ignore")
+        results = {
+            "order_trend": trend_frame(months, counts, None, "order_id"),
+            "revenue_trend": trend_frame(months, counts, month["price"].to_numpy(), "price"),
+            "type_order": type_frames(
+                labels,
+                category["count"].to_numpy(),
+                np.rint(category["order_item_id"].to_numpy()).astype(np.int64),
+                "total_order",
+            ),
+            "type_sales": type_frames(
+                labels, category["count"].to_numpy(), category["price"].to_numpy(), "revenue"
+            ),
+            "payment_methods": payment_frame(
+                payment.index,
+                payment["count"].to_numpy().astype(np.int64),
+                payment["payment_value"].to_numpy(),
+            ),
+            "city_transaction": city_frame(
+                city.index, city["count"].to_numpy().astype(np.int64)
+            ),
+            "geo_city_centroids": centroid_frame(city, "customer_city").head(budget),
+            "geo_bins": centroid_frame(cells).head(budget),
+        }
+        results["period_growth"] = period_growth(results["order_trend"], results["revenue_trend"])
+        if self.sketches is not None:
+            results.update(self.distinct_results())
+        return results
+
+    def distinct_results(self):
+        """Varian "<metrik>:approx" dari sketsa order_id."""
+        distinct = {dim: self.sketches[dim].counts() for dim in SKETCHED}
+        month = distinct["month"].sort_index()
+        category = distinct["product_category_name"]
+        payment = distinct["payment_type"]
+        payment_value = self.parts["payment_type"]["payment_value"].reindex(payment.index)
+        city = distinct["customer_city"]
+        return {
+            "order_trend:approx": trend_frame(
+                decode_months(month.index.to_numpy()), month.to_numpy(), None, "order_id"
+            ),
+            "type_order:approx": type_frames(
+                category.index, category.to_numpy(), category.to_numpy(), "total_order"
+            ),
+            "payment_methods:approx": payment_frame(
+                payment.index, payment.to_numpy(), payment_value.to_numpy()
+            ),
+            "city_transaction:approx": city_frame(city.index, city.to_numpy()),
+        }
+
+
+def centroid_frame(part, label=None):
+    """Titik tengah koordinat per grup, urut dari transaksi terbanyak."""
+    df = pd.DataFrame(
+        {
+            LAT: part[LAT].to_numpy() / part["count"].to_numpy(),
+            LNG: part[LNG].to_numpy() / part["count"].to_numpy(),
+            "transaction_amount": part["count"].to_numpy().astype(np.int64),
+        }
+    )
+    if label:
+        df.insert(0, label, part.index)
+    df = df.sort_values(by="transaction_amount", ascending=False)
+    return df.reset_index(drop=True)
+
+
+# Sources
+def source_files(source):
+    """Daftar file sumber: satu file, atau semua *.parquet / *.csv di sebuah direktori."""
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(glob.glob(str(path / "**" / "*.parquet"), recursive=True))
+        return files or sorted(glob.glob(str(path / "**" / "*.csv"), recursive=True))
+    return [str(path)]
+
+
+def fingerprint(source):
+    """Versi murah untuk sumber besar: path, ukuran, dan mtime setiap file."""
+    digest = hashlib.sha256()
+    for file in source_files(source):
+        stat = os.stat(file)
+        digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def rows_for_budget(bytes_per_row, budget):
+    return max(1_000, int(budget / (max(bytes_per_row, 1) * WORKING_FACTOR)))
+
+
+def iter_csv(path, lo, hi, budget, columns=COLUMNS):
+    """Membaca CSV per chunk; ukuran chunk disesuaikan dari chunk pertama."""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in columns if col in header]
+    rows = INITIAL_CHUNK_ROWS
+    with pd.read_csv(path, usecols=usecols, iterator=True) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                return
+            chunk = compact(chunk)
+            rows = rows_for_budget(chunk.memory_usage(deep=True).sum() / len(chunk), budget)
+            yield chunk
+
+
+def row_group_days(metadata, index, column):
+    """(min, max) nomor hari sebuah row group dari statistik Parquet, atau None."""
+    stats = metadata.row_group(index).column(column).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    if isinstance(stats.min, int):
+        return stats.min, stats.max
+    first, last = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+    return (first - pd.Timestamp(0)).days, (last - pd.Timestamp(0)).days
+
+
+def iter_parquet(path, lo, hi, budget, columns=COLUMNS):
+    """Membaca Parquet per batch, melewati row group di luar rentang [lo, hi]."""
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    columns = [col for col in columns if col in names]
+    date_column = DAY_COLUMN if DAY_COLUMN in names else TIMESTAMP
+    position = names.index(date_column)
+    selected = []
+    for index in range(pf.num_row_groups):
+        bounds = row_group_days(pf.metadata, index, position)
+        if bounds is None or (bounds[1] >= lo and bounds[0] <= hi):
+            selected.append(index)
+    if not selected:
+        return
+    row_bytes = sum(
+        pf.metadata.row_group(i).total_byte_size / max(pf.metadata.row_group(i).num_rows, 1)
+        for i in selected
+    ) / len(selected)
+    batch_size = rows_for_budget(row_bytes, budget)
+    for batch in pf.iter_batches(batch_size=batch_size, row_groups=selected, columns=columns):
+        yield compact(batch.to_pandas())
+
+
+def stream_aggregates(
+    source, start_date=None, end_date=None, budget=MEMORY_BUDGET, sketch=False
+):
+    """Memindai sumber sekali dan mengembalikan PartialAggregates untuk rentang tanggal."""
+    lo, hi = day_bounds(start_date or "1970-01-01", end_date or "2262-04-11")
+    partial = PartialAggregates(sketch=sketch)
+    columns = [*COLUMNS, ORDER] if sketch else COLUMNS
+    for file in source_files(source):
+        reader = iter_parquet if file.endswith(".parquet") else iter_csv
+        for chunk in reader(file, lo, hi, budget, columns):
+            days = day_numbers(chunk)
+            partial.fold(chunk[(days >= lo) & (days <= hi)])
+    return partial
+
+
+def date_extent(source, budget=MEMORY_BUDGET):
+    """(hari pertama, hari terakhir) dataset; memakai statistik Parquet bila ada."""
+    first, last = None, None
+    for file in source_files(source):
+        if file.endswith(".parquet"):
+            pf = pq.ParquetFile(file)
+            names = pf.schema_arrow.names
+            position = names.index(DAY_COLUMN if DAY_COLUMN in names else TIMESTAMP)
+            bounds = [row_group_days(pf.metadata, i, position) for i in range(pf.num_row_groups)]
+            if all(bounds) and bounds:
+                lows, highs = zip(*bounds)
+                first = min(lows) if first is None else min(first, min(lows))
+                last = max(highs) if last is None else max(last, max(highs))
+                continue
+        reader = iter_parquet if file.endswith(".parquet") else iter_csv
+        for chunk in reader(file, -(2**31), 2**31, budget):
+            days = day_numbers(chunk)
+            if len(days):
+                first = int(days.min()) if first is None else min(first, int(days.min()))
+                last = int(days.max()) if last is None else max(last, int(days.max()))
+    return first, last
+
+
+class StreamingMetrics:
+    """Pengganti `Metrics` untuk mode streaming dengan antarmuka `get` yang sama.
+
+    Satu pemindaian sumber per rentang tanggal menghasilkan semua panel sekaligus;
+    hasilnya disimpan di cache bersama dengan key (versi, rentang, "stream").
+    Dengan `sketch=True` pemindaian juga menghasilkan metrik "<metrik>:approx";
+    mode "exact" tidak tersedia karena butuh seluruh order_id di memori.
+    """
+
+    def __init__(self, source, budget=MEMORY_BUDGET, cache=CACHE, profiler=None, sketch=False):
+        self.source = source
+        self.budget = budget
+        self.sketch = sketch
+        self.version = fingerprint(source)
+        self.cache = cache
+        self.profiler = profiler or Profiler()
+        # Panel yang dihitung paralel menunggu satu pemindaian yang sama, bukan memindai ulang
+        self.scan_lock = threading.Lock()
+
+    def date_bounds(self):
+        key = (self.version, None, None, "extent")
+        first, last = self.cache.get_or_compute(key, lambda: date_extent(self.source, self.budget))
+        return pd.Timestamp(first, unit="D").date(), pd.Timestamp(last, unit="D").date()
+
+    def panels(self, start_date, end_date):
+        kind = "stream:approx" if self.sketch else "stream"
+        key = (self.version, str(start_date), str(end_date), kind)
+        with self.scan_lock:
+            return self.cache.lookup(
+                key,
+                lambda: stream_aggregates(
+                    self.source, start_date, end_date, self.budget, self.sketch
+                ).results(),
+            )
+
+    def get(self, metric, start_date, end_date):
+        # Kohort dan mode "exact" butuh kode pelanggan/order_id seluruh rentang di memori
+        in_memory = metric == "cohort_retention" or metric.endswith(":exact")
+        if in_memory or (metric.endswith(":approx") and not self.sketch):
+            raise ValueError(f"Metrik {metric} tidak tersedia pada StreamingMetrics ini")
+        with self.profiler.stage(f"metric:{metric}") as record:
+            panels, hit = self.panels(start_date, end_date)
+            value = panels[metric]
+            if self.profiler.enabled:
+                record.update(rows_out=rows_of(value), cache="hit" if hit else "miss")
+        return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="File/direktori CSV atau Parquet")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--budget", default=os.environ.get("STREAM_MEMORY_BUDGET", "256M"))
+    args = parser.parse_args(argv)
+
+    partial = stream_aggregates(args.source, args.start, args.end, parse_bytes(args.budget))
+    print(f"{partial.rows:,} baris dalam rentang")
+    for name, value in partial.results().items():
+        head = value[0] if isinstance(value, tuple) else value
+        print(f"\n## {name}\n{head.head(10).to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Implementasi pandas asli dashboard (sebelum optimasi) sebagai acuan pengujian.
+
+Disalin dari versi awal `dashboard/dashboard.py` tanpa `st.cache_data`; satu-satunya
+perbedaan adalah `filtered` yang inklusif untuk seluruh hari terakhir, sama seperti
+`analysis.filtered`.
+"""
+
+import numpy as np
+import pandas as pd
+
+START = "2017-01-15"
+END = "2018-03-10"
+
+
+def filtered(df, start_date, end_date):
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    ts = df["order_purchase_timestamp"]
+    return df[(ts >= start_date) & (ts < end_date)].copy()
+
+
+def order_revenue_trend(df, ref):
+    df = df.copy()
+    df["month"] = df["order_purchase_timestamp"].dt.to_period("M")
+    if ref == "order_id":
+        df = df.groupby(by="month")[ref].count().reset_index()
+        df.columns = ["month", "order"]
+    else:
+        df = df.groupby(by="month")[ref].sum().reset_index()
+        df.columns = ["month", "revenue"]
+    return df
+
+
+def top_lowest_type_order(df):
+    df = df.groupby("product_category_name", observed=True)["order_item_id"].sum().reset_index()
+    df.columns = ["product_type", "total_order"]
+    return df
+
+
+def top_lowest_type_sales(df):
+    df = df.groupby("product_category_name", observed=True)["price"].sum().reset_index()
+    df.columns = ["product_type", "revenue"]
+    return df
+
+
+def top_payment_methods(df):
+    df = (
+        df.groupby("payment_type", observed=True)
+        .agg({"order_id": "count", "payment_value": "sum"})
+        .sort_values(by="order_id", ascending=False)
+        .reset_index()
+    )
+    df.rename(columns={"order_id": "transaction_count"}, inplace=True)
+    return df
+
+
+def top_city_transaction(df):
+    df = df["customer_city"].value_counts().reset_index()
+    df.rename(columns={"count": "transaction_amount"}, inplace=True)
+    return df[df["transaction_amount"] > 0]
+
+
+def geo_top_city_transactions(df):
+    city_counts = df["customer_city"].value_counts().reset_index()
+    city_counts.columns = ["customer_city", "transaction_amount"]
+    return df.merge(city_counts, on="customer_city", how="left")
+
+
+def assert_same(ours, expected, key, rtol=1e-4):
+    """Membandingkan hasil per `key` tanpa bergantung urutan baris yang nilainya seri.
+
+    Ukuran float32 dijumlah dengan urutan berbeda, sehingga dipakai toleransi relatif.
+    """
+    assert len(ours) == len(expected)
+    assert set(ours.columns) == set(expected.columns)
+    ours = ours.assign(**{key: ours[key].astype(str)})
+    expected = expected.assign(**{key: expected[key].astype(str)})
+    merged = ours.merge(expected, on=key, suffixes=("", "_expected"), validate="1:1")
+    assert len(merged) == len(expected)
+    for col in ours.columns.drop(key):
+        np.testing.assert_allclose(
+            merged[col].astype(float), merged[f"{col}_expected"].astype(float), rtol=rtol
+        )
@@ -0,0 +1,53 @@
+"""Fixture bersama: modul dashboard/ dan benchmarks/ di sys.path serta data sintetis kecil."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "dashboard"), str(ROOT / "benchmarks")]
+
+import loader  # noqa: E402
+import shared  # noqa: E402
+from schema import compact  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+ROWS = 5000
+# Baris dengan nilai kosong per kolom, seperti data Olist asli
+MISSING = {"price": 25, "payment_value": 25, "order_item_id": 10, "product_category_name": 15}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def default_cache(tmp_path_factory):
+    """Cache Arrow dan snapshot default diarahkan ke direktori sementara, bukan dashboard/.cache."""
+    path = tmp_path_factory.mktemp("cache")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(loader, "CACHE_DIR", path)
+        patch.setattr(shared, "CACHE_DIR", path)
+        yield path
+
+
+@pytest.fixture(scope="session")
+def raw():
+    """Frame mentah berbentuk main_data dengan NaN di kolom ukuran dan kategori."""
+    df = generate(ROWS, seed=7)
+    df["order_item_id"] = df["order_item_id"].astype("float64")
+    df["product_category_name"] = df["product_category_name"].astype(object)
+    rng = np.random.default_rng(7)
+    for col, n in MISSING.items():
+        df.loc[rng.choice(len(df), n, replace=False), col] = np.nan
+    return df
+
+
+@pytest.fixture(scope="session")
+def frame(raw):
+    return compact(raw)
+
+
+@pytest.fixture(scope="session")
+def csv_source(raw, tmp_path_factory):
+    path = tmp_path_factory.mktemp("source") / "main_data.csv"
+    raw.to_csv(path, index=False)
+    return path
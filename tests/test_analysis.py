@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import analysis
+import baseline
+from schema import compact
+
+PANELS = {
+    "top_lowest_type_order": "product_type",
+    "top_lowest_type_sales": "product_type",
+    "top_payment_methods": "payment_type",
+    "top_city_transaction": "customer_city",
+}
+
+
+@pytest.fixture(scope="module")
+def ours(frame):
+    return analysis.filtered(frame, baseline.START, baseline.END)
+
+
+@pytest.fixture(scope="module")
+def expected(raw):
+    return baseline.filtered(raw, baseline.START, baseline.END)
+
+
+def test_filtered_keeps_whole_last_day(ours, expected):
+    assert len(ours) == len(expected)
+
+
+@pytest.mark.parametrize("ref", ["order_id", "price"])
+def test_trend_matches_pandas(ours, expected, ref):
+    result = analysis.order_revenue_trend(ours, ref)
+    baseline.assert_same(result, baseline.order_revenue_trend(expected, ref), "month")
+
+
+def test_order_trend_skips_missing_order_id(raw):
+    raw = raw.copy()
+    rows = np.random.default_rng(3).choice(len(raw), 40, replace=False)
+    raw.loc[rows, "order_id"] = np.nan
+    ours = analysis.filtered(compact(raw), baseline.START, baseline.END)
+    expected = baseline.filtered(raw, baseline.START, baseline.END)
+    result = analysis.order_revenue_trend(ours, "order_id")
+    baseline.assert_same(result, baseline.order_revenue_trend(expected, "order_id"), "month")
+
+
+@pytest.mark.parametrize("panel", PANELS)
+def test_panels_match_pandas(ours, expected, panel):
+    result = getattr(analysis, panel)(ours)
+    for part in result if isinstance(result, tuple) else (result,):
+        baseline.assert_same(part, getattr(baseline, panel)(expected), PANELS[panel])
+
+
+def test_geo_city_matches_pandas(ours, expected):
+    result = analysis.geo_top_city_transactions(ours)
+    merged = baseline.geo_top_city_transactions(expected)
+    assert result["transaction_amount"].tolist() == merged["transaction_amount"].tolist()
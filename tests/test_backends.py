@@ -0,0 +1,25 @@
+import pytest
+
+from backends import PandasBackend, check_parity, open_backend, same
+from schema import compact
+
+
+def test_index_matches_pandas_backend(csv_source):
+    assert check_parity(str(csv_source), backends=()) == []
+
+
+def test_same_reports_differences(raw):
+    df = compact(raw.head(20))
+    assert same(df, df.copy()) is None
+    assert same(df, df.assign(price=df["price"] * 2)) is not None
+
+
+def test_duckdb_matches_pandas_backend(csv_source):
+    pytest.importorskip("duckdb")
+    assert check_parity(str(csv_source), backends=("duckdb",)) == []
+
+
+def test_unknown_backend(csv_source):
+    with pytest.raises(ValueError):
+        open_backend("spark", str(csv_source))
+    assert isinstance(open_backend("pandas", str(csv_source)), PandasBackend)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from cohorts import cohort_retention, period_growth
+from engine import PanelEngine
+
+
+def pandas_retention(df):
+    """Retensi kohort dengan groupby pandas biasa."""
+    df = df.dropna(subset=["customer_unique_id"])
+    month = df["order_purchase_timestamp"].dt.to_period("M")
+    pairs = pd.DataFrame({"customer": df["customer_unique_id"].astype(str), "month": month})
+    pairs = pairs.drop_duplicates()
+    pairs["cohort"] = pairs.groupby("customer")["month"].transform("min")
+    pairs["offset"] = (pairs["month"] - pairs["cohort"]).apply(lambda offset: offset.n)
+    counts = pairs.groupby(["cohort", "offset"])["customer"].nunique().unstack(fill_value=0)
+    retention = counts.div(counts[0], axis=0)
+    last = pairs["month"].max()
+    for cohort in retention.index:
+        for offset in retention.columns:
+            if cohort + offset > last:
+                retention.loc[cohort, offset] = np.nan
+    retention.insert(0, "customers", counts[0])
+    return retention
+
+
+def test_retention_matches_pandas(raw, frame):
+    ours = cohort_retention(PanelEngine(frame), baseline.START, baseline.END)
+    expected = pandas_retention(baseline.filtered(raw, baseline.START, baseline.END))
+    assert list(ours.index.astype(str)) == list(expected.index.astype(str))
+    np.testing.assert_array_equal(ours["customers"], expected["customers"])
+    np.testing.assert_allclose(
+        ours.drop(columns="customers").to_numpy(dtype=float),
+        expected.drop(columns="customers").reindex(columns=ours.columns[1:]).to_numpy(float),
+    )
+
+
+def test_empty_range(frame):
+    ours = cohort_retention(PanelEngine(frame), "2030-01-01", "2030-12-31")
+    assert ours.empty and list(ours.columns) == ["customers"]
+
+
+@pytest.fixture(scope="module")
+def trends(raw):
+    df = baseline.filtered(raw, baseline.START, baseline.END)
+    orders = baseline.order_revenue_trend(df, "order_id")
+    revenue = baseline.order_revenue_trend(df, "price")
+    # Satu bulan kosong di tengah harus diisi 0
+    gap = orders["month"] == pd.Period("2017-06", freq="M")
+    return orders[~gap], revenue[~gap]
+
+
+def test_period_growth_matches_pandas(trends):
+    orders, revenue = trends
+    ours = period_growth(orders, revenue, window=3)
+    months = pd.period_range(orders["month"].min(), orders["month"].max(), freq="M")
+    for col, df in (("order", orders), ("revenue", revenue)):
+        values = df.set_index("month")[col].reindex(months, fill_value=0).astype(float)
+        np.testing.assert_allclose(ours[col], values)
+        expected_mom = (values / values.shift(1) - 1).where(values.shift(1) > 0)
+        np.testing.assert_allclose(ours[f"{col}_mom"], expected_mom)
+        expected_yoy = (values / values.shift(12) - 1).where(values.shift(12) > 0)
+        np.testing.assert_allclose(ours[f"{col}_yoy"], expected_yoy)
+        np.testing.assert_allclose(ours[f"{col}_rolling"], values.rolling(3).mean())
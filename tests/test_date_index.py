@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import baseline
+from date_index import DailyIndex, add_daily, prefix_sum
+from engine import PanelEngine
+
+PANELS = {
+    "top_lowest_type_order": "product_type",
+    "top_lowest_type_sales": "product_type",
+    "top_payment_methods": "payment_type",
+    "top_city_transaction": "customer_city",
+}
+
+
+@pytest.fixture(scope="module")
+def expected(raw):
+    return baseline.filtered(raw, baseline.START, baseline.END)
+
+
+def test_prefix_sum_skips_nan_weights():
+    days = np.array([0, 0, 1, 2, 2])
+    weights = np.array([1.0, np.nan, 2.0, np.inf, 3.0])
+    np.testing.assert_array_equal(prefix_sum(days, 3, weights=weights)[:, 0], [0, 1, 3, 6])
+
+
+def test_add_daily_skips_nan_weights():
+    cum = prefix_sum(np.array([0, 1]), 3, weights=np.array([1.0, 2.0]))[:, 0]
+    cum = add_daily(cum, np.array([1, 2]), 3, weights=np.array([np.nan, 4.0]))
+    np.testing.assert_array_equal(cum[:4], [0, 1, 3, 7])
+
+
+@pytest.mark.parametrize("ref", ["order_id", "price"])
+def test_trend_matches_pandas(frame, expected, ref):
+    index = DailyIndex(PanelEngine(frame))
+    ours = index.order_revenue_trend(baseline.START, baseline.END, ref)
+    baseline.assert_same(ours, baseline.order_revenue_trend(expected, ref), "month")
+
+
+@pytest.mark.parametrize("panel", PANELS)
+def test_dimension_panels_match_pandas(frame, expected, panel):
+    index = DailyIndex(PanelEngine(frame))
+    ours = getattr(index, panel)(baseline.START, baseline.END)
+    ours = ours[0] if isinstance(ours, tuple) else ours
+    baseline.assert_same(ours, getattr(baseline, panel)(expected), PANELS[panel])
+
+
+def test_append_matches_full_build(frame):
+    engine = PanelEngine(frame.iloc[:3000])
+    index = DailyIndex(engine)
+    with engine.lock.write():
+        index.append(engine, engine.append(frame.iloc[3000:]))
+    full = DailyIndex(PanelEngine(frame))
+    for panel, key in PANELS.items():
+        ours = getattr(index, panel)(baseline.START, baseline.END)
+        ours = ours[0] if isinstance(ours, tuple) else ours
+        other = getattr(full, panel)(baseline.START, baseline.END)
+        baseline.assert_same(ours, other[0] if isinstance(other, tuple) else other, key)
+
+
+def test_empty_dataset(frame):
+    engine = PanelEngine(frame.iloc[:0])
+    index = DailyIndex(engine)
+    assert index.n_days == 0 and len(index.months) == 0
+    for ref in ("order_id", "price"):
+        assert index.order_revenue_trend(baseline.START, baseline.END, ref).empty
+    for panel in PANELS:
+        result = getattr(index, panel)(baseline.START, baseline.END)
+        assert all(part.empty for part in (result if isinstance(result, tuple) else (result,)))
+
+    # Batch pertama ke indeks kosong membangun ulang indeks
+    with engine.lock.write():
+        start = engine.append(frame)
+    index.append(engine, start)
+    expected = DailyIndex(PanelEngine(frame))
+    np.testing.assert_array_equal(index.count, expected.count)
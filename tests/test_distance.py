@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import distance
+from distance import GridIndex, haversine, seller_index, unique_locations
+from cache import LRUCache
+from engine import PanelEngine
+from ingest import Ingestor
+from schema import compact
+from shared import open_dataset
+
+SPLIT = 4000
+
+
+def brute_force(lat, lng, points_lat, points_lng):
+    return np.array([haversine(a, b, points_lat, points_lng).min() for a, b in zip(lat, lng)])
+
+
+@pytest.mark.parametrize("cell", [0.1, 0.5, 2.0])
+def test_grid_matches_brute_force(cell):
+    rng = np.random.default_rng(0)
+    lat, lng = rng.uniform(-33, 5, 500), rng.uniform(-73, -35, 500)
+    lat[:300], lng[:300] = rng.normal(-23.5, 0.5, 300), rng.normal(-46.6, 0.5, 300)
+    query_lat = np.r_[rng.uniform(-35, 8, 2000), 60.0, -60.0]
+    query_lng = np.r_[rng.uniform(-75, -30, 2000), 10.0, -100.0]
+    km, point = GridIndex(lat, lng, cell).nearest(query_lat, query_lng)
+    np.testing.assert_allclose(km, brute_force(query_lat, query_lng, lat, lng), rtol=1e-12)
+    np.testing.assert_allclose(haversine(query_lat, query_lng, lat[point], lng[point]), km)
+
+
+def test_empty_grid():
+    km, point = GridIndex([], []).nearest([1.0], [2.0])
+    assert np.isinf(km).all() and (point == -1).all()
+
+
+def test_unique_locations_round_trip():
+    lat = np.array([1.5, np.nan, 1.5, -2.25], dtype=np.float32)
+    lng = np.array([3.0, 4.0, 3.0, 5.5], dtype=np.float32)
+    locations, rows = unique_locations(lat, lng)
+    assert len(locations) == 2 and rows[1] == -1 and rows[0] == rows[2]
+    np.testing.assert_array_equal(locations[rows[[0, 3]]], [[1.5, 3.0], [-2.25, 5.5]])
+
+
+@pytest.fixture(scope="module")
+def raw_with_sellers(raw):
+    sellers = distance.load_sellers()["seller_id"].to_numpy()
+    rng = np.random.default_rng(1)
+    return raw.assign(seller_id=rng.choice(sellers, len(raw)))
+
+
+@pytest.fixture(scope="module")
+def frame_with_sellers(raw_with_sellers):
+    return compact(raw_with_sellers)
+
+
+def test_ingest_appends_distances(frame_with_sellers):
+    engine = PanelEngine(frame_with_sellers.iloc[:SPLIT])
+    index = seller_index(engine)
+    grid, nearest = index.grid, index.nearest_km.copy()
+    assert index.order_km is not None
+
+    with engine.lock.write():
+        engine.append(frame_with_sellers.iloc[SPLIT:].reset_index(drop=True))
+    assert seller_index(engine) is index and index.grid is grid
+    assert len(index.nearest_km) == len(index.order_km) == len(engine.days)
+    np.testing.assert_array_equal(index.nearest_km[:SPLIT], nearest)
+
+    located = index.sellers.dropna(subset=[distance.LAT])
+    lat = engine.measures[distance.LAT][SPLIT:].astype(np.float64)
+    lng = engine.measures[distance.LNG][SPLIT:].astype(np.float64)
+    valid = ~np.isnan(lat)
+    expected = brute_force(lat[valid], lng[valid], located[distance.LAT], located[distance.LNG])
+    np.testing.assert_allclose(index.nearest_km[SPLIT:][valid], expected, rtol=1e-9)
+
+    coords = index.sellers.set_index("seller_id")[[distance.LAT, distance.LNG]]
+    batch = frame_with_sellers.iloc[SPLIT:]
+    seller = coords.reindex(batch["seller_id"].astype(str))
+    expected = haversine(lat, lng, seller[distance.LAT], seller[distance.LNG])
+    np.testing.assert_allclose(index.order_km[SPLIT:], expected, equal_nan=True)
+
+
+def test_panels_after_ingest(frame_with_sellers):
+    engine = PanelEngine(frame_with_sellers.iloc[:SPLIT])
+    seller_index(engine)
+    with engine.lock.write():
+        engine.append(frame_with_sellers.iloc[SPLIT:].reset_index(drop=True))
+    histogram = distance.distance_histogram(engine, "2016-01-01", "2018-12-31")
+    located = ~np.isnan(engine.sellers.nearest_km)
+    assert histogram["nearest_seller"].sum() == located.sum()
+    coverage = distance.city_coverage(engine, "2016-01-01", "2018-12-31")
+    assert coverage["transaction_amount"].sum() == located.sum()
+    assert isinstance(coverage, pd.DataFrame)
+
+
+def test_ingest_into_shared_dataset(raw_with_sellers, frame_with_sellers, tmp_path):
+    source = tmp_path / "main_data.csv"
+    raw_with_sellers.iloc[:SPLIT].to_csv(source, index=False)
+    drop = tmp_path / "incoming"
+    drop.mkdir()
+    raw_with_sellers.iloc[SPLIT:].to_csv(drop / "batch.csv", index=False)
+    dataset = open_dataset(source, tmp_path / "cache")
+    seller_index(dataset.engine)
+    cache = LRUCache(max_bytes=1 << 24)
+    Ingestor(source, dataset.engine, dataset.index, dataset.version, drop, cache).poll()
+
+    histogram = distance.distance_histogram(dataset.engine, "2016-01-01", "2018-12-31")
+    # Indeks hanya membaca kolom penjual, frame lengkap snapshot tidak pernah dibentuk
+    assert dataset.df is None
+
+    expected = PanelEngine(frame_with_sellers.iloc[:SPLIT])
+    seller_index(expected)
+    with expected.lock.write():
+        expected.append(frame_with_sellers.iloc[SPLIT:].reset_index(drop=True))
+    pd.testing.assert_frame_equal(
+        histogram, distance.distance_histogram(expected, "2016-01-01", "2018-12-31")
+    )
+    ours, theirs = dataset.engine.sellers, seller_index(expected)
+    np.testing.assert_allclose(ours.nearest_km, theirs.nearest_km, equal_nan=True)
+    np.testing.assert_allclose(ours.order_km, theirs.order_km, equal_nan=True)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from engine import PANELS, PanelEngine
+from schema import compact
+
+
+@pytest.fixture(scope="module")
+def engine(frame):
+    return PanelEngine(frame)
+
+
+@pytest.mark.parametrize(
+    "dim, measure",
+    [("product_category_name", "price"), ("payment_type", "payment_value")],
+)
+def test_group_totals_skip_nan(raw, engine, dim, measure):
+    counts, sums = engine.group_totals(dim, engine.mask(baseline.START, baseline.END), measure)
+    expected = baseline.filtered(raw, baseline.START, baseline.END).groupby(dim, observed=True)
+    totals = pd.Series(sums, index=engine.labels[dim])
+    assert not np.isnan(sums).any()
+    np.testing.assert_allclose(
+        totals[expected[measure].sum().index.astype(str)], expected[measure].sum(), rtol=1e-4
+    )
+    sizes = pd.Series(counts, index=engine.labels[dim])
+    np.testing.assert_array_equal(sizes[expected.size().index.astype(str)], expected.size())
+
+
+# Panel `run` -> (fungsi baseline, kolom kunci)
+RUN_PANELS = {
+    "order_trend": (lambda df: baseline.order_revenue_trend(df, "order_id"), "month"),
+    "revenue_trend": (lambda df: baseline.order_revenue_trend(df, "price"), "month"),
+    "type_order": (baseline.top_lowest_type_order, "product_type"),
+    "type_sales": (baseline.top_lowest_type_sales, "product_type"),
+    "payment_methods": (baseline.top_payment_methods, "payment_type"),
+    "city_transaction": (baseline.top_city_transaction, "customer_city"),
+}
+
+
+def test_run_matches_pandas(raw, engine):
+    results = engine.run(baseline.START, baseline.END)
+    assert list(results) == PANELS
+    expected = baseline.filtered(raw, baseline.START, baseline.END)
+    for name, (panel, key) in RUN_PANELS.items():
+        result = results[name]
+        for part in result if isinstance(result, tuple) else (result,):
+            baseline.assert_same(part, panel(expected), key)
+    assert len(results["geo_city"]) == len(expected)
+
+
+def test_run_counts_only_valid_order_ids(raw):
+    raw = raw.copy()
+    raw.loc[np.random.default_rng(3).choice(len(raw), 40, replace=False), "order_id"] = np.nan
+    ours = PanelEngine(compact(raw)).run(baseline.START, baseline.END, ["order_trend"])
+    expected = baseline.order_revenue_trend(
+        baseline.filtered(raw, baseline.START, baseline.END), "order_id"
+    )
+    baseline.assert_same(ours["order_trend"], expected, "month")
+
+
+def test_geo_city_matches_pandas(raw, frame, engine):
+    ours = engine.geo_city(baseline.START, baseline.END)
+    expected = baseline.geo_top_city_transactions(
+        baseline.filtered(raw, baseline.START, baseline.END)
+    )
+    assert len(ours) == len(expected)
+    ours = ours.sort_values("order_id").reset_index(drop=True)
+    expected = expected.sort_values("order_id").reset_index(drop=True)
+    np.testing.assert_array_equal(
+        ours["order_id"].astype(str).to_numpy(), expected["order_id"].astype(str).to_numpy()
+    )
+    np.testing.assert_array_equal(ours["transaction_amount"], expected["transaction_amount"])
+
+
+def test_append_keeps_codes(frame):
+    engine = PanelEngine(frame.iloc[:4000])
+    with engine.lock.write():
+        engine.append(frame.iloc[4000:])
+    full = PanelEngine(frame)
+    mask = full.mask(baseline.START, baseline.END)
+    for dim in ("product_category_name", "payment_type", "customer_city"):
+        ours = pd.Series(engine.group_totals(dim, mask), index=engine.labels[dim])
+        expected = pd.Series(full.group_totals(dim, mask), index=full.labels[dim])
+        pd.testing.assert_series_equal(ours[expected.index], expected)
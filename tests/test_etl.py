@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import etl
+from schema import TIMESTAMP
+
+N_ORDERS = 300
+
+
+@pytest.fixture(scope="module")
+def raw_dir(tmp_path_factory):
+    """Tabel Olist kecil dengan order tanpa pembayaran, item yatim, dan zip tanpa koordinat."""
+    rng = np.random.default_rng(3)
+    root = tmp_path_factory.mktemp("raw")
+    orders = pd.DataFrame(
+        {
+            "order_id": [f"o{i}" for i in range(N_ORDERS)],
+            "customer_id": [f"c{i}" for i in range(N_ORDERS)],
+            "order_status": rng.choice(["delivered", "shipped"], N_ORDERS),
+            TIMESTAMP: pd.Timestamp("2017-01-01")
+            + pd.to_timedelta(rng.integers(0, 500 * 86400, N_ORDERS), unit="s"),
+        }
+    )
+    item_orders = rng.integers(0, N_ORDERS + 20, 450)
+    items = pd.DataFrame(
+        {
+            "order_id": [f"o{i}" for i in item_orders],
+            "order_item_id": rng.integers(1, 4, 450),
+            "product_id": [f"p{i}" for i in rng.integers(0, 40, 450)],
+            "seller_id": [f"s{i}" for i in rng.integers(0, 15, 450)],
+            "price": rng.uniform(5, 500, 450).round(2),
+            "freight_value": rng.uniform(1, 50, 450).round(2),
+        }
+    )
+    paid = rng.choice(N_ORDERS, N_ORDERS - 25, replace=False)
+    paid = np.r_[paid, rng.choice(paid, 60)]
+    payments = pd.DataFrame(
+        {
+            "order_id": [f"o{i}" for i in paid],
+            "payment_sequential": np.arange(len(paid)) % 3 + 1,
+            "payment_type": rng.choice(["credit_card", "boleto"], len(paid)),
+            "payment_installments": rng.integers(1, 6, len(paid)),
+            "payment_value": rng.uniform(10, 600, len(paid)).round(2),
+        }
+    )
+    customers = pd.DataFrame(
+        {
+            "customer_id": orders["customer_id"],
+            "customer_unique_id": [f"u{i % 200}" for i in range(N_ORDERS)],
+            "customer_zip_code_prefix": rng.integers(1000, 1030, N_ORDERS),
+            "customer_city": rng.choice(["sao paulo", "rio de janeiro", "curitiba"], N_ORDERS),
+            "customer_state": rng.choice(["SP", "RJ", "PR"], N_ORDERS),
+        }
+    )
+    products = pd.DataFrame(
+        {
+            "product_id": [f"p{i}" for i in range(40)],
+            "product_category_name": rng.choice(["beleza_saude", "esporte_lazer", None], 40),
+        }
+    )
+    sellers = pd.DataFrame(
+        {
+            "seller_id": [f"s{i}" for i in range(15)],
+            "seller_zip_code_prefix": rng.integers(1000, 1030, 15),
+            "seller_city": rng.choice(["campinas", "santos"], 15),
+            "seller_state": "SP",
+        }
+    )
+    zips = rng.integers(1000, 1025, 200)
+    geolocation = pd.DataFrame(
+        {
+            "geolocation_zip_code_prefix": zips,
+            "geolocation_lat": -23 + rng.normal(0, 0.1, 200),
+            "geolocation_lng": -46 + rng.normal(0, 0.1, 200),
+        }
+    )
+    translation = pd.DataFrame(
+        {
+            "product_category_name": ["beleza_saude"],
+            "product_category_name_english": ["health_beauty"],
+        }
+    )
+    tables = {
+        "orders": orders,
+        "order_items": items,
+        "order_payments": payments,
+        "customers": customers,
+        "products": products,
+        "sellers": sellers,
+        "geolocation": geolocation,
+        "product_category_name_translation": translation,
+    }
+    for name, df in tables.items():
+        df.to_csv(root / f"{name}_dataset.csv", index=False)
+    return root
+
+
+def merged(raw_dir):
+    """main_data yang sama lewat `pd.merge` biasa."""
+    read = lambda name: etl.read_table(etl.table_path(raw_dir, name), etl.TABLES[name][1])
+    geo = (
+        read("geolocation")
+        .groupby("geolocation_zip_code_prefix")[["geolocation_lat", "geolocation_lng"]]
+        .mean()
+    )
+    translation = read("product_category_name_translation").set_index("product_category_name")
+    df = (
+        read("order_items")
+        .merge(read("orders"), on="order_id")
+        .merge(read("order_payments"), on="order_id")
+        .merge(read("products"), on="product_id", how="left")
+        .merge(read("sellers"), on="seller_id", how="left")
+        .merge(read("customers"), on="customer_id", how="left")
+        .merge(geo, left_on="customer_zip_code_prefix", right_index=True, how="left")
+    )
+    english = df["product_category_name"].map(translation["product_category_name_english"])
+    df["product_category_name"] = english.fillna(df["product_category_name"])
+    df[TIMESTAMP] = pd.to_datetime(df[TIMESTAMP])
+    return df[etl.OUTPUT_COLUMNS]
+
+
+def canonical(df):
+    keys = ["order_id", "order_item_id", "product_id", "price", "payment_sequential"]
+    df = df.astype({col: str for col in ["order_id", "product_id"]})
+    return df.sort_values(keys + ["payment_value"]).reset_index(drop=True)
+
+
+def test_build_matches_pandas_merge(raw_dir):
+    df, report = etl.build(raw_dir, workers=2)
+    expected = merged(raw_dir)
+    assert len(df) == len(expected)
+    pd.testing.assert_frame_equal(canonical(df), canonical(expected), check_dtype=False)
+    stages = report.frame().set_index("stage")
+    assert stages.loc["items x payments", "rows_out"] == len(df)
+    assert stages.loc["order_items->orders", "unmatched"] > 0
+
+
+def test_strict_rejects_orphans(raw_dir):
+    with pytest.raises(ValueError):
+        etl.build(raw_dir, strict=True)
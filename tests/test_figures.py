@@ -0,0 +1,31 @@
+import matplotlib
+import pandas as pd
+
+from cache import LRUCache
+from figures import order_revenue_trend_viz, render
+
+
+def test_render_clears_figure():
+    months = pd.period_range("2017-01", periods=3, freq="M")
+    df = pd.DataFrame({"month": months, "order": [1, 2, 3]})
+    drawn = []
+
+    def viz(df):
+        drawn.append(order_revenue_trend_viz(df))
+        return drawn[-1]
+
+    data = render(viz, df, cache=LRUCache(max_bytes=1 << 20))
+    assert data.startswith(b"\x89PNG")
+    assert drawn[0].axes == []
+
+
+def test_render_key_includes_style():
+    months = pd.period_range("2017-01", periods=3, freq="M")
+    df = pd.DataFrame({"month": months, "order": [1, 2, 3]})
+    cache = LRUCache(max_bytes=1 << 22)
+    with matplotlib.rc_context({"axes.facecolor": "white"}):
+        light = render(order_revenue_trend_viz, df, cache=cache)
+    with matplotlib.rc_context({"axes.facecolor": "black"}):
+        dark = render(order_revenue_trend_viz, df, cache=cache)
+        assert render(order_revenue_trend_viz, df, cache=cache) is dark
+    assert light != dark
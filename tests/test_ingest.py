@@ -0,0 +1,82 @@
+import pytest
+
+import baseline
+import ingest
+from cache import LRUCache
+from date_index import DailyIndex
+from engine import PanelEngine
+from schema import compact
+
+SPLIT = 4000
+
+
+@pytest.fixture
+def setup(raw, tmp_path):
+    """Sumber CSV berisi baris awal, engine dan indeksnya, serta batch di direktori drop."""
+    source = tmp_path / "main_data.csv"
+    raw.iloc[:SPLIT].to_csv(source, index=False)
+    drop = tmp_path / "incoming"
+    drop.mkdir()
+    raw.iloc[SPLIT:].to_csv(drop / "batch.csv", index=False)
+    engine = PanelEngine(compact(raw.iloc[:SPLIT]))
+    index = DailyIndex(engine)
+    cache = LRUCache(max_bytes=1 << 24)
+    ingestor = ingest.Ingestor(source, engine, index, "v1", drop, cache)
+    return ingestor, source, drop
+
+
+def panels(index):
+    return {
+        "payment": index.top_payment_methods(baseline.START, baseline.END),
+        "sales": index.top_lowest_type_sales(baseline.START, baseline.END)[0],
+        "trend": index.order_revenue_trend(baseline.START, baseline.END, "price"),
+    }
+
+
+def assert_panels(index, expected):
+    keys = {"payment": "payment_type", "sales": "product_type", "trend": "month"}
+    for name, df in panels(index).items():
+        baseline.assert_same(df, expected[name], keys[name])
+
+
+def test_ingest_matches_full_build(raw, frame, setup):
+    ingestor, source, drop = setup
+    [result] = ingestor.poll()
+    assert result["stored"] and result["rows"] == len(raw) - SPLIT
+    assert (drop / "processed" / "batch.csv").exists()
+    assert len(ingestor.engine.days) == len(raw)
+    assert_panels(ingestor.index, panels(DailyIndex(PanelEngine(frame))))
+    # Sumber yang disimpan memuat batch, sehingga restart memberi hasil yang sama
+    assert len(ingest.pd.read_csv(source)) == len(raw)
+
+
+def test_failed_store_rolls_back(raw, setup, monkeypatch):
+    ingestor, source, drop = setup
+    before = panels(ingestor.index)
+    ingestor.cache.put(("v1", baseline.START, baseline.END, "payment_methods"), before["payment"])
+
+    def broken(*args):
+        raise OSError("disk penuh")
+
+    monkeypatch.setattr(ingest, "store_batch", broken)
+    assert ingestor.poll() == []
+    assert (drop / "failed" / "batch.csv").exists()
+    assert len(ingestor.engine.days) == SPLIT and not ingestor.engine.batches
+    assert ingestor.cache.stats()["entries"] == 0
+    assert_panels(ingestor.index, before)
+    assert len(ingest.pd.read_csv(source)) == SPLIT
+
+
+def test_failed_apply_is_not_persisted(raw, setup, monkeypatch):
+    ingestor, source, drop = setup
+    before = panels(ingestor.index)
+
+    def broken(engine, start):
+        raise RuntimeError("indeks rusak")
+
+    monkeypatch.setattr(ingestor.index, "append", broken)
+    ingestor.poll()
+    assert (drop / "failed" / "batch.csv").exists()
+    assert len(ingestor.engine.days) == SPLIT
+    assert_panels(ingestor.index, before)
+    assert len(ingest.pd.read_csv(source)) == SPLIT
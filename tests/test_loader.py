@@ -0,0 +1,95 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import loader
+from loader import cache_metadata, cache_path, load_dataset, source_version
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def served(tmp_path):
+    """CSV yang disajikan server HTTP lokal (mendukung If-Modified-Since)."""
+    root = tmp_path / "www"
+    root.mkdir()
+    handler = functools.partial(QuietHandler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield root / "main_data.csv", f"http://127.0.0.1:{server.server_port}/main_data.csv"
+    server.shutdown()
+
+
+def publish(path, df, mtime):
+    df.to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+
+
+def test_local_cache_follows_content(raw, tmp_path):
+    source = tmp_path / "main_data.csv"
+    raw.to_csv(source, index=False)
+    df, version = load_dataset(source, tmp_path / "cache")
+    again, cached = load_dataset(source, tmp_path / "cache")
+    assert cached == version and len(again) == len(df) == len(raw)
+
+    raw.head(100).to_csv(source, index=False)
+    df, changed = load_dataset(source, tmp_path / "cache")
+    assert changed != version and len(df) == 100
+
+
+def test_remote_cache_is_revalidated(raw, served, tmp_path):
+    path, url = served
+    cache_dir = tmp_path / "cache"
+    now = time.time()
+    publish(path, raw, now - 60)
+
+    df, version = load_dataset(url, cache_dir)
+    assert len(df) == len(raw)
+    assert cache_metadata(cache_path(cache_dir))["validators"]
+    assert source_version(url, cache_dir) == version
+
+    # Tidak berubah: 304, cache dipakai
+    _, same = load_dataset(url, cache_dir)
+    assert same == version
+
+    # Berubah di server: versi baru terdeteksi tanpa menghapus cache
+    publish(path, raw.head(100), now)
+    assert source_version(url, cache_dir) is None
+    df, changed = load_dataset(url, cache_dir)
+    assert changed != version and len(df) == 100
+    assert source_version(url, cache_dir) == changed
+
+
+def test_remote_unreachable_uses_cache(raw, served, tmp_path):
+    path, url = served
+    cache_dir = tmp_path / "cache"
+    publish(path, raw.head(50), time.time() - 60)
+    _, version = load_dataset(url, cache_dir)
+
+    offline = "http://127.0.0.1:1/main_data.csv"
+    # Cache milik sumber lain tidak dipakai untuk URL yang gagal diambil
+    with pytest.raises(OSError):
+        load_dataset(offline, tmp_path / "empty")
+    df, cached = load_dataset(offline, cache_dir)
+    assert cached == version and len(df) == 50
+
+
+def test_failed_download_leaves_no_temp_file(raw, served, tmp_path, monkeypatch):
+    path, url = served
+    cache_dir = tmp_path / "cache"
+    publish(path, raw.head(50), time.time() - 60)
+
+    def broken(headers):
+        raise OSError("validator rusak")
+
+    monkeypatch.setattr(loader, "validators_of", broken)
+    with pytest.raises(OSError):
+        load_dataset(url, cache_dir)
+    assert list(cache_dir.iterdir()) == []
@@ -0,0 +1,57 @@
+import gc
+import threading
+import tracemalloc
+
+from profiling import Profiler
+
+
+def test_tracing_stops_after_profiled_run():
+    assert not tracemalloc.is_tracing()
+    first, second = Profiler(enabled=True), Profiler(enabled=True)
+    with first.stage("load"):
+        bytearray(1 << 20)
+    first.emit()
+    # Rerun lain yang masih berjalan tetap diukur
+    assert tracemalloc.is_tracing()
+    second.emit()
+    assert not tracemalloc.is_tracing()
+    assert first.records[0]["peak_alloc_bytes"] >= 1 << 19
+
+
+def test_interrupted_run_releases_tracing():
+    profiler = Profiler(enabled=True)
+    assert tracemalloc.is_tracing()
+    del profiler
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_profiler_does_not_trace():
+    Profiler().emit()
+    assert not tracemalloc.is_tracing()
+
+
+def test_peak_only_for_serial_stages():
+    profiler = Profiler(enabled=True)
+    with profiler.stage("serial"):
+        bytearray(1 << 20)
+    started, release = threading.Event(), threading.Event()
+
+    def pooled():
+        with profiler.stage("pool"):
+            started.set()
+            release.wait()
+
+    thread = threading.Thread(target=pooled)
+    thread.start()
+    started.wait()
+    with profiler.stage("script"):
+        release.set()
+        thread.join()
+    profiler.emit()
+    records = {record["stage"]: record for record in profiler.records}
+    assert records["serial"]["peak_alloc_bytes"] >= 1 << 19
+    assert not records["serial"]["concurrent"]
+    for name in ("pool", "script"):
+        assert records[name]["concurrent"] and records[name]["peak_alloc_bytes"] is None
+    assert profiler.frame()["concurrent"].tolist() == [False, True, True]
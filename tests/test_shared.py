@@ -0,0 +1,107 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+import shared
+from cache import LRUCache
+from distance import distance_histogram
+from engine import PanelEngine
+from ingest import Ingestor
+from loader import source_version
+from schema import compact
+from shared import open_dataset, prune, snapshot_path
+
+SPLIT = 4000
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+def test_frame_built_once_per_version(frame, csv_source, cache_dir, monkeypatch):
+    dataset = open_dataset(csv_source, cache_dir)
+    calls = []
+    build = dataset.build
+
+    def counted(names):
+        calls.append(threading.get_ident())
+        return build(names)
+
+    monkeypatch.setattr(dataset, "build", counted)
+    threads = [threading.Thread(target=dataset.engine.frame) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dataset.engine.geo_city("2017-01-01", "2017-12-31")
+    assert len(calls) == 1
+
+    df = dataset.engine.frame()
+    assert list(df.columns) == list(frame.columns)
+    for col in frame.columns:
+        np.testing.assert_array_equal(df[col].astype(str), frame[col].astype(str))
+    # Beberapa kolom saja tidak membentuk frame lengkap
+    subset = dataset.engine.columns(["customer_state", "price", "tidak_ada"])
+    assert list(subset.columns) == ["customer_state", "price"] and len(calls) == 2
+
+
+def test_frame_follows_snapshot_not_source(raw, tmp_path, cache_dir):
+    source = tmp_path / "main_data.csv"
+    raw.to_csv(source, index=False)
+    dataset = open_dataset(source, cache_dir)
+    raw.head(10).to_csv(source, index=False)
+    assert len(dataset.engine.frame()) == len(raw)
+
+
+def test_ingest_into_shared_dataset(raw, tmp_path, cache_dir):
+    """Batch ingest mengubah sumber; hasil per baris tetap dari snapshot + batch, tanpa ganda."""
+    source = tmp_path / "main_data.csv"
+    raw.iloc[:SPLIT].to_csv(source, index=False)
+    drop = tmp_path / "incoming"
+    drop.mkdir()
+    raw.iloc[SPLIT:].to_csv(drop / "batch.csv", index=False)
+    dataset = open_dataset(source, cache_dir)
+    cache = LRUCache(max_bytes=1 << 24)
+    ingestor = Ingestor(source, dataset.engine, dataset.index, dataset.version, drop, cache)
+    [result] = ingestor.poll()
+    assert result["stored"] and source_version(source) != dataset.version
+
+    # Pembanding: engine biasa dari baris awal yang menerima batch yang sama
+    expected = PanelEngine(compact(raw.iloc[:SPLIT]))
+    with expected.lock.write():
+        expected.append(compact(raw.iloc[SPLIT:]))
+
+    assert len(dataset.engine.frame()) == len(raw)
+    ours = dataset.engine.geo_city(baseline.START, baseline.END)
+    theirs = expected.geo_city(baseline.START, baseline.END)
+    assert len(ours) == len(theirs)
+    np.testing.assert_array_equal(ours["transaction_amount"], theirs["transaction_amount"])
+    pd.testing.assert_frame_equal(
+        distance_histogram(dataset.engine, baseline.START, baseline.END),
+        distance_histogram(expected, baseline.START, baseline.END),
+    )
+
+
+def touch(path, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_only_older_snapshots_of_same_source(tmp_path, cache_dir):
+    source, other = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    older = snapshot_path(source, "v1", cache_dir)
+    keep = snapshot_path(source, "v2", cache_dir)
+    newer = snapshot_path(source, "v3", cache_dir)
+    foreign = snapshot_path(other, "v0", cache_dir)
+    for mtime, path in enumerate([foreign, older, keep, newer], start=1_000_000):
+        touch(path, mtime)
+    prune(keep, source, cache_dir)
+    assert not older.exists()
+    assert keep.exists() and newer.exists() and foreign.exists()
+    assert shared.source_key(source) != shared.source_key(other)
@@ -0,0 +1,36 @@
+import pytest
+
+import baseline
+from streaming import stream_aggregates
+
+PANELS = {
+    "type_order": ("top_lowest_type_order", "product_type"),
+    "type_sales": ("top_lowest_type_sales", "product_type"),
+    "payment_methods": ("top_payment_methods", "payment_type"),
+    "city_transaction": ("top_city_transaction", "customer_city"),
+}
+
+
+@pytest.fixture(scope="module")
+def results(csv_source):
+    # Anggaran kecil agar sumber dibaca dalam banyak chunk
+    partial = stream_aggregates(str(csv_source), baseline.START, baseline.END, budget=64 << 10)
+    return partial.results()
+
+
+@pytest.fixture(scope="module")
+def expected(raw):
+    return baseline.filtered(raw, baseline.START, baseline.END)
+
+
+@pytest.mark.parametrize("metric, ref", [("order_trend", "order_id"), ("revenue_trend", "price")])
+def test_trend_matches_pandas(results, expected, metric, ref):
+    baseline.assert_same(results[metric], baseline.order_revenue_trend(expected, ref), "month")
+
+
+@pytest.mark.parametrize("metric", PANELS)
+def test_panels_match_pandas(results, expected, metric):
+    panel, key = PANELS[metric]
+    result = results[metric]
+    result = result[0] if isinstance(result, tuple) else result
+    baseline.assert_same(result, getattr(baseline, panel)(expected), key)